@@ -1,7 +1,23 @@
-from flask import Flask, jsonify, request
+from concurrent.futures import ProcessPoolExecutor, wait
+from flask import Flask, Response, jsonify, make_response, request
 from flask_cors import CORS
-from search_algorithms import a_star, dijkstra
+from distance_field import DistanceField
+from search_algorithms import (CANCEL_CHECK_INTERVAL, a_star, a_star_chunks, a_star_untraced, ara_star, bidirectional_a_star,
+                               bidirectional_dijkstra, dijkstra, dijkstra_chunks, dijkstra_untraced, jump_point_search)
 from grid import Grid
+from grid_store import GridStore
+from heuristics import HEURISTICS, default_heuristic
+from hierarchical_search import HPAStar
+from incremental_search import LPAStar
+from instrumentation import Metrics, SearchStats
+from jobs import CancelToken, JobManager, JobQueueFull, SearchCancelled
+from landmarks import Landmarks
+from response_encoding import ARRAY_ENCODINGS, BINARY_MIMETYPE, compress, encode_result
+from result_cache import ResultCache, grid_fingerprint
+import os
+import threading
+import time
+import uuid
 
 app = Flask(__name__)
 if app.debug:
@@ -9,6 +25,802 @@ if app.debug:
 else:
     CORS(app, origins=["https://PAV-frontend.onrender.com"])
 
+grid_store = GridStore()
+result_cache = ResultCache()
+field_cache = ResultCache()
+# Grids of recent stateless requests, reused by later requests on the same layout. A grid
+# is popped from the cache while a request searches it, so no two requests share one.
+grid_cache = ResultCache()
+metrics = Metrics()
+
+# Worker processes for /batch, started on first use
+batch_workers = os.cpu_count() or 1
+batch_pool = None
+batch_pool_lock = threading.Lock()
+# Grid built by a batch worker process, as (key, grid), reused by later chunks of the same grid
+batch_grid = None
+# Seconds between two checks of a batch's cancellation token while its workers run
+BATCH_POLL_INTERVAL = 0.05
+
+# Threads that run searches (all but streamed ones), with a deadline per search
+search_jobs = JobManager(max_workers=2, max_pending=8)
+# Default and largest search deadlines, below gunicorn's 30 second worker timeout
+DEFAULT_TIMEOUT_MS = 10000
+MAX_TIMEOUT_MS = 25000
+
+def build_grid(num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, stats=None, cancel=None):
+    """
+    Build a compact grid and apply walls and weights to it.
+
+    Args:
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        walls (list): List of coordinates representing wall nodes.
+        weights (list): List of coordinates representing weighted nodes.
+        weight_cost (float): The cost to traverse a weighted node.
+        allow_diagonal (bool): Whether diagonal movement is allowed.
+        stats (SearchStats, optional): Request stats to time the 'grid' and 'walls' phases
+            in. Defaults to None.
+        cancel (CancelToken, optional): Token checked once the grid is allocated and every
+            CANCEL_CHECK_INTERVAL walls and weights, so the request's deadline covers
+            building the grid too. Defaults to None.
+
+    Returns:
+        Grid: The initialized grid.
+
+    Raises:
+        SearchCancelled: If cancel trips while the grid is built.
+    """
+    grid = Grid(num_rows, num_cols, weight_cost, moves_diagonally=allow_diagonal, compact=True)
+    if stats is not None:
+        stats.mark('grid')
+    if cancel is not None:
+        cancel.check()
+
+    for i, wall in enumerate(walls, 1):
+        grid[wall].block()
+        if cancel is not None and i % CANCEL_CHECK_INTERVAL == 0:
+            cancel.check()
+
+    for i, weight in enumerate(weights, 1):
+        grid[weight].add_weight()
+        if cancel is not None and i % CANCEL_CHECK_INTERVAL == 0:
+            cancel.check()
+
+    if stats is not None:
+        stats.mark('walls')
+    return grid
+
+def run_search(algorithm, grid, source_pos, target_pos, allow_diagonal, planner=None, scanned=False, bidirectional=False, field=None,
+               stats=None, heuristic=None, landmarks=None, epsilon=1, anytime=False, budget_ms=None, budget_expansions=None,
+               cancel=None, explore_unreachable=False, trace=True, animation_frames=None):
+    """
+    Run a search algorithm on a grid and build the JSON-ready result.
+
+    When the grid's component labels show that no path joins the source and the target,
+    the empty result is returned without searching (see Grid.connected).
+
+    For 'astar' and 'dijkstra' without a planner, distance field, bidirectional or anytime
+    search, the source and the target may be tuples of coordinates: one search then finds
+    the shortest path from any of the sources to the nearest target.
+
+    Args:
+        algorithm (str): One of 'astar', 'dijkstra', 'jps' or 'hpa'.
+        grid (Grid): The grid to search.
+        source_pos (tuple): Coordinates (x, y) of the source node, or a tuple of them.
+        target_pos (tuple): Coordinates (x, y) of the target node, or a tuple of them.
+        allow_diagonal (bool): Whether diagonal movement is allowed.
+        planner (LPAStar or HPAStar, optional): Planner kept with the grid to search with
+            instead; required for 'hpa'. Defaults to None.
+        scanned (bool, optional): For 'jps', whether to also return the cells scanned while
+            jumping ('scanned'). Defaults to False.
+        bidirectional (bool, optional): For 'astar' and 'dijkstra', whether to search from both
+            ends at once. Defaults to False.
+        field (DistanceField, optional): For 'dijkstra', a distance field from the source on
+            this grid to read the result from instead of searching. Defaults to None.
+        stats (SearchStats, optional): Request stats to fill with the search's work counters
+            and to time the 'search' and 'result' phases in. Planners and distance fields do
+            not report counters. Defaults to None.
+        heuristic (str, optional): For 'astar' and 'jps', one of HEURISTICS. Defaults to None,
+            the tightest admissible one for the grid (see heuristics.default_heuristic).
+        landmarks (Landmarks, optional): Landmark tables of this grid for the 'alt' heuristic.
+            Defaults to None.
+        epsilon (float, optional): For 'astar', the heuristic inflation factor (weighted A*),
+            or the first one of an anytime search. Defaults to 1.
+        anytime (bool, optional): For 'astar', whether to run ARA*, improving the path until it
+            is optimal or the budget runs out. Defaults to False.
+        budget_ms (float, optional): Time budget of an anytime search in milliseconds.
+            Defaults to None, no limit.
+        budget_expansions (int, optional): Expansion budget of an anytime search. Defaults to
+            None, no limit.
+        cancel (CancelToken, optional): Token the search checks to stop early. Distance
+            fields are read without searching and do not check it. Defaults to None.
+        explore_unreachable (bool, optional): Whether to search even if the target cannot be
+            reached, to return the cells explored on the way. Defaults to False.
+        trace (bool, optional): Whether to return the visited cells and their costs. Without
+            them, plain 'astar' and 'dijkstra' searches run a_star_untraced and
+            dijkstra_untraced, which keep a few bits per cell instead of the grid's search
+            arrays. Defaults to True.
+        animation_frames (str or int, optional): For plain 'astar' and 'dijkstra' searches
+            with trace, how the search groups the visited cells into animation frames: 'layer'
+            for one frame per layer of cells expanded at the same cost, or a number of cells
+            per frame. Defaults to None, no frames.
+
+    Returns:
+        dict: The visited coordinates, path coordinates, path length, path cost, node costs
+              (the first and last two left out without trace) and the number of expanded
+              cells ('expanded'), plus the heuristic used
+              ('heuristic') for 'astar' and 'jps'. With a planner, also the work it reports in
+              stats(), e.g. the number of cells expanded ('expanded') and the number expanded
+              by its last search from scratch ('full_search_expanded') for LPAStar.
+              Weighted and anytime A* also return 'suboptimality_bound'; anytime A* also
+              returns 'iterations' and 'budget_exhausted' (see search_algorithms.ara_star).
+              A result answered without searching has 'reachable' set to False. With several
+              sources or targets, 'reached_source' and 'reached_target' hold the coordinates
+              of the ends of the path, or None if no path was found. With animation_frames,
+              'animation_frames' holds one dict per frame with the offsets in visited it
+              starts at and ends before ('start', 'end') and the lowest and highest node
+              cost of its cells ('min_cost', 'max_cost').
+
+    Raises:
+        ValueError: If 'jps' is run on a grid with weights or without diagonal movement.
+        SearchCancelled: If cancel trips during the search.
+    """
+    # Set source and target nodes
+    source_node = endpoint_nodes(grid, source_pos)
+    target_node = endpoint_nodes(grid, target_pos)
+    counters = stats.counters if stats is not None else None
+    reachable = planner is not None or explore_unreachable or endpoints_connected(grid, source_pos, target_pos)
+    expanded = None
+    frames = [] if animation_frames is not None else None
+    frame_size = animation_frames if animation_frames != 'layer' else None
+
+    if not reachable:
+        visited, path, iterations, exhausted, scanned_nodes = [], [], [], False, []
+        path_length = path_cost = 0.0 if algorithm == 'dijkstra' else 0
+    elif planner is not None:
+        visited, path, path_length, path_cost = planner.search(source_node, target_node, cancel)
+        if algorithm == 'dijkstra':
+            path_cost, path_length = float(path_length), float(path_cost)
+    elif algorithm == 'astar' and anytime:
+        visited, path, path_length, path_cost, iterations, exhausted = ara_star(
+            grid, source_node, target_node, allow_diagonal, epsilon, budget_ms=budget_ms, budget_expansions=budget_expansions,
+            heuristic=heuristic, landmarks=landmarks, stats=counters, cancel=cancel)
+    elif algorithm == 'astar' and bidirectional:
+        visited, path, path_length, path_cost = bidirectional_a_star(grid, source_node, target_node, moves_diagonally=allow_diagonal,
+                                                                     stats=counters, heuristic=heuristic, landmarks=landmarks,
+                                                                     cancel=cancel)
+    elif algorithm == 'astar' and not trace:
+        work = counters if counters is not None else {}
+        path, path_length, path_cost = a_star_untraced(grid, source_node, target_node, moves_diagonally=allow_diagonal, stats=work,
+                                                       heuristic=heuristic, landmarks=landmarks, epsilon=epsilon, cancel=cancel)
+        visited, expanded = [], work['expanded']
+    elif algorithm == 'astar':
+        visited, path, path_length, path_cost = a_star(grid, source_node, target_node, moves_diagonally=allow_diagonal, stats=counters,
+                                                       heuristic=heuristic, landmarks=landmarks, epsilon=epsilon, cancel=cancel,
+                                                       frames=frames, frame_size=frame_size)
+    elif algorithm == 'jps':
+        visited, path, path_length, path_cost, scanned_nodes = jump_point_search(grid, source_node, target_node, scanned, stats=counters,
+                                                                                    heuristic=heuristic, landmarks=landmarks,
+                                                                                    cancel=cancel)
+    elif field is not None:
+        visited, path, path_cost, path_length = field.dijkstra(target_node)
+        path_cost = float(path_cost)
+        path_length = float(path_length)
+    elif not trace and not bidirectional:
+        work = counters if counters is not None else {}
+        path, path_cost, path_length = dijkstra_untraced(grid, source_node, target_node, moves_diagonally=allow_diagonal, stats=work,
+                                                         cancel=cancel)
+        visited, expanded = [], work['expanded']
+        path_cost = float(path_cost)
+        path_length = float(path_length)
+    elif bidirectional:
+        visited, path, path_cost, path_length = bidirectional_dijkstra(grid, source_node, target_node, moves_diagonally=allow_diagonal,
+                                                                       stats=counters, cancel=cancel)
+        path_cost = float(path_cost)
+        path_length = float(path_length)
+    else:
+        visited, path, path_cost, path_length = dijkstra(grid, source_node, target_node, moves_diagonally=allow_diagonal, stats=counters,
+                                                         cancel=cancel, frames=frames, frame_size=frame_size)
+        path_cost = float(path_cost)
+        path_length = float(path_length)
+    if stats is not None:
+        stats.mark('search')
+
+    # Convert visited/path to list of tuples
+    path_coordinates = [(node.x, node.y) for node in path]
+    if expanded is None:
+        expanded = len(visited)
+
+    if trace:
+        visited_coordinates = [(node.x, node.y) for node in visited]
+        node_costs = [node.f for node in visited]
+        result = {'visited': visited_coordinates, 'path': path_coordinates, 'path_length': path_length, 'path_cost': path_cost,
+                  'node_costs': node_costs, 'expanded': expanded}
+    else:
+        result = {'path': path_coordinates, 'path_length': path_length, 'path_cost': path_cost, 'expanded': expanded}
+    if planner is None and algorithm in ('astar', 'jps'):
+        result['heuristic'] = heuristic or default_heuristic(grid)
+    if planner is None and algorithm == 'astar' and anytime:
+        result['suboptimality_bound'] = iterations[-1]['bound'] if iterations else None
+        result['iterations'] = iterations
+        result['budget_exhausted'] = exhausted
+    elif planner is None and algorithm == 'astar' and epsilon != 1:
+        result['suboptimality_bound'] = epsilon
+    if planner is not None:
+        result.update(planner.stats())
+    if algorithm == 'jps' and scanned:
+        result['scanned'] = [(node.x, node.y) for node in scanned_nodes]
+    if not reachable:
+        result['reachable'] = False
+    if frames is not None:
+        starts = [0] + [end for end, _, _ in frames[:-1]]
+        result['animation_frames'] = [{'start': start, 'end': end, 'min_cost': min_cost, 'max_cost': max_cost}
+                                      for start, (end, min_cost, max_cost) in zip(starts, frames)]
+    if is_cell_set(source_pos) or is_cell_set(target_pos):
+        result['reached_source'] = path_coordinates[0] if path_coordinates else None
+        result['reached_target'] = path_coordinates[-1] if path_coordinates else None
+    if stats is not None:
+        stats.mark('result')
+    return result
+
+def metric_label(algorithm, bidirectional=False, incremental=False):
+    """
+    Get the algorithm label a search is recorded under in the metrics.
+
+    Args:
+        algorithm (str): One of 'astar', 'dijkstra', 'jps' or 'hpa'.
+        bidirectional (bool, optional): Whether the search ran from both ends. Defaults to False.
+        incremental (bool, optional): Whether the search was an LPA* repair. Defaults to False.
+
+    Returns:
+        str: The label, e.g. 'astar', 'bidirectional_astar' or 'incremental_dijkstra'.
+    """
+    if bidirectional:
+        return 'bidirectional_' + algorithm
+    if incremental:
+        return 'incremental_' + algorithm
+    return algorithm
+
+# Streaming formats for /astar and /dijkstra, chosen with the Accept header
+STREAM_MIMETYPES = ['application/x-ndjson', 'text/event-stream']
+
+def response_format(streams=True):
+    """
+    Choose the format of a search response from the request's Accept header.
+
+    Args:
+        streams (bool, optional): Whether the route can stream its response. Defaults to True.
+
+    Returns:
+        str: 'application/json' (the default), BINARY_MIMETYPE, or with streams
+             'application/x-ndjson' or 'text/event-stream'.
+    """
+    offers = ['application/json', BINARY_MIMETYPE] + (STREAM_MIMETYPES if streams else [])
+    return request.accept_mimetypes.best_match(offers) or 'application/json'
+
+def result_response(result, num_cols, mimetype='application/json', array_encoding='raw'):
+    """
+    Serialize a search result as JSON or in the compact binary format.
+
+    Args:
+        result (dict): A result from run_search.
+        num_cols (int): Number of columns in the grid.
+        mimetype (str, optional): 'application/json' or BINARY_MIMETYPE. Defaults to 'application/json'.
+        array_encoding (str, optional): For the binary format, how cell arrays are stored,
+            one of ARRAY_ENCODINGS. Defaults to 'raw'.
+
+    Returns:
+        Response: The response.
+    """
+    if mimetype == BINARY_MIMETYPE:
+        return app.response_class(encode_result(result, num_cols, array_encoding), mimetype=BINARY_MIMETYPE)
+    return jsonify(result)
+
+def search_response(algorithm, num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos,
+                    mimetype='application/json', array_encoding='raw', instrument=False, cancel=None, **options):
+    """
+    Build the response for a stateless search request, serving repeated requests
+    from the result cache without building a grid. Dijkstra requests whose grid and source
+    match a cached distance field are answered from the field without searching, unless
+    they ask for animation frames, which come from the search loop. Other
+    requests reuse the grid of an earlier request with the same layout when there is one,
+    so walls, weights and the adjacency table are not rebuilt.
+
+    Every request is recorded in the metrics. Instrumented requests always search, so the
+    counters and phase times attached to them describe this request. So do anytime searches
+    with a time budget, whose result depends on how fast the search ran.
+
+    Args:
+        algorithm (str): Either 'astar' or 'dijkstra'.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        walls (list): List of coordinates representing wall nodes.
+        weights (list): List of coordinates representing weighted nodes.
+        weight_cost (float): The cost to traverse a weighted node.
+        allow_diagonal (bool): Whether diagonal movement is allowed.
+        source_pos (tuple): Coordinates (x, y) of the source node, or a tuple of them.
+        target_pos (tuple): Coordinates (x, y) of the target node, or a tuple of them.
+        mimetype (str, optional): Response format, see result_response. Defaults to 'application/json'.
+        array_encoding (str, optional): Cell array encoding of the binary format. Defaults to 'raw'.
+        instrument (bool, optional): Whether to attach the request's SearchStats to the
+            result under 'stats'. Defaults to False.
+        cancel (CancelToken, optional): Token checked while the grid is built and by the search,
+            to stop early. Defaults to None.
+        **options: Extra keyword arguments passed on to run_search.
+
+    Returns:
+        Response: The JSON or binary response.
+
+    Raises:
+        SearchCancelled: If cancel trips during the search.
+    """
+    key_options = options
+    if mimetype != 'application/json':
+        key_options = dict(options, mimetype=mimetype, array_encoding=array_encoding)
+    label = metric_label(algorithm, options.get('bidirectional', False))
+    stats = SearchStats()
+    key = None
+    if not instrument and options.get('budget_ms') is None:
+        key = grid_fingerprint(algorithm, num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos, key_options)
+    if key is not None:
+        body = result_cache.get(key)
+        if body is not None:
+            stats.mark('cache')
+            metrics.observe(label, num_rows * num_cols, stats.total(), cache='hit')
+            return app.response_class(body, mimetype=mimetype)
+
+    # hashing the walls and weights of a large grid takes a while, so each lookup counts against the deadline
+    if cancel is not None:
+        cancel.check()
+    field = None
+    if (algorithm == 'dijkstra' and not options.get('bidirectional') and options.get('animation_frames') is None
+            and not (is_cell_set(source_pos) or is_cell_set(target_pos))):
+        field_key = grid_fingerprint('distance_field', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, ())
+        if field_key is not None:
+            field = field_cache.get(field_key)
+    stats.mark('cache')
+    if cancel is not None:
+        cancel.check()
+
+    grid_key = None
+    if field is not None:
+        grid = field.grid
+    else:
+        grid_key = grid_fingerprint('grid', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, (), ())
+        grid = grid_cache.pop(grid_key) if grid_key is not None else None
+        if grid is None:
+            # Initialize the grid
+            grid = build_grid(num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, stats, cancel)
+
+    try:
+        result = run_search(algorithm, grid, source_pos, target_pos, allow_diagonal, field=field, stats=stats, cancel=cancel, **options)
+    finally:
+        # a cancelled search leaves the grid as reusable as a finished one
+        if grid_key is not None:
+            grid_cache.put(grid_key, grid, grid.memory_size())
+    if instrument:
+        result['stats'] = stats.to_dict()
+    response = result_response(result, num_cols, mimetype, array_encoding)
+    stats.mark('serialize')
+    if key is not None:
+        result_cache.put(key, response.get_data())
+    metrics.observe(label, num_rows * num_cols, stats.total(), stats)
+    return response
+
+def search_grid_session(session, algorithm, source_pos, target_pos, data, mimetype='application/json', array_encoding='raw',
+                        cancel=None):
+    """
+    Run a search on a stored grid, with the planner or landmarks kept for it, and build the response.
+
+    The session's lock is held while the search runs, so edits wait for it.
+
+    Args:
+        session (GridSession): The stored grid.
+        algorithm (str): One of 'astar', 'dijkstra', 'jps' or 'hpa'.
+        source_pos (tuple): Coordinates (x, y) of the source node.
+        target_pos (tuple): Coordinates (x, y) of the target node.
+        data (dict): The request payload, for the options of /grids/<grid_id>/<algorithm>.
+        mimetype (str, optional): Response format, see result_response. Defaults to 'application/json'.
+        array_encoding (str, optional): Cell array encoding of the binary format. Defaults to 'raw'.
+        cancel (CancelToken, optional): Token the search checks to stop early. Defaults to None.
+
+    Returns:
+        Response: The JSON or binary response, or HTTP 400 if the search cannot run on the
+                  grid as it is now.
+
+    Raises:
+        SearchCancelled: If cancel trips during the search.
+    """
+    stats = SearchStats()
+    bidirectional = bool(data.get('bidirectional', False))
+    heuristic = data.get('heuristic')
+    with session.lock:
+        grid = session.grid
+        if algorithm == 'jps' and (not grid.moves_diagonally or 1 in grid.weighted):
+            return make_response(jsonify({'error': 'Jump point search needs diagonal movement and no weights'}), 400)
+        planner = None
+        if algorithm == 'hpa':
+            cluster_size = int(data.get('clusterSize', 16))
+            planner = session.planners.get(algorithm)
+            if planner is None or planner.cluster_size != cluster_size:
+                if planner is not None:
+                    planner.close()
+                planner = HPAStar(grid, cluster_size)
+                session.planners[algorithm] = planner
+        elif data.get('incremental', False) and algorithm != 'jps':
+            planner = session.planners.get(algorithm)
+            if planner is None:
+                planner = LPAStar(grid, use_heuristic=algorithm == 'astar')
+                session.planners[algorithm] = planner
+        if planner is not None and (grid.blocked[grid.cell_id(*source_pos)] or grid.blocked[grid.cell_id(*target_pos)]):
+            return make_response(jsonify({'error': 'The source and target of an incremental or hpa search cannot be walls'}), 400)
+        landmarks = None
+        if heuristic == 'alt' and planner is None:
+            if session.landmarks is None:
+                session.landmarks = Landmarks(grid)
+            landmarks = session.landmarks
+        stats.mark('planner')
+        options = {'heuristic': heuristic, 'landmarks': landmarks} if algorithm in ('astar', 'jps') else {}
+        result = run_search(algorithm, grid, source_pos, target_pos, grid.moves_diagonally, planner,
+                            scanned=bool(data.get('scanned', False)), bidirectional=bidirectional, stats=stats, cancel=cancel,
+                            explore_unreachable=bool(data.get('exploreUnreachable', False)), **options)
+        num_cols = grid.num_cols
+        num_cells = len(grid)
+    if data.get('instrument', False):
+        result['stats'] = stats.to_dict()
+    response = result_response(result, num_cols, mimetype, array_encoding)
+    stats.mark('serialize')
+    label = metric_label(algorithm, bidirectional and planner is None, isinstance(planner, LPAStar))
+    metrics.observe(label, num_cells, stats.total(), stats)
+    return response
+
+def search_frames(algorithm, num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos,
+                  chunk_size, bidirectional=False, heuristic=None, epsilon=1, cancel=None, explore_unreachable=False):
+    """
+    Run a search and yield its result in frames while it runs.
+
+    Each frame but the last holds the next chunk_size visited cells ('visited') and their
+    costs ('node_costs'), as soon as the search has explored them. The last frame holds
+    'path', 'path_length', 'path_cost' and 'expanded' (and 'heuristic' for A*). Together they
+    carry the same data as run_search.
+    Bidirectional searches are run to the end first and then sent in the same frames, and
+    a target that cannot be reached gets the result frame alone.
+
+    Args:
+        algorithm (str): Either 'astar' or 'dijkstra'.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        walls (list): List of coordinates representing wall nodes.
+        weights (list): List of coordinates representing weighted nodes.
+        weight_cost (float): The cost to traverse a weighted node.
+        allow_diagonal (bool): Whether diagonal movement is allowed.
+        source_pos (tuple): Coordinates (x, y) of the source node, or a tuple of them.
+        target_pos (tuple): Coordinates (x, y) of the target node, or a tuple of them.
+        chunk_size (int): Number of visited cells per frame.
+        bidirectional (bool, optional): Whether to search from both ends at once. Defaults to False.
+        heuristic (str, optional): For 'astar', one of HEURISTICS. Defaults to None.
+        epsilon (float, optional): For 'astar', the heuristic inflation factor. Defaults to 1.
+        cancel (CancelToken, optional): Token checked while the grid is built and after each
+            frame. Defaults to None.
+        explore_unreachable (bool, optional): Whether to search even if the target cannot be
+            reached, as for run_search. Defaults to False.
+
+    Yields:
+        tuple: (event, frame) where event is 'visited' or 'result' and frame is a dict.
+    """
+    grid = build_grid(num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, cancel=cancel)
+
+    options = {'heuristic': heuristic} if algorithm == 'astar' else {}
+    if bidirectional or not (explore_unreachable or endpoints_connected(grid, source_pos, target_pos)):
+        result = run_search(algorithm, grid, source_pos, target_pos, allow_diagonal, bidirectional=bidirectional, cancel=cancel,
+                            epsilon=epsilon, explore_unreachable=explore_unreachable, **options)
+        for i in range(0, len(result['visited']), chunk_size):
+            yield 'visited', {'visited': result['visited'][i:i + chunk_size], 'node_costs': result['node_costs'][i:i + chunk_size]}
+        yield 'result', {key: value for key, value in result.items() if key not in ('visited', 'node_costs')}
+        return
+
+    chunks = a_star_chunks if algorithm == 'astar' else dijkstra_chunks
+    if algorithm == 'astar' and epsilon != 1:
+        options['epsilon'] = epsilon
+    search = chunks(grid, endpoint_nodes(grid, source_pos), endpoint_nodes(grid, target_pos), allow_diagonal, chunk_size, **options)
+    cols = grid.num_cols
+    expanded = 0
+    while True:
+        try:
+            chunk = next(search)
+        except StopIteration as stop:
+            path, first_metric, second_metric = stop.value
+            break
+        if chunk:
+            expanded += len(chunk)
+            f = grid.f  # allocated once the search has started
+            yield 'visited', {'visited': [divmod(cell, cols) for cell in chunk], 'node_costs': [f[cell] for cell in chunk]}
+        if cancel is not None:
+            cancel.check()
+
+    if algorithm == 'astar':
+        path_length, path_cost = first_metric, second_metric
+        options['heuristic'] = heuristic or default_heuristic(grid)
+        if epsilon != 1:
+            options['suboptimality_bound'] = options.pop('epsilon')
+    else:
+        path_cost, path_length = float(first_metric), float(second_metric)
+    if is_cell_set(source_pos) or is_cell_set(target_pos):
+        options['reached_source'] = divmod(path[0], cols) if path else None
+        options['reached_target'] = divmod(path[-1], cols) if path else None
+    yield 'result', {'path': [divmod(cell, cols) for cell in path], 'path_length': path_length, 'path_cost': path_cost,
+                     'expanded': expanded, **options}
+
+def stream_response(mimetype, frames):
+    """
+    Stream search frames as newline-delimited JSON or as Server-Sent Events.
+
+    Args:
+        mimetype (str): 'application/x-ndjson' or 'text/event-stream'.
+        frames (generator): Frames from search_frames.
+
+    Returns:
+        Response: The streaming response. An error while searching, or the search running
+                  past its deadline, ends the stream with an 'error' frame.
+    """
+    def encode(event, frame):
+        if mimetype == 'text/event-stream':
+            return f'event: {event}\ndata: {app.json.dumps(frame)}\n\n'
+        return app.json.dumps(frame) + '\n'
+
+    def generate():
+        try:
+            for event, frame in frames:
+                yield encode(event, frame)
+        except SearchCancelled:
+            yield encode('error', {'error': 'Search timed out'})
+        except Exception:
+            app.logger.exception('Streamed search failed')
+            yield encode('error', {'error': 'Internal server error'})
+
+    return Response(generate(), mimetype=mimetype, headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def search_timeout(data):
+    """
+    Read a search request's deadline.
+
+    Args:
+        data (dict): The request payload, with an optional timeoutMs field.
+
+    Returns:
+        float or None: The deadline in seconds, or None if timeoutMs is not a positive
+                       number of milliseconds up to MAX_TIMEOUT_MS.
+    """
+    timeout_ms = data.get('timeoutMs', DEFAULT_TIMEOUT_MS)
+    if isinstance(timeout_ms, bool) or not isinstance(timeout_ms, (int, float)) or not 0 < timeout_ms <= MAX_TIMEOUT_MS:
+        return None
+    return timeout_ms / 1000
+
+def request_animation_frames(data):
+    """
+    Read a search request's animationFrames field.
+
+    Args:
+        data (dict): The request's JSON payload.
+
+    Returns:
+        dict or None: The run_search keyword arguments asking for the frames, empty if the
+                      field is missing, or None if it is neither 'layer' nor a positive integer.
+    """
+    value = data.get('animationFrames')
+    if value is None:
+        return {}
+    if value == 'layer' or (isinstance(value, int) and not isinstance(value, bool) and value >= 1):
+        return {'animation_frames': value}
+    return None
+
+def request_endpoints(value):
+    """
+    Read a search request's source or target, either coordinates [x, y] or a list of them.
+
+    Args:
+        value (list or None): The payload's source or target field.
+
+    Returns:
+        tuple: (x, y), or a tuple of (x, y) tuples for a list of coordinates. Empty if the
+               field is missing or empty.
+    """
+    if value and isinstance(value[0], (list, tuple)):
+        return tuple(tuple(position) for position in value)
+    return tuple(value or ())
+
+def is_cell_set(position):
+    """
+    Check whether a source or target from request_endpoints is a list of coordinates.
+
+    Args:
+        position (tuple): Coordinates (x, y), or a tuple of them.
+
+    Returns:
+        bool: True for a tuple of coordinates.
+    """
+    return len(position) > 0 and isinstance(position[0], tuple)
+
+def endpoint_nodes(grid, position):
+    """
+    Get the node, or the list of nodes, of a source or target on a grid.
+
+    Args:
+        grid (Grid): The grid.
+        position (tuple): Coordinates (x, y), or a tuple of them (see is_cell_set).
+
+    Returns:
+        Node or list: The node, or a list of nodes in the order given.
+    """
+    if is_cell_set(position):
+        return [grid[coordinates] for coordinates in position]
+    return grid[position]
+
+def endpoints_connected(grid, source_pos, target_pos):
+    """
+    Check whether a path may join a source and a target, either of which may be a set of
+    cells, from the grid's component labels (see Grid.connected).
+
+    Args:
+        grid (Grid): The grid.
+        source_pos (tuple): Coordinates (x, y) of the source, or a tuple of them.
+        target_pos (tuple): Coordinates (x, y) of the target, or a tuple of them.
+
+    Returns:
+        bool: False if no source can reach any target.
+    """
+    sources = source_pos if is_cell_set(source_pos) else (source_pos,)
+    targets = target_pos if is_cell_set(target_pos) else (target_pos,)
+    return any(grid.connected(grid.cell_id(*source), grid.cell_id(*target)) for source in sources for target in targets)
+
+def job_response(data, timeout, search):
+    """
+    Run a search on the search threads, stopping it at its deadline.
+
+    Without async in the payload, the request waits for the search and gets its response.
+    With async, it gets the job id at once (HTTP 202) to poll at /jobs/<job_id> or cancel.
+
+    Args:
+        data (dict): The request payload, with an optional async field.
+        timeout (float): The search's deadline in seconds, see search_timeout.
+        search (callable): Called with the job's CancelToken, returns the search's Response
+            (which may be an error response, e.g. HTTP 400 for a request the search rejects).
+
+    Returns:
+        Response: The search's response or the job's state (see job_result), or HTTP 503 if
+                  too many searches are running.
+    """
+    def work(cancel):
+        with app.app_context():
+            response = search(cancel)
+            return response.get_data(), response.mimetype, response.status_code
+
+    try:
+        job = search_jobs.submit(work, timeout)
+    except JobQueueFull:
+        return jsonify({'error': 'Too many searches running, try again later'}), 503
+    if data.get('async'):
+        return jsonify(job.to_dict()), 202, {'Location': f'/jobs/{job.id}'}
+    if not job.wait(timeout):
+        job.token.cancel('timeout')
+        if not job.wait(1):  # still busy with work that does not check the token
+            return jsonify({'error': 'Search timed out', **job.to_dict()}), 504
+    return job_result(job)
+
+def job_result(job):
+    """
+    Build the response for a job's result.
+
+    Args:
+        job (Job): The job.
+
+    Returns:
+        Response: The search's response if the job is done, otherwise the job's state with
+                  HTTP 202 while it runs, 504 if it timed out, 409 if it was cancelled or
+                  500 if it failed.
+    """
+    if job.status == 'done':
+        body, mimetype, status = job.result
+        return app.response_class(body, status=status, mimetype=mimetype)
+    if job.status == 'timeout':
+        return jsonify({'error': 'Search timed out', **job.to_dict()}), 504
+    if job.status == 'cancelled':
+        return jsonify({'error': 'Search cancelled', **job.to_dict()}), 409
+    if job.status == 'failed':
+        return jsonify({'error': 'Internal server error'}), 500
+    return jsonify(job.to_dict()), 202
+
+def get_batch_pool():
+    """
+    Get the process pool that runs /batch queries, starting it on first use.
+
+    Returns:
+        ProcessPoolExecutor: The pool, with one worker per CPU.
+    """
+    global batch_pool
+    with batch_pool_lock:
+        if batch_pool is None:
+            batch_pool = ProcessPoolExecutor(max_workers=batch_workers)
+        return batch_pool
+
+def run_batch_chunk(key, grid_args, queries, deadline=None):
+    """
+    Run consecutive queries of a batch in a worker process.
+
+    The grid is built the first time a worker sees its key and kept for the worker's
+    next chunks, so each worker builds it at most once per grid.
+
+    Args:
+        key (bytes or str): Identifies the grid described by grid_args.
+        grid_args (tuple): Arguments for build_grid.
+        queries (list): Tuples (algorithm, source_pos, target_pos, options) to run.
+        deadline (float, optional): time.time() after which the searches stop. Wall clock
+            time, since time.monotonic() is not comparable across processes. Defaults to
+            None, no deadline.
+
+    Returns:
+        list: For each query, the run_search result or {'error': ...}, with the time the
+              search took in milliseconds under 'time_ms'.
+
+    Raises:
+        SearchCancelled: If the deadline passes while the grid is built.
+    """
+    global batch_grid
+    cancel = CancelToken(max(deadline - time.time(), 0)) if deadline is not None else None
+    if batch_grid is None or batch_grid[0] != key:
+        batch_grid = (key, build_grid(*grid_args, cancel=cancel))
+    grid = batch_grid[1]
+    allow_diagonal = grid_args[5]
+
+    results = []
+    for algorithm, source_pos, target_pos, options in queries:
+        start = time.perf_counter()
+        try:
+            if cancel is not None:
+                cancel.check()
+            if algorithm == 'jps' and (not allow_diagonal or 1 in grid.weighted):
+                result = {'error': 'Jump point search needs diagonal movement and no weights'}
+            else:
+                result = run_search(algorithm, grid, source_pos, target_pos, allow_diagonal, cancel=cancel, **options)
+        except SearchCancelled:
+            result = {'error': 'Search timed out'}
+        except Exception:
+            app.logger.exception('Batch query failed')
+            result = {'error': 'Search failed'}
+        result['time_ms'] = (time.perf_counter() - start) * 1000
+        results.append(result)
+    return results
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESSED_SIZE = 1024
+
+@app.after_request
+def compress_response(response):
+    """
+    Compress JSON and binary responses with brotli or gzip when the client's
+    Accept-Encoding header allows it. Streamed, small and error responses are left as they are.
+
+    Args:
+        response (Response): The response to send.
+
+    Returns:
+        Response: The response, possibly compressed.
+    """
+    if (response.is_streamed or response.direct_passthrough or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in ('application/json', BINARY_MIMETYPE)):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESSED_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    body, encoding = compress(body, request.accept_encodings)
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/astar', methods=['POST'])
 def run_astar():
     """
@@ -17,64 +829,162 @@ def run_astar():
     Expects a JSON payload with the following fields:
         - num_rows (int): Number of rows in the grid.
         - num_cols (int): Number of columns in the grid.
-        - source (list or tuple): Coordinates [x, y] of the source node.
-        - target (list or tuple): Coordinates [x, y] of the target node.
+        - source (list or tuple): Coordinates [x, y] of the source node, or a list of them to
+          search from all of them at once.
+        - target (list or tuple): Coordinates [x, y] of the target node, or a list of them to
+          stop at the nearest one.
         - walls (list): List of coordinates representing wall nodes.
         - weights (list): List of coordinates representing weighted nodes.
         - weightCost (float): The cost to traverse a weighted node.
         - allowDiagonal (bool): Whether diagonal movement is allowed.
+        - bidirectional (bool, optional): Whether to search from the source and the target
+          at once; visited then interleaves both searches (default: False).
+        - chunkSize (int, optional): Visited cells per frame when streaming (default: 256).
+        - instrument (bool, optional): Whether to return the search's work counters and
+          phase times (default: False).
+        - heuristic (str, optional): 'manhattan', 'octile' or 'euclidean' (default: 'octile'
+          with diagonal movement, 'manhattan' without). 'alt' needs a stored grid (/grids).
+        - epsilon (float, optional): Heuristic inflation factor, at least 1 (weighted A*). The
+          path costs at most epsilon times the shortest one (default: 1, or 3 with anytime).
+        - anytime (bool, optional): Whether to run ARA*: find a path with epsilon, then improve
+          it with smaller factors until it is optimal or the budget runs out (default: False).
+        - budgetMs (float, optional): Time budget of an anytime search in milliseconds.
+        - budgetExpansions (int, optional): Expansion budget of an anytime search.
+        - timeoutMs (float, optional): Deadline of the search in milliseconds, at most
+          MAX_TIMEOUT_MS (default: DEFAULT_TIMEOUT_MS).
+        - async (bool, optional): Whether to return a job at once instead of waiting for the
+          search (default: False).
+        - exploreUnreachable (bool, optional): Whether to search even when no path can join
+          the source and the target, to get the cells explored. Otherwise such requests are
+          answered at once with an empty result (default: False).
+        - trace (bool, optional): Whether to return visited and node_costs. Without them the
+          search keeps a few bits per cell instead of its full state, for large grids
+          (default: True).
+        - animationFrames (str or int, optional): Whether to also return visited grouped into
+          animation frames by the search: 'layer' for one frame per layer of cells expanded at
+          the same f cost, or a number of cells per frame. Not with trace false, bidirectional
+          or anytime.
 
     Returns:
         JSON response containing:
-            - visited (list): List of coordinates visited by the algorithm.
+            - visited (list): List of coordinates visited by the algorithm, unless trace is false.
             - path (list): List of coordinates representing the shortest path.
             - path_length (float): The length of the shortest path.
             - path_cost (float): The total cost of the shortest path.
-            - node_costs (list): List of f-costs for each visited node.
+            - node_costs (list): List of f-costs for each visited node, unless trace is false.
+            - expanded (int): Number of cells expanded.
+            - heuristic (str): The heuristic used.
+            - suboptimality_bound (float, optional): With epsilon or anytime, the factor the
+              path cost is proven to be within of the shortest path; null if an anytime
+              search found no path within its budget.
+            - iterations (list, optional): With anytime, one object per improved path with
+              epsilon, bound, path_length, expanded and time_ms.
+            - budget_exhausted (bool, optional): With anytime, whether the budget ran out
+              before the path was proven optimal.
+            - reachable (bool, optional): False if the request was answered without
+              searching because no path can join the source and the target.
+            - animation_frames (list, optional): With animationFrames, one object per frame
+              with start and end (offsets in visited, end excluded) and min_cost and max_cost
+              (the range of its node_costs), in order.
+            - reached_source, reached_target (list, optional): With a list of sources or
+              targets, the coordinates of the source the path starts from and the target it
+              reaches, or null if there is no path.
+            - stats (dict, optional): If instrumented, expanded, relaxations, heap_pushes,
+              heap_pops and heap_decrease_keys, and the milliseconds spent in each phase
+              under phases_ms.
 
-    Returns HTTP 400 if required parameters are missing, or HTTP 500 on error.
+        With an Accept header of application/x-ndjson or text/event-stream, the response is
+        streamed instead while the search runs: frames of visited and node_costs, then a
+        last frame with path, path_length and path_cost (see search_frames).
+
+        With async, HTTP 202 and the job's job_id, status and elapsed_ms instead; its result
+        is fetched from /jobs/<job_id>/result.
+
+    Returns HTTP 400 if required parameters are missing, the heuristic is unknown, the
+    epsilon, budgets or timeout are out of range, lists of sources or targets are asked
+    for with bidirectional or anytime, a search without trace is to be streamed, or
+    animationFrames is invalid or asked for with trace false, bidirectional, anytime or
+    streaming, HTTP 503 if too many searches are running, HTTP 504
+    if the search runs past its deadline, or HTTP 500 on error.
     """
     try:
         # Parse JSON request
         data = request.json
         num_rows = data.get('num_rows')
         num_cols = data.get('num_cols')
-        source_pos = tuple(data.get('source'))
-        target_pos = tuple(data.get('target'))
+        source_pos = request_endpoints(data.get('source'))
+        target_pos = request_endpoints(data.get('target'))
         walls = data.get('walls')
         weights = data.get('weights')
         weight_cost = data.get('weightCost')
         allow_diagonal = data.get('allowDiagonal')
+        bidirectional = bool(data.get('bidirectional', False))
 
         # Validate input
         if not num_rows or not num_cols or not source_pos or not target_pos:
             return jsonify({'error': 'Missing required parameters'}), 400
+        heuristic = data.get('heuristic')
+        if heuristic is not None and heuristic not in HEURISTICS:
+            return jsonify({'error': 'Unknown heuristic'}), 400
+        if heuristic == 'alt':
+            return jsonify({'error': 'The alt heuristic needs a stored grid'}), 400
+        anytime = bool(data.get('anytime', False))
+        epsilon = float(data.get('epsilon', 3 if anytime else 1))
+        budget_ms = data.get('budgetMs')
+        budget_expansions = data.get('budgetExpansions')
+        if epsilon < 1:
+            return jsonify({'error': 'epsilon must be at least 1'}), 400
+        if (budget_ms is not None and budget_ms <= 0) or (budget_expansions is not None and budget_expansions < 1):
+            return jsonify({'error': 'Budgets must be positive'}), 400
+        if bidirectional and (anytime or epsilon != 1):
+            return jsonify({'error': 'Bidirectional search does not support epsilon or anytime'}), 400
+        if (bidirectional or anytime) and (is_cell_set(source_pos) or is_cell_set(target_pos)):
+            return jsonify({'error': 'Lists of sources or targets cannot be searched bidirectionally or anytime'}), 400
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+        explore_unreachable = bool(data.get('exploreUnreachable', False))
+        trace_options = {} if data.get('trace', True) else {'trace': False}
+        frame_options = request_animation_frames(data)
+        if frame_options is None:
+            return jsonify({'error': "animationFrames must be 'layer' or a positive number of cells"}), 400
+        if frame_options and (trace_options or bidirectional or anytime):
+            return jsonify({'error': 'Animation frames need a traced, one-way, non-anytime search'}), 400
 
-        # Initialize the grid
-        grid = Grid(num_rows, num_cols, weight_cost, moves_diagonally=allow_diagonal)
+        mimetype = response_format()
+        if mimetype in STREAM_MIMETYPES:
+            chunk_size = int(data.get('chunkSize', 256))
+            if chunk_size < 1:
+                return jsonify({'error': 'chunkSize must be at least 1'}), 400
+            if trace_options:
+                return jsonify({'error': 'A search without trace cannot be streamed'}), 400
+            if frame_options:
+                return jsonify({'error': 'A streamed search is already sent in frames of chunkSize cells'}), 400
+            if anytime:
+                return jsonify({'error': 'Anytime search cannot be streamed'}), 400
+            return stream_response(mimetype, search_frames('astar', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal,
+                                                           source_pos, target_pos, chunk_size, bidirectional, heuristic, epsilon,
+                                                           CancelToken(timeout), explore_unreachable))
 
-        # Set source and target nodes
-        source_node = grid[source_pos]
-        target_node = grid[target_pos]
+        array_encoding = data.get('arrayEncoding', 'raw')
+        if array_encoding not in ARRAY_ENCODINGS:
+            return jsonify({'error': 'Unknown arrayEncoding'}), 400
 
-        # Set walls and weights
-        for wall in walls:
-            grid[wall].block()
-
-        for weight in weights:
-            grid[weight].add_weight()
+        anytime_options = {}
+        if anytime:
+            anytime_options = {'anytime': True, 'epsilon': epsilon, 'budget_ms': budget_ms, 'budget_expansions': budget_expansions}
+        elif epsilon != 1:
+            anytime_options = {'epsilon': epsilon}
 
         # Run A* algorithm
-        visited, path, path_length, path_cost = a_star(grid, source_node, target_node, moves_diagonally=allow_diagonal)
-
-        # Convert visited/path to list of tuples
-        visited_coordinates = [(node.x, node.y) for node in visited]
-        path_coordinates = [(node.x, node.y) for node in path]
-        node_costs = [node.f for node in visited]
-
-        return jsonify({'visited': visited_coordinates, 'path': path_coordinates, 'path_length': path_length, 'path_cost': path_cost, 'node_costs': node_costs})
+        instrument = bool(data.get('instrument', False))
+        return job_response(data, timeout, lambda cancel: search_response(
+            'astar', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos, mimetype, array_encoding,
+            instrument, cancel, bidirectional=bidirectional, heuristic=heuristic, explore_unreachable=explore_unreachable,
+            **anytime_options, **trace_options, **frame_options))
 
-    except Exception as e:
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/dijkstra', methods=['POST'])
@@ -85,63 +995,613 @@ def run_dijkstra():
     Expects a JSON payload with the following fields:
         - num_rows (int): Number of rows in the grid.
         - num_cols (int): Number of columns in the grid.
-        - source (list or tuple): Coordinates [x, y] of the source node.
-        - target (list or tuple): Coordinates [x, y] of the target node.
+        - source (list or tuple): Coordinates [x, y] of the source node, or a list of them,
+          as for /astar.
+        - target (list or tuple): Coordinates [x, y] of the target node, or a list of them,
+          as for /astar.
         - walls (list): List of coordinates representing wall nodes.
         - weights (list): List of coordinates representing weighted nodes.
         - weightCost (float): The cost to traverse a weighted node.
         - allowDiagonal (bool, optional): Whether diagonal movement is allowed (default: False).
+        - bidirectional (bool, optional): Whether to search from the source and the target
+          at once; visited then interleaves both searches (default: False).
+        - chunkSize (int, optional): Visited cells per frame when streaming (default: 256).
+        - instrument (bool, optional): Whether to return the search's work counters and
+          phase times, as for /astar (default: False).
+        - timeoutMs, async, exploreUnreachable, trace (optional): As for /astar.
+        - animationFrames (str or int, optional): As for /astar, with layers of cells
+          expanded at the same cost. Not with trace false or bidirectional.
 
     Returns:
         JSON response containing:
-            - visited (list): List of coordinates visited by the algorithm.
+            - visited (list): List of coordinates visited by the algorithm, unless trace is false.
             - path (list): List of coordinates representing the shortest path.
             - path_cost (float): The total cost of the shortest path.
             - path_length (float): The length of the shortest path.
-            - node_costs (list): List of costs for each visited node.
+            - node_costs (list): List of costs for each visited node, unless trace is false.
+            - expanded (int): Number of cells expanded.
+            - stats (dict, optional): If instrumented, as for /astar.
+            - reachable (bool, optional): As for /astar.
+            - animation_frames (list, optional): As for /astar.
+            - reached_source, reached_target (list, optional): As for /astar.
 
-    Returns HTTP 400 if required parameters are missing, or HTTP 500 on error.
+        Streams the response like /astar when asked to by the Accept header, or returns a
+        job like /astar with async.
+
+    Returns HTTP 400 if required parameters are missing, the timeout is out of range,
+    lists of sources or targets are asked for with bidirectional, a search without
+    trace is to be streamed, or animationFrames is invalid or asked for with trace false,
+    bidirectional or streaming, HTTP 503 if too many
+    searches are running, HTTP 504 if the search runs past its deadline, or HTTP 500 on error.
     """
     try:
         # Parse JSON request
         data = request.json
         num_rows = data.get('num_rows')
         num_cols = data.get('num_cols')
-        source_pos = tuple(data.get('source'))
-        target_pos = tuple(data.get('target'))
+        source_pos = request_endpoints(data.get('source'))
+        target_pos = request_endpoints(data.get('target'))
         walls = data.get('walls')
         weights = data.get('weights')
         weight_cost = data.get('weightCost')
         allow_diagonal = data.get('allowDiagonal', False)
+        bidirectional = bool(data.get('bidirectional', False))
 
         # Validate input
         if not num_rows or not num_cols or not source_pos or not target_pos:
             return jsonify({'error': 'Missing required parameters'}), 400
+        if bidirectional and (is_cell_set(source_pos) or is_cell_set(target_pos)):
+            return jsonify({'error': 'Lists of sources or targets cannot be searched bidirectionally'}), 400
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+        explore_unreachable = bool(data.get('exploreUnreachable', False))
+        trace_options = {} if data.get('trace', True) else {'trace': False}
+        frame_options = request_animation_frames(data)
+        if frame_options is None:
+            return jsonify({'error': "animationFrames must be 'layer' or a positive number of cells"}), 400
+        if frame_options and (trace_options or bidirectional):
+            return jsonify({'error': 'Animation frames need a traced, one-way search'}), 400
 
-        # Initialize the grid
-        grid = Grid(num_rows, num_cols, weight_cost, moves_diagonally=allow_diagonal)
+        mimetype = response_format()
+        if mimetype in STREAM_MIMETYPES:
+            chunk_size = int(data.get('chunkSize', 256))
+            if chunk_size < 1:
+                return jsonify({'error': 'chunkSize must be at least 1'}), 400
+            if trace_options:
+                return jsonify({'error': 'A search without trace cannot be streamed'}), 400
+            if frame_options:
+                return jsonify({'error': 'A streamed search is already sent in frames of chunkSize cells'}), 400
+            return stream_response(mimetype, search_frames('dijkstra', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal,
+                                                           source_pos, target_pos, chunk_size, bidirectional,
+                                                           cancel=CancelToken(timeout), explore_unreachable=explore_unreachable))
 
-        # Set source and target nodes
-        source_node = grid[source_pos]
-        target_node = grid[target_pos]
+        array_encoding = data.get('arrayEncoding', 'raw')
+        if array_encoding not in ARRAY_ENCODINGS:
+            return jsonify({'error': 'Unknown arrayEncoding'}), 400
 
-        # Set walls and weights
-        for wall in walls:
-            grid[wall].block()
+        # Run Dijkstra's algorithm
+        instrument = bool(data.get('instrument', False))
+        return job_response(data, timeout, lambda cancel: search_response(
+            'dijkstra', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos, mimetype,
+            array_encoding, instrument, cancel, bidirectional=bidirectional, explore_unreachable=explore_unreachable,
+            **trace_options, **frame_options))
 
-        for weight in weights:
-            grid[weight].add_weight()
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
 
-        # Run Dijkstra's algorithm
-        visited, path, path_cost, path_length = dijkstra(grid, source_node, target_node, moves_diagonally=allow_diagonal)
+@app.route('/jps', methods=['POST'])
+def run_jps():
+    """
+    Run Jump Point Search on a grid based on user-provided parameters.
 
-        # Convert visited/path to list of tuples
-        visited_coordinates = [(node.x, node.y) for node in visited]
-        path_coordinates = [(node.x, node.y) for node in path]
-        node_costs = [node.f for node in visited]
+    Jump Point Search is A* for grids with diagonal movement and no weighted cells that only
+    expands the cells where a shortest path can turn. It returns a path of the same cost as
+    A*, with far fewer expanded cells on open maps.
+
+    Expects a JSON payload with the following fields:
+        - num_rows (int): Number of rows in the grid.
+        - num_cols (int): Number of columns in the grid.
+        - source (list or tuple): Coordinates [x, y] of the source node.
+        - target (list or tuple): Coordinates [x, y] of the target node.
+        - walls (list): List of coordinates representing wall nodes.
+        - weights (list, optional): Must be empty.
+        - allowDiagonal (bool, optional): Must be true (default: True).
+        - scanned (bool, optional): Whether to also return the cells scanned between jump points (default: False).
+        - instrument (bool, optional): Whether to return the search's work counters and
+          phase times, as for /astar (default: False).
+        - heuristic (str, optional): As for /astar (default: 'octile').
+        - timeoutMs, async, exploreUnreachable, trace (optional): As for /astar.
+
+    Returns:
+        JSON response containing:
+            - visited (list): List of coordinates of the expanded jump points, unless trace
+              is false.
+            - path (list): List of coordinates representing the shortest path.
+            - path_length (float): The length of the shortest path.
+            - path_cost (float): The total cost of the shortest path.
+            - node_costs (list): List of f-costs for each expanded jump point, unless trace
+              is false.
+            - scanned (list, optional): List of coordinates scanned while jumping, if requested.
+            - expanded (int): Number of jump points expanded.
+            - heuristic (str): The heuristic used.
+            - stats (dict, optional): If instrumented, as for /astar.
+            - reachable (bool, optional): As for /astar.
+
+        Returns a job like /astar with async.
+
+    Returns HTTP 400 if required parameters are missing, the grid has weights or no
+    diagonal movement or the heuristic or timeout is invalid, HTTP 503 if too many
+    searches are running, HTTP 504 if the search runs past its deadline, or HTTP 500 on error.
+    """
+    try:
+        # Parse JSON request
+        data = request.json
+        num_rows = data.get('num_rows')
+        num_cols = data.get('num_cols')
+        source_pos = tuple(data.get('source'))
+        target_pos = tuple(data.get('target'))
+        walls = data.get('walls')
+        weights = data.get('weights', [])
+        weight_cost = data.get('weightCost')
+        allow_diagonal = data.get('allowDiagonal', True)
+        scanned = bool(data.get('scanned', False))
+        heuristic = data.get('heuristic')
+
+        # Validate input
+        if not num_rows or not num_cols or not source_pos or not target_pos:
+            return jsonify({'error': 'Missing required parameters'}), 400
+        if weights or not allow_diagonal:
+            return jsonify({'error': 'Jump point search needs diagonal movement and no weights'}), 400
+        if heuristic is not None and heuristic not in HEURISTICS:
+            return jsonify({'error': 'Unknown heuristic'}), 400
+        if heuristic == 'alt':
+            return jsonify({'error': 'The alt heuristic needs a stored grid'}), 400
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+        explore_unreachable = bool(data.get('exploreUnreachable', False))
+
+        array_encoding = data.get('arrayEncoding', 'raw')
+        if array_encoding not in ARRAY_ENCODINGS:
+            return jsonify({'error': 'Unknown arrayEncoding'}), 400
+
+        # Run Jump Point Search
+        mimetype = response_format(streams=False)
+        instrument = bool(data.get('instrument', False))
+        return job_response(data, timeout, lambda cancel: search_response(
+            'jps', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, target_pos, mimetype, array_encoding,
+            instrument, cancel, scanned=scanned, heuristic=heuristic, explore_unreachable=explore_unreachable,
+            **({} if data.get('trace', True) else {'trace': False})))
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/batch', methods=['POST'])
+def run_batch():
+    """
+    Run many searches over one grid in parallel worker processes.
+
+    Expects a JSON payload with the grid fields of /astar (num_rows, num_cols, walls,
+    weights, weightCost, allowDiagonal) and:
+        - queries (list): Objects with the following fields:
+            - algorithm (str): 'astar', 'dijkstra' or 'jps'.
+            - source (list or tuple): Coordinates [x, y] of the source node.
+            - target (list or tuple): Coordinates [x, y] of the target node.
+            - bidirectional (bool, optional): As for /astar and /dijkstra (default: False).
+            - scanned (bool, optional): As for /jps (default: False).
+            - heuristic (str, optional): As for /astar and /jps, except 'alt'.
+            - exploreUnreachable (bool, optional): As for /astar (default: False).
+            - trace (bool, optional): As for /astar (default: True).
+        - timeoutMs, async (optional): As for /astar. The deadline covers the whole batch.
+
+    Returns:
+        JSON response containing:
+            - results (list): One result per query, in the order of queries, with the same
+              fields as the matching endpoint plus time_ms, the search time in milliseconds.
+              A query that fails has an error field instead.
+            - time_ms (float): Time taken by the whole batch in milliseconds.
+
+        With async, returns a job like /astar.
+
+    Returns HTTP 400 if required parameters are missing, a query names an unknown
+    algorithm or heuristic, or the timeout is out of range, HTTP 503 if too many searches
+    are running, HTTP 504 if the batch runs past its deadline, or HTTP 500 on error.
+    """
+    try:
+        start = time.perf_counter()
+        data = request.json
+        num_rows = data.get('num_rows')
+        num_cols = data.get('num_cols')
+        walls = data.get('walls', [])
+        weights = data.get('weights', [])
+        weight_cost = data.get('weightCost')
+        allow_diagonal = data.get('allowDiagonal', False)
+        queries = data.get('queries')
+
+        if not num_rows or not num_cols or not queries:
+            return jsonify({'error': 'Missing required parameters'}), 400
 
-        return jsonify({'visited': visited_coordinates, 'path': path_coordinates, 'path_cost': float(path_cost), 'path_length': float(path_length), 'node_costs': node_costs})
+        batch = []
+        for query in queries:
+            algorithm = query.get('algorithm')
+            if algorithm not in ('astar', 'dijkstra', 'jps'):
+                return jsonify({'error': 'Unknown algorithm'}), 400
+            if not query.get('source') or not query.get('target'):
+                return jsonify({'error': 'Missing required parameters'}), 400
+            options = {'scanned': bool(query.get('scanned', False))} if algorithm == 'jps' else \
+                {'bidirectional': bool(query.get('bidirectional', False))}
+            options['explore_unreachable'] = bool(query.get('exploreUnreachable', False))
+            if not query.get('trace', True):
+                options['trace'] = False
+            if algorithm != 'dijkstra' and query.get('heuristic') is not None:
+                if query.get('heuristic') not in HEURISTICS or query.get('heuristic') == 'alt':
+                    return jsonify({'error': 'Unknown heuristic'}), 400
+                options['heuristic'] = query.get('heuristic')
+            batch.append((algorithm, tuple(query.get('source')), tuple(query.get('target')), options))
 
-    except Exception as e:
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+        grid_args = (num_rows, num_cols, walls, weights, weight_cost, allow_diagonal)
+
+        def search(cancel):
+            # workers keep the grid they built, so the same layout in a later batch is not rebuilt
+            key = grid_fingerprint('batch', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, (), ())
+            if key is None:
+                key = uuid.uuid4().hex
+            cancel.check()
+            pool = get_batch_pool()
+            chunk_size = -(-len(batch) // (4 * batch_workers))
+            chunks = [batch[i:i + chunk_size] for i in range(0, len(batch), chunk_size)]
+            deadline = time.time() + (cancel.deadline - time.monotonic())
+            futures = [pool.submit(run_batch_chunk, key, grid_args, chunk, deadline) for chunk in chunks]
+            pending = futures
+            try:
+                while pending:
+                    cancel.check()
+                    _, pending = wait(pending, timeout=BATCH_POLL_INTERVAL)
+            except SearchCancelled:
+                # chunks not started yet are dropped; running ones stop at the deadline
+                for future in futures:
+                    future.cancel()
+                raise
+            results = [result for future in futures for result in future.result()]
+            return jsonify({'results': results, 'time_ms': (time.perf_counter() - start) * 1000})
+
+        return job_response(data, timeout, search)
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/distance-field', methods=['POST'])
+def run_distance_field():
+    """
+    Run Dijkstra's algorithm from a source until every reachable cell is settled, and return
+    the cost and predecessor of every cell.
+
+    The field is cached on the server, so later /dijkstra requests with the same grid and
+    source are answered from it without searching, and clients can follow the
+    predecessors to any target themselves.
+
+    Expects a JSON payload with the following fields:
+        - num_rows (int): Number of rows in the grid.
+        - num_cols (int): Number of columns in the grid.
+        - source (list or tuple): Coordinates [x, y] of the source node.
+        - walls (list): List of coordinates representing wall nodes.
+        - weights (list): List of coordinates representing weighted nodes.
+        - weightCost (float): The cost to traverse a weighted node.
+        - allowDiagonal (bool, optional): Whether diagonal movement is allowed (default: False).
+        - timeoutMs, async (optional): As for /astar.
+
+    Returns:
+        JSON response containing:
+            - num_rows (int), num_cols (int), source (list): Echoed from the request.
+            - distances (str): Base64 of a little-endian float64 array with the cost from the
+              source to each cell, in cell id order x * num_cols + y; Infinity if unreachable.
+            - parents (str): Base64 of a little-endian int32 array with each cell's predecessor
+              id, -1 for the source and unreachable cells.
+            - reachable (int): Number of cells reachable from the source.
+
+        With async, returns a job like /astar.
+
+    Returns HTTP 400 if required parameters are missing or the timeout is out of range,
+    HTTP 503 if too many searches are running, HTTP 504 if the search runs past its
+    deadline, or HTTP 500 on error.
+    """
+    try:
+        data = request.json
+        num_rows = data.get('num_rows')
+        num_cols = data.get('num_cols')
+        source_pos = tuple(data.get('source'))
+        walls = data.get('walls', [])
+        weights = data.get('weights', [])
+        weight_cost = data.get('weightCost')
+        allow_diagonal = data.get('allowDiagonal', False)
+
+        if not num_rows or not num_cols or not source_pos:
+            return jsonify({'error': 'Missing required parameters'}), 400
+
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+
+        def search(cancel):
+            key = grid_fingerprint('distance_field', num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source_pos, ())
+            field = field_cache.get(key) if key is not None else None
+            if field is None:
+                grid = build_grid(num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, cancel=cancel)
+                field = DistanceField(grid, grid[source_pos], allow_diagonal, cancel)
+                if key is not None:
+                    field_cache.put(key, field)
+            return jsonify({'num_rows': num_rows, 'num_cols': num_cols, 'source': list(source_pos), **field.encode()})
+
+        return job_response(data, timeout, search)
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/cache', methods=['GET'])
+def cache_stats():
+    """
+    Report the result cache counters.
+
+    Returns:
+        JSON response containing hits, misses, evictions, entries, bytes and max_bytes, and
+        the same counters for the cached distance fields under distance_fields and the
+        reused grids under grids.
+    """
+    return jsonify({**result_cache.stats(), 'distance_fields': field_cache.stats(), 'grids': grid_cache.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_report():
+    """
+    Report search metrics in the Prometheus text format.
+
+    Returns:
+        Plain text response with the pathfinder_search_duration_seconds histogram (labelled
+        by algorithm, grid size and whether the result cache answered the request) and the
+        totals of expanded nodes, relaxations, heap operations and phase times per algorithm.
+    """
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs', methods=['GET'])
+def job_stats():
+    """
+    Report the search jobs kept by the server.
+
+    Returns:
+        JSON response mapping each job state (queued, running, done, failed, cancelled,
+        timeout) to its number of jobs, plus max_workers and max_pending.
+    """
+    return jsonify({**search_jobs.stats(), 'max_workers': search_jobs.max_workers, 'max_pending': search_jobs.max_pending})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Poll a search started with async.
+
+    Returns:
+        JSON response containing job_id, status ('queued', 'running', 'done', 'failed',
+        'cancelled' or 'timeout') and elapsed_ms. Returns HTTP 404 if the job does not exist
+        or finished more than a few minutes ago.
+    """
+    job = search_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Fetch the result of a search started with async.
+
+    Returns:
+        The search's response, in the format its request asked for, once the job is done.
+        HTTP 202 with the job's state while it is queued or running, HTTP 504 if it timed
+        out, HTTP 409 if it was cancelled, HTTP 404 if the job does not exist, or HTTP 500
+        if the search failed.
+    """
+    job = search_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return job_result(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a search, e.g. when the user starts over. A queued search never starts and a
+    running one stops within a few milliseconds.
+
+    Returns:
+        JSON response with the job's state, or HTTP 404 if the job does not exist.
+    """
+    job = search_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/grids', methods=['POST'])
+def create_grid_session():
+    """
+    Store a grid on the server so later requests only need to send changes to it.
+
+    Expects a JSON payload with the following fields:
+        - num_rows (int): Number of rows in the grid.
+        - num_cols (int): Number of columns in the grid.
+        - walls (list, optional): List of coordinates representing wall nodes.
+        - weights (list, optional): List of coordinates representing weighted nodes.
+        - weightCost (float): The cost to traverse a weighted node.
+        - allowDiagonal (bool, optional): Whether diagonal movement is allowed (default: False).
+
+    Returns:
+        JSON response containing:
+            - grid_id (str): Id of the stored grid, used by the other /grids routes.
+
+    Returns HTTP 400 if required parameters are missing, or HTTP 500 on error.
+    Idle grids are evicted after a while; the other /grids routes then return HTTP 404.
+    """
+    try:
+        data = request.json
+        num_rows = data.get('num_rows')
+        num_cols = data.get('num_cols')
+
+        if not num_rows or not num_cols:
+            return jsonify({'error': 'Missing required parameters'}), 400
+
+        grid = build_grid(num_rows, num_cols, data.get('walls', []), data.get('weights', []),
+                          data.get('weightCost'), data.get('allowDiagonal', False))
+        return jsonify({'grid_id': grid_store.create(grid)}), 201
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/grids/<grid_id>', methods=['PATCH'])
+def update_grid_session(grid_id):
+    """
+    Apply wall and weight changes to a stored grid.
+
+    Expects a JSON payload with any of the following fields:
+        - walls (dict, optional): {"add": [...], "remove": [...]} lists of coordinates.
+        - weights (dict, optional): {"add": [...], "remove": [...]} lists of coordinates.
+        - weightCost (float, optional): New cost to traverse a weighted node.
+        - allowDiagonal (bool, optional): Whether diagonal movement is allowed.
+
+    Returns:
+        JSON response containing:
+            - grid_id (str): Id of the stored grid.
+            - changes (int): Number of cell changes applied.
+
+    Returns HTTP 404 if the grid does not exist, or HTTP 500 on error.
+    """
+    try:
+        session = grid_store.get(grid_id)
+        if session is None:
+            return jsonify({'error': 'Grid not found'}), 404
+
+        data = request.json
+        walls = data.get('walls', {})
+        weights = data.get('weights', {})
+        changes = 0
+
+        with session.lock:
+            grid = session.grid
+            if 'weightCost' in data:
+                grid.set_weight_cost(data.get('weightCost'))
+            if 'allowDiagonal' in data:
+                grid.set_moves_diagonally(data.get('allowDiagonal'))
+
+            for wall in walls.get('add', []):
+                grid[wall].block()
+            for wall in walls.get('remove', []):
+                grid[wall].unblock()
+            for weight in weights.get('add', []):
+                grid[weight].add_weight()
+            for weight in weights.get('remove', []):
+                grid[weight].remove_weight()
+            changes = (len(walls.get('add', [])) + len(walls.get('remove', []))
+                       + len(weights.get('add', [])) + len(weights.get('remove', [])))
+
+        return jsonify({'grid_id': grid_id, 'changes': changes})
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/grids/<grid_id>', methods=['DELETE'])
+def delete_grid_session(grid_id):
+    """
+    Remove a stored grid.
+
+    Returns HTTP 204 on success, or HTTP 404 if the grid does not exist.
+    """
+    if not grid_store.delete(grid_id):
+        return jsonify({'error': 'Grid not found'}), 404
+    return '', 204
+
+@app.route('/grids/<grid_id>/<algorithm>', methods=['POST'])
+def run_grid_session(grid_id, algorithm):
+    """
+    Run A* ('astar'), Dijkstra's algorithm ('dijkstra'), Jump Point Search ('jps') or
+    Hierarchical Pathfinding A* ('hpa') on a stored grid.
+
+    HPA* keeps a cluster abstraction of the grid between requests, so each search only runs
+    A* over cluster entrances and refines the result inside the clusters it crosses. Its
+    paths are near-optimal rather than shortest. After a PATCH only the clusters around the
+    changed cells are rebuilt.
+
+    Expects a JSON payload with the following fields:
+        - source (list or tuple): Coordinates [x, y] of the source node.
+        - target (list or tuple): Coordinates [x, y] of the target node.
+        - incremental (bool, optional): Whether to reuse the previous search on this grid
+          (LPA*), repairing only what the changes since then affect (default: False).
+        - bidirectional (bool, optional): Whether to search from both ends at once (default: False).
+        - scanned (bool, optional): For 'jps', whether to return the scanned cells (default: False).
+        - clusterSize (int, optional): For 'hpa', the side of a cluster in cells (default: 16).
+          Changing it rebuilds the abstraction.
+        - instrument (bool, optional): Whether to return the search's work counters and
+          phase times, as for /astar (default: False).
+        - heuristic (str, optional): For 'astar' and 'jps', as for /astar. 'alt' (ALT, A* with
+          landmarks) precomputes distances from a few landmark cells on first use and after
+          changes, then bounds the cost to the target much more tightly around walls.
+        - exploreUnreachable (bool, optional): As for /astar. Incremental and 'hpa' runs
+          always search.
+        - timeoutMs, async (optional): As for /astar. Incremental and 'hpa' runs stopped at
+          their deadline keep the work done so far for the next run.
+
+    Returns:
+        JSON response with the same fields as /astar and /dijkstra. Incremental runs only
+        list the cells expanded by this run in visited, and also return:
+            - expanded (int): Number of cells expanded by this run.
+            - full_search_expanded (int): Number of cells expanded by the last run that
+              started from scratch, for comparison.
+        'hpa' runs list the expanded abstract nodes in visited, and also return:
+            - abstract_expanded (int): Number of abstract nodes (entrances) expanded.
+            - refined_expanded (int): Number of cells expanded turning the abstract path into cells.
+            - clusters_rebuilt (int): Number of clusters rebuilt after changes to the grid.
+
+        With async, returns a job like /astar.
+
+    Returns HTTP 400 if required parameters are missing, the heuristic is unknown, the
+    timeout is out of range, or the source or target of an incremental or 'hpa' run is a
+    wall, HTTP 404 if the grid or algorithm does not exist, HTTP 503 if too many searches
+    are running, HTTP 504 if the search runs past its deadline, or HTTP 500 on error.
+    """
+    try:
+        if algorithm not in ('astar', 'dijkstra', 'jps', 'hpa'):
+            return jsonify({'error': 'Unknown algorithm'}), 404
+
+        session = grid_store.get(grid_id)
+        if session is None:
+            return jsonify({'error': 'Grid not found'}), 404
+
+        data = request.json
+        source_pos = data.get('source')
+        target_pos = data.get('target')
+        array_encoding = data.get('arrayEncoding', 'raw')
+        if not source_pos or not target_pos:
+            return jsonify({'error': 'Missing required parameters'}), 400
+        if array_encoding not in ARRAY_ENCODINGS:
+            return jsonify({'error': 'Unknown arrayEncoding'}), 400
+        heuristic = data.get('heuristic')
+        if heuristic is not None and heuristic not in HEURISTICS:
+            return jsonify({'error': 'Unknown heuristic'}), 400
+
+        if algorithm == 'hpa' and int(data.get('clusterSize', 16)) < 1:
+            return jsonify({'error': 'clusterSize must be at least 1'}), 400
+        timeout = search_timeout(data)
+        if timeout is None:
+            return jsonify({'error': f'timeoutMs must be between 0 and {MAX_TIMEOUT_MS}'}), 400
+
+        mimetype = response_format(streams=False)
+        return job_response(data, timeout, lambda cancel: search_grid_session(
+            session, algorithm, tuple(source_pos), tuple(target_pos), data, mimetype, array_encoding, cancel))
+
+    except Exception:
+        app.logger.exception('Request to %s failed', request.path)
+        return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,90 @@
+"""
+Compare the size and serialization time of the search response formats.
+
+Runs Dijkstra's algorithm across open grids of several sizes, so nearly every cell is
+visited, and encodes the result as JSON and in the binary format with each cell array
+encoding, uncompressed and with gzip and brotli (if installed).
+
+Usage:
+    python benchmarks/encoding.py [--sizes 100 300 600] [--repeat 3] [--json]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import app, build_grid, run_search
+from response_encoding import ARRAY_ENCODINGS, brotli, encode_result
+
+def _timed(function, repeat):
+    """
+    Run a function several times and keep the fastest run.
+
+    Args:
+        function (callable): The function to run, without arguments.
+        repeat (int): Number of runs.
+
+    Returns:
+        tuple: (result, seconds) of the fastest run.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[1]:
+            best = (result, elapsed)
+    return best
+
+def benchmark(size, repeat):
+    """
+    Measure every response format for one grid size.
+
+    Args:
+        size (int): Number of rows and columns of the grid.
+        repeat (int): Number of runs per measurement.
+
+    Returns:
+        list: Rows of {'size', 'format', 'compression', 'bytes', 'ms'}, where ms is the
+              time to serialize and compress.
+    """
+    grid = build_grid(size, size, [], [], 5, False)
+    result = run_search('dijkstra', grid, (0, 0), (size - 1, size - 1), False)
+
+    formats = {'json': lambda: app.json.dumps(result).encode()}
+    for array_encoding in ARRAY_ENCODINGS:
+        formats[f'binary-{array_encoding}'] = lambda array_encoding=array_encoding: encode_result(result, size, array_encoding)
+    compressions = {'none': lambda body: body, 'gzip': lambda body: gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        compressions['br'] = lambda body: brotli.compress(body, quality=5)
+
+    rows = []
+    for name, serialize in formats.items():
+        body, serialize_time = _timed(serialize, repeat)
+        for compression, compress in compressions.items():
+            compressed, compress_time = _timed(lambda: compress(body), repeat)
+            rows.append({'size': size, 'format': name, 'compression': compression,
+                         'bytes': len(compressed), 'ms': round((serialize_time + compress_time) * 1000, 2)})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 600], help='grid sizes to test')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the fastest is kept')
+    parser.add_argument('--json', action='store_true', help='print the rows as JSON')
+    args = parser.parse_args()
+
+    rows = [row for size in args.sizes for row in benchmark(size, args.repeat)]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'size':>6} {'format':<14} {'compression':<12} {'bytes':>12} {'ms':>10}")
+    for row in rows:
+        print(f"{row['size']:>6} {row['format']:<14} {row['compression']:<12} {row['bytes']:>12} {row['ms']:>10}")
+
+if __name__ == '__main__':
+    main()
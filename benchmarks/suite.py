@@ -0,0 +1,369 @@
+"""
+Benchmark the search algorithms, PriorityQueue and Grid across reproducible map families.
+
+Each map family (open field, random walls at several densities, mazes, weighted swamps) is
+generated from a fixed seed for every size, with 4-way and 8-way movement, and every
+algorithm that supports the map is run from the free cell nearest the top left corner to
+the one nearest the bottom right corner. For each run the suite records wall time,
+expanded nodes, heap operations and peak traced memory. Grid construction and the
+priority queues are also measured on their own.
+
+Results are printed as JSON. With --compare, they are checked against a saved run and
+every case slower, expanding more nodes or using more memory than the threshold allows is
+reported as a regression (exit status 1).
+
+Usage:
+    python benchmarks/suite.py --sizes 50 200 --save baseline.json
+    python benchmarks/suite.py --sizes 50 200 --compare baseline.json [--threshold 0.15]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import priority_queue
+import search_algorithms
+from grid import Grid
+
+FAMILIES = ['open', 'walls-10', 'walls-25', 'walls-40', 'maze', 'swamp']
+ALGORITHMS = {
+    'astar': search_algorithms.a_star,
+    'dijkstra': search_algorithms.dijkstra,
+    'bidirectional_astar': search_algorithms.bidirectional_a_star,
+    'bidirectional_dijkstra': search_algorithms.bidirectional_dijkstra,
+    'jps': lambda grid, source, target, moves_diagonally: search_algorithms.jump_point_search(grid, source, target),
+}
+# Fields compared against the baseline, with the relative tolerance each one gets on top
+# of --threshold (expansions and memory are deterministic, times are noisy)
+COMPARED = {'time_ms': 1.0, 'expanded': 0.0, 'heap_ops': 0.0, 'peak_kb': 0.5}
+
+class CountingPriorityQueue(priority_queue.PriorityQueue):
+    """
+    A PriorityQueue that counts its operations, substituted for the real one while counting.
+    """
+    counts = {'push': 0, 'pop': 0, 'update': 0}
+
+    def insert(self, node, priority=None):
+        self.counts['push'] += 1
+        super().insert(node, priority)
+
+    def pop(self):
+        self.counts['pop'] += 1
+        return super().pop()
+
+    def update_priority(self, node, new_priority):
+        self.counts['update'] += 1
+        super().update_priority(node, new_priority)
+
+class CountingBucketQueue(priority_queue.BucketQueue):
+    """
+    A BucketQueue that counts its operations, substituted for the real one while counting.
+    """
+    counts = CountingPriorityQueue.counts
+
+    def insert(self, node, priority):
+        self.counts['push'] += 1
+        super().insert(node, priority)
+
+    def pop(self):
+        self.counts['pop'] += 1
+        return super().pop()
+
+    def update_priority(self, node, new_priority):
+        self.counts['update'] += 1
+        super().update_priority(node, new_priority)
+
+def generate_map(family, size, seed=0):
+    """
+    Generate the walls and weighted cells of a map.
+
+    Args:
+        family (str): One of FAMILIES.
+        size (int): Number of rows and columns.
+        seed (int, optional): Random seed; the same family, size and seed always give the
+            same map. Defaults to 0.
+
+    Returns:
+        tuple: (walls, weights), two lists of cell ids.
+    """
+    rng = random.Random(f'{family}-{size}-{seed}')
+    cells = size * size
+    if family == 'open':
+        return [], []
+    if family.startswith('walls-'):
+        density = int(family.split('-')[1]) / 100
+        return [cell for cell in range(cells) if rng.random() < density], []
+    if family == 'maze':
+        return _maze(size, rng), []
+    if family == 'swamp':
+        weighted = set()
+        for _ in range(max(1, cells // 400)):
+            cx, cy, radius = rng.randrange(size), rng.randrange(size), rng.randint(2, max(2, size // 10))
+            for x in range(max(0, cx - radius), min(size, cx + radius + 1)):
+                for y in range(max(0, cy - radius), min(size, cy + radius + 1)):
+                    if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
+                        weighted.add(x * size + y)
+        walls = [cell for cell in range(cells) if cell not in weighted and rng.random() < 0.05]
+        return walls, sorted(weighted)
+    raise ValueError(f'Unknown map family {family!r}')
+
+def _maze(size, rng):
+    """
+    Carve a maze with an iterative depth-first search; passages run between even cells.
+
+    Args:
+        size (int): Number of rows and columns.
+        rng (Random): The random generator.
+
+    Returns:
+        list: The wall cell ids.
+    """
+    blocked = bytearray([1]) * (size * size)
+    blocked[0] = 0
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, x + dx // 2, y + dy // 2) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 <= x + dx < size and 0 <= y + dy < size and blocked[(x + dx) * size + y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, wx, wy = rng.choice(options)
+        blocked[nx * size + ny] = 0
+        blocked[wx * size + wy] = 0
+        stack.append((nx, ny))
+    return [cell for cell in range(size * size) if blocked[cell]]
+
+def build_grid(size, walls, weights, moves_diagonally):
+    """
+    Build a compact grid through the Grid API, as the app does.
+
+    Args:
+        size (int): Number of rows and columns.
+        walls (list): Wall cell ids.
+        weights (list): Weighted cell ids.
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+
+    Returns:
+        Grid: The grid.
+    """
+    grid = Grid(size, size, 5, moves_diagonally=moves_diagonally, compact=True)
+    for cell in walls:
+        grid.set_blocked(divmod(cell, size), True)
+    for cell in weights:
+        grid.set_weighted(divmod(cell, size), True)
+    return grid
+
+def _endpoint(grid, corner):
+    """
+    Find the free cell nearest to a corner, scanning anti-diagonals outwards.
+
+    Args:
+        grid (Grid): The grid.
+        corner (tuple): The (x, y) corner.
+
+    Returns:
+        Node: The free cell's node.
+    """
+    size = grid.num_rows
+    sx = 1 if corner[0] == 0 else -1
+    sy = 1 if corner[1] == 0 else -1
+    for distance in range(2 * size):
+        for dx in range(distance + 1):
+            x, y = corner[0] + sx * dx, corner[1] + sy * (distance - dx)
+            if grid.is_valid(x, y) and not grid.blocked[grid.cell_id(x, y)]:
+                return grid[(x, y)]
+    raise ValueError('The grid has no free cell')
+
+def run_case(name, grid, moves_diagonally, repeat):
+    """
+    Benchmark one algorithm on one grid.
+
+    The fastest of repeat runs gives the time; one more run with counting queues and
+    tracemalloc gives the heap operations and peak memory.
+
+    Args:
+        name (str): Key of ALGORITHMS.
+        grid (Grid): The grid.
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        dict: time_ms, expanded, path_cost, heap_ops, heap (push, pop, update) and peak_kb.
+    """
+    search = ALGORITHMS[name]
+    source = _endpoint(grid, (0, 0))
+    target = _endpoint(grid, (grid.num_rows - 1, grid.num_cols - 1))
+    grid.adjacency(moves_diagonally)  # built once per grid, not part of the search time
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = search(grid, source, target, moves_diagonally)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    counts = CountingPriorityQueue.counts
+    for key in counts:
+        counts[key] = 0
+    originals = search_algorithms.PriorityQueue, search_algorithms.BucketQueue
+    search_algorithms.PriorityQueue, search_algorithms.BucketQueue = CountingPriorityQueue, CountingBucketQueue
+    tracemalloc.start()
+    try:
+        search(grid, source, target, moves_diagonally)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        search_algorithms.PriorityQueue, search_algorithms.BucketQueue = originals
+
+    visited, path = result[0], result[1]
+    path_cost = result[3] if name in ('astar', 'bidirectional_astar', 'jps') else result[2]
+    return {'time_ms': round(best * 1000, 3), 'expanded': len(visited), 'path_found': bool(path),
+            'path_cost': float(path_cost), 'heap_ops': sum(counts.values()), 'heap': dict(counts),
+            'peak_kb': round(peak / 1024, 1)}
+
+def run_priority_queues(size, repeat):
+    """
+    Benchmark the priority queues on their own: size inserts, size // 4 decrease-keys and
+    size pops with Dijkstra-like integer priorities.
+
+    Args:
+        size (int): Number of elements.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        list: One result row per queue.
+    """
+    rng = random.Random(size)
+    priorities = [rng.randint(0, 4) for _ in range(size)]
+    priorities[0] = 0  # a bucket queue starts at its first priority
+    updates = rng.sample(range(size), size // 4)
+    rows = []
+    for name, make in (('PriorityQueue', priority_queue.PriorityQueue), ('BucketQueue', lambda: priority_queue.BucketQueue(5))):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queue = make()
+            for item, priority in enumerate(priorities):
+                queue.insert(item, priority)
+            for item in updates:
+                queue.update_priority(item, max(priorities[item] - 1, 0))
+            while len(queue) > 0:
+                queue.pop()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({'component': name, 'size': size, 'time_ms': round(best * 1000, 3)})
+    return rows
+
+def run_suite(sizes, families, algorithms, repeat):
+    """
+    Run every benchmark.
+
+    Args:
+        sizes (list): Grid sizes.
+        families (list): Map families, see FAMILIES.
+        algorithms (list): Algorithm names, see ALGORITHMS.
+        repeat (int): Number of timed runs per case.
+
+    Returns:
+        dict: 'meta' with the environment and 'results' with one row per case.
+    """
+    results = []
+    for size in sizes:
+        for family in families:
+            walls, weights = generate_map(family, size)
+            for moves_diagonally in (False, True):
+                start = time.perf_counter()
+                grid = build_grid(size, walls, weights, moves_diagonally)
+                grid.adjacency(moves_diagonally)
+                build_ms = round((time.perf_counter() - start) * 1000, 3)
+                case = {'family': family, 'size': size, 'moves': 8 if moves_diagonally else 4}
+                results.append(dict(case, component='Grid', time_ms=build_ms))
+                for name in algorithms:
+                    if name == 'jps' and (not moves_diagonally or weights):
+                        continue
+                    row = run_case(name, grid, moves_diagonally, repeat)
+                    results.append(dict(case, component=name, **row))
+                    print(f"{family:>9} {size:>5} {case['moves']}-way {name:<22} {row['time_ms']:>10.1f} ms "
+                          f"{row['expanded']:>9} expanded", file=sys.stderr)
+        results.extend(run_priority_queues(size * size, repeat))
+
+    meta = {'python': platform.python_version(), 'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sizes': sizes, 'repeat': repeat}
+    return {'meta': meta, 'results': results}
+
+def _case_key(row):
+    """
+    Identify a result row across runs.
+
+    Args:
+        row (dict): A result row.
+
+    Returns:
+        tuple: The family, size, movement and component of the row.
+    """
+    return row.get('family'), row['size'], row.get('moves'), row['component']
+
+def compare(baseline, current, threshold):
+    """
+    Find the cases that got worse than the baseline.
+
+    Args:
+        baseline (dict): A saved run_suite result.
+        current (dict): A new run_suite result.
+        threshold (float): Allowed relative increase, e.g. 0.1 for 10%. Times get twice
+            this, and memory one and a half times, since they vary between runs.
+
+    Returns:
+        list: Regressions as {'case', 'field', 'baseline', 'current', 'change'}.
+    """
+    saved = {_case_key(row): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = saved.get(_case_key(row))
+        if old is None:
+            continue
+        for field, extra in COMPARED.items():
+            if field not in row or field not in old:
+                continue
+            allowed = old[field] * (1 + threshold * (1 + extra))
+            if row[field] > allowed and row[field] - old[field] > 1e-9:
+                change = (row[field] - old[field]) / old[field] if old[field] else float('inf')
+                regressions.append({'case': '/'.join(str(part) for part in _case_key(row) if part is not None),
+                                    'field': field, 'baseline': old[field], 'current': row[field],
+                                    'change': round(change, 3)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500],
+                        help='grid sizes (rows = columns), up to 2000')
+    parser.add_argument('--families', nargs='+', default=FAMILIES, choices=FAMILIES, help='map families')
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=list(ALGORITHMS), help='algorithms')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case, the fastest is kept')
+    parser.add_argument('--save', help='write the results to this file')
+    parser.add_argument('--compare', help='flag regressions against results saved with --save')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed relative increase (default 0.1)')
+    args = parser.parse_args()
+
+    current = run_suite(args.sizes, args.families, args.algorithms, args.repeat)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(current, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, current, args.threshold)
+        print(json.dumps({'regressions': regressions, 'results': current['results']}, indent=2))
+        sys.exit(1 if regressions else 0)
+    print(json.dumps(current, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from search_algorithms import dijkstra_distance_field, dijkstra_path_metrics
+from array import array
+import base64
+import sys
+
+class DistanceField:
+    def __init__(self, grid, source, moves_diagonally=False, cancel=None):
+        """
+        Initialize a DistanceField, the result of Dijkstra's algorithm run from one source
+        until every reachable cell is settled.
+
+        Once built, the shortest path to any target is read from the predecessor map in
+        O(path length), and dijkstra's full result for a target can be rebuilt without
+        searching again.
+
+        Args:
+            grid (Grid): The grid to search. It is kept for computing path metrics, so it
+                should not be changed afterwards.
+            source (Node): The starting node.
+            moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+            cancel (CancelToken, optional): Token the search checks to stop early, see
+                dijkstra_distance_field. Defaults to None.
+
+        Attributes:
+            grid (Grid): The grid that was searched.
+            source_id (int): The source cell id.
+            moves_diagonally (bool): Whether diagonal movement is allowed.
+            order (array): Ids of the reachable cells in the order Dijkstra's algorithm expanded them.
+            distances (array): Cost from the source to each cell, infinity if unreachable.
+            parents (array): Predecessor of each cell on its shortest path, -1 for the source
+                             and unreachable cells.
+            rank (array): Position of each cell in order, -1 if unreachable.
+        """
+        self.grid = grid
+        self.source_id = grid.cell_id(source.x, source.y)
+        self.moves_diagonally = moves_diagonally
+        self.order, self.distances, self.parents = dijkstra_distance_field(grid, source, moves_diagonally, cancel)
+        self.rank = array('l', [-1]) * len(grid)
+        for i, cell in enumerate(self.order):
+            self.rank[cell] = i
+        # the tables are rebuilt on demand and would only take up memory in the cache
+        grid.adjacency_tables.clear()
+
+    def __len__(self):
+        """
+        Return the approximate memory used by the field and its grid, in bytes.
+
+        Returns:
+            int: The size in bytes, used to bound the cache holding the field.
+        """
+        arrays = (self.order, self.distances, self.parents, self.rank)
+        return sum(a.itemsize * len(a) for a in arrays) + self.grid.memory_size()
+
+    def path_to(self, target_id):
+        """
+        Get the shortest path from the source to a cell.
+
+        Args:
+            target_id (int): The target cell id.
+
+        Returns:
+            list: Cell ids from source to target (inclusive), or an empty list if the target
+                  is unreachable.
+        """
+        if self.rank[target_id] < 0:
+            return []
+        path = [target_id]
+        while path[-1] != self.source_id:
+            path.append(self.parents[path[-1]])
+        path.reverse()
+        return path
+
+    def dijkstra(self, target):
+        """
+        Rebuild the result dijkstra would return for a target, without searching.
+
+        Args:
+            target (Node): The goal node.
+
+        Returns:
+            tuple: The same (visited_ordered, path, path_cost, path_length) as dijkstra.
+        """
+        grid = self.grid
+        target_id = grid.cell_id(target.x, target.y)
+        if target_id == self.source_id:
+            return []
+        rank = self.rank[target_id]
+        visited = self.order if rank < 0 else self.order[:rank + 1]
+        visited_nodes = [self._node(cell) for cell in visited]
+        if rank < 0:
+            return visited_nodes, [], 0, 0
+        path = self.path_to(target_id)
+        path_cost, path_length = dijkstra_path_metrics(grid, path, self.moves_diagonally)
+        path_nodes = [self._node(cell) for cell in path]
+        # set last, since grids that keep Node objects hand out the same target node twice
+        visited_nodes[-1].f = path_nodes[-1].f = 0
+        return visited_nodes, path_nodes, path_cost, path_length
+
+    def encode(self):
+        """
+        Encode the distances and predecessors as base64 little-endian arrays.
+
+        Returns:
+            dict: 'distances' (float64 per cell, Infinity if unreachable) and 'parents'
+                  (int32 per cell, -1 for the source and unreachable cells), both in cell id
+                  order x * num_cols + y, plus the number of reachable cells ('reachable').
+        """
+        distances = array('d', self.distances)
+        parents = array('i', self.parents)
+        if sys.byteorder != 'little':
+            distances.byteswap()
+            parents.byteswap()
+        return {'distances': base64.b64encode(distances.tobytes()).decode('ascii'),
+                'parents': base64.b64encode(parents.tobytes()).decode('ascii'),
+                'reachable': len(self.order)}
+
+    def _node(self, cell):
+        """
+        Build the Node for a settled cell, with f set to its distance like dijkstra's nodes.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            Node: The Node.
+        """
+        node = self.grid.node(cell)
+        node.f = self.distances[cell]
+        return node
@@ -11,6 +11,10 @@ function App() {
   ? "http://127.0.0.1:5000"
   : import.meta.env.VITE_API_URL;
 
+  // A* expands whole regions at the same f cost, so its frames are fixed-size batches
+  // instead of the cost layers Dijkstra's wavefront is shown in
+  const ASTAR_FRAME_SIZE = 8;
+
   const [selectedTool, setSelectedTool] = useState(null);
   const [animationSpeed, setAnimationSpeed] = useState(50);
   const [weightCost, setWeightCost] = useState(5);
@@ -173,7 +177,8 @@ function App() {
           fetch(fetch_link, {
               method: "POST",
               headers: { "Content-Type": "application/json" },
-              body: JSON.stringify({ num_rows, num_cols, source, target, walls, weights, weightCost, allowDiagonal })
+              body: JSON.stringify({ num_rows, num_cols, source, target, walls, weights, weightCost, allowDiagonal,
+                                     animationFrames: selectedAlgorithm === "Dijkstra's" ? "layer" : ASTAR_FRAME_SIZE })
           })
           .then(response => response.json())
           .then(data => {
@@ -182,7 +187,7 @@ function App() {
               setPathLength(data.path_length);
               setVisited(data.visited);
               setNodeCosts(data.node_costs);
-              animatePath(data.visited, data.path, animationSpeed);
+              animatePath(data.visited, data.path, data.animation_frames);
           })
           .catch(error => console.error("Error running search algorithm:", error));
           setSelectedTool(null);
@@ -24,6 +24,7 @@ const Grid = ({ selectedTool, animationSpeed, onRun, onMissingVars, onToolUpdate
     const [isRunning, setIsRunning] = useState(false);
     const [lastVisited, setLastVisited] = useState([]);
     const [lastPath, setLastPath] = useState([]);
+    const [lastFrames, setLastFrames] = useState(null);
     const [warningMessage, setWarningMessage] = useState("");
 
     const visitedNodesRef = useRef(new Set());
@@ -257,66 +258,76 @@ const Grid = ({ selectedTool, animationSpeed, onRun, onMissingVars, onToolUpdate
         );
     }, []);
 
+    /**
+     * Marks a group of nodes on the grid in a single grid update.
+     *
+     * @param {Array} nodes - Array of [row, col] for the nodes to mark.
+     * @param {string} type - Class added to the nodes' type ("visited" or "path").
+     */
+    const markNodes = useCallback((nodes, type) => {
+        const rows = new Map();
+        nodes.forEach(node => {
+            if (!rows.has(node[0])) rows.set(node[0], new Set());
+            rows.get(node[0]).add(node[1]);
+        });
+        setGrid(prevGrid =>
+            prevGrid.map((r, rIdx) =>
+                rows.has(rIdx)
+                    ? r.map((cell, cIdx) => rows.get(rIdx).has(cIdx) ? { ...cell, type: `${cell.type} ${type}` } : cell)
+                    : r
+            )
+        );
+    }, []);
+
     /**
      * Animates the visited nodes and the shortest path on the grid.
      * Locks grid interactions during animation.
      *
+     * Visited nodes are shown one frame at a time, with a single pending timer: each frame
+     * waits as long as its nodes would take one by one before the next one is shown.
+     *
      * @param {Array} visited - Array of [row, col] for visited nodes.
      * @param {Array} path - Array of [row, col] for path nodes.
+     * @param {Array} frames - Frames of visited from the search, each with the start and end
+     *     offsets of its nodes, or null to show the nodes one by one.
      */
-    const animatePath = useCallback((visited, path) => {
+    const animatePath = useCallback((visited, path, frames) => {
         clearAnimations();
         setIsRunning(true);
 
         setLastVisited(visited); // Store for restart
         setLastPath(path);
+        setLastFrames(frames);
 
         visitedNodesRef.current.clear();
         pathNodesRef.current.clear();
 
-        visited.forEach((node, index) => {
-            if (!visitedNodesRef.current.has(`${node[0]},${node[1]}`)) {
-                visitedNodesRef.current.add(`${node[0]},${node[1]}`); 
+        visited.forEach(node => visitedNodesRef.current.add(`${node[0]},${node[1]}`));
+        const groups = frames ? frames.map(frame => visited.slice(frame.start, frame.end)) : visited.map(node => [node]);
+        const nodeDelay = () => (201 - animationSpeedRef.current) / 2;
+        const schedule = (step, delay) => animationTimeouts.current.push(setTimeout(step, delay));
+
+        const showPathNode = (index) => {
+            markNodes([path[index]], "path");
+            // Once the last path node is animated, unlock interactions
+            if (index === path.length - 1) schedule(() => setIsRunning(false), nodeDelay());
+            else schedule(() => showPathNode(index + 1), 2 * nodeDelay());
+        };
+
+        const showFrame = (index) => {
+            if (index < groups.length) {
+                markNodes(groups[index], "visited");
+                schedule(() => showFrame(index + 1), groups[index].length * nodeDelay());
+            } else if (path.length === 0) {
+                showWarning("No path was found.");
+            } else {
+                path.forEach(node => pathNodesRef.current.add(`${node[0]},${node[1]}`));
+                showPathNode(0);
             }
-            const timeout = setTimeout(() => {
-                setGrid(prevGrid =>
-                    prevGrid.map((r, rIdx) =>
-                        r.map((cell, cIdx) =>
-                            rIdx === node[0] && cIdx === node[1] ? {...cell, type: `${cell.type} visited` } : cell
-                        )
-                    )
-                );
-            }, index * (201 - animationSpeedRef.current) / 2);
-            animationTimeouts.current.push(timeout);
-        });
+        };
 
-        const pathTimeout = setTimeout(() => {
-            if (path.length === 0) showWarning("No path was found.");
-            path.forEach((node, index) => {
-                if (!pathNodesRef.current.has(`${node[0]},${node[1]}`)) {
-                    pathNodesRef.current.add(`${node[0]},${node[1]}`);
-                }
-                const timeout = setTimeout(() => {
-                    setGrid(prevGrid =>
-                        prevGrid.map((r, rIdx) =>
-                            r.map((cell, cIdx) =>
-                                rIdx === node[0] && cIdx === node[1] ? { ...cell, type: `${cell.type} path` } : cell
-                            )
-                        )
-                    );
-                    // Once the last path node is animated, unlock interactions
-                    if (index === path.length - 1) {
-                        const isRunningTimeout = setTimeout(() => {
-                            setIsRunning(false);
-                        }, (201 - animationSpeedRef.current) / 2);
-                        animationTimeouts.current.push(isRunningTimeout);
-                    }
-                }, index * (201 - animationSpeedRef.current));
-                animationTimeouts.current.push(timeout);
-            });
-        }, visited.length * (201 - animationSpeedRef.current) / 2);
-        animationTimeouts.current.push(pathTimeout);
-    }, [clearAnimations]);
+        schedule(() => showFrame(0), 0);
+    }, [clearAnimations, markNodes]);
 
     /**
      * Displays a temporary warning popup with the provided message.
@@ -382,10 +393,10 @@ const Grid = ({ selectedTool, animationSpeed, onRun, onMissingVars, onToolUpdate
         
         if (selectedTool === "replay") {
             clearAnimations();
-            animatePath(lastVisited, lastPath);
+            animatePath(lastVisited, lastPath, lastFrames);
             onToolUpdate(null);
         }
-    }, [selectedTool, lastVisited, lastPath, animatePath, clearAnimations, onToolUpdate]);
+    }, [selectedTool, lastVisited, lastPath, lastFrames, animatePath, clearAnimations, onToolUpdate]);
 
     /**
      * Resets the grid and all states when the "restart" tool is selected.
@@ -1,35 +1,101 @@
 from node import Node
+from array import array
+from scipy import ndimage
+import numpy as np
 import math
 
+# (row step, column step) of each neighbor slot: left, right, up, down, then the diagonals
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+# Index of the direction pointing back, e.g. the neighbor to the left sees this cell on its right
+OPPOSITE_DIRECTIONS = [1, 0, 3, 2, 7, 6, 5, 4]
+
 class Grid:
-    def __init__(self, num_rows, num_cols, weight_cost=5, moves_diagonally=False):
+    def __init__(self, num_rows, num_cols, weight_cost=5, moves_diagonally=False, compact=False):
         """
         Initialize a Grid object representing a 2D grid of nodes.
 
+        Cell state lives in flat arrays addressed by the cell id x * num_cols + y. In the
+        default mode a Node object is also kept for every cell; in compact mode Node objects
+        are only built on demand, so memory scales with the arrays rather than with the
+        number of Python objects.
+
+        The search arrays (g, h, f and parent) are allocated by the first call to
+        begin_search(), so a grid only searched without them (see
+        search_algorithms.a_star_untraced) never holds them. They are not reset between
+        searches. Each search calls begin_search() for a new generation and stamps the cells
+        it reaches; a cell whose stamp is older counts as unvisited, so one grid can serve
+        any number of searches without an O(rows * cols) reset.
+
+        The grid also keeps a connected-component label per cell (see connected()), so
+        searches between cells that no path joins can be skipped. Labels are computed in
+        bulk on first use, merged with union-find when a wall is removed, and kept when a
+        wall is added unless the wall splits its component, in which case only the pieces
+        cut off are relabelled.
+
         Args:
             num_rows (int): Number of rows in the grid.
             num_cols (int): Number of columns in the grid.
             weight_cost (float, optional): The cost to traverse a weighted node. Defaults to 5.
             moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+            compact (bool, optional): Whether to skip allocating a Node object per cell. Defaults to False.
 
         Attributes:
             num_rows (int): Number of rows in the grid.
             num_cols (int): Number of columns in the grid.
             weight_cost (float): The cost to traverse a weighted node.
             moves_diagonally (bool): Whether diagonal movement is allowed.
-            grid (dict): Nested dictionary storing Node objects, accessed as grid[x][y].
+            compact (bool): Whether Node objects are built on demand.
+            grid (dict or None): Nested dictionary storing Node objects, accessed as grid[x][y].
+                                 None in compact mode.
+            blocked (bytearray): 1 for each cell that is a wall.
+            weighted (bytearray): 1 for each cell that is weighted.
+            g (array or None): Cost from source to each cell, written by the search
+                               algorithms. None until the first begin_search(), like the
+                               other search arrays.
+            h (array or None): Heuristic cost from each cell to the target.
+            f (array or None): Total cost of each cell.
+            parent (array or None): Id of each cell's parent in the search tree, or -1.
+            stamp (array or None): Generation stamp of each cell: the search's generation
+                                   once the cell has been reached, generation + 1 once it
+                                   has been expanded.
+            generation (int): Generation of the current search, see begin_search().
+            adjacency_tables (dict): Adjacency tables keyed by movement mode, see adjacency().
+            components (ndarray or None): Component label of each cell, 0 for walls, or None
+                                          until labels are first needed.
+            component_parents (list): Union-find parent of each label; labels merged after
+                                      a wall was removed share a root.
+            observers (list): Objects whose grid_changed(cell) method is called after a cell's
+                              wall or weight status changes, with cell None when the weight
+                              cost or movement mode changes.
         """
         self.num_rows = num_rows
         self.num_cols = num_cols
         self.weight_cost = weight_cost
         self.moves_diagonally = moves_diagonally
-        self.grid = {}
+        self.compact = compact
+
+        size = num_rows * num_cols
+        self.blocked = bytearray(size)
+        self.weighted = bytearray(size)
+        self.g = None
+        self.h = None
+        self.f = None
+        self.parent = None
+        self.stamp = None
+        self.generation = 0
+        self.adjacency_tables = {}
+        self.components = None
+        self.component_parents = []
+        self.observers = []
+
+        self.grid = None
+        if not compact:
+            self.grid = {}
+            for x in range(num_rows):
+                self.grid[x] = {}
+                for y in range(num_cols):
+                    self.grid[x][y] = Node(x, y, self)
 
-        for x in range(num_rows):
-            self.grid[x] = {}
-            for y in range(num_cols):
-                self.grid[x][y] = Node(x, y)
-    
     def __getitem__(self, coor):
         """
         Retrieve a Node object at the specified coordinates.
@@ -39,8 +105,394 @@ class Grid:
 
         Returns:
             Node: The Node object at the specified coordinates.
+
+        Raises:
+            KeyError: If the coordinates are outside the grid.
+        """
+        x, y = coor
+        if not self.is_valid(x, y):
+            raise KeyError(coor)
+        return self.node(self.cell_id(x, y))
+
+    def __len__(self):
+        """
+        Return the number of cells in the grid.
+
+        Returns:
+            int: num_rows * num_cols.
+        """
+        return self.num_rows * self.num_cols
+
+    def cell_id(self, x, y):
+        """
+        Get the flat id of the cell at the given coordinates.
+
+        Args:
+            x (int): Row index.
+            y (int): Column index.
+
+        Returns:
+            int: The cell id x * num_cols + y.
+        """
+        return x * self.num_cols + y
+
+    def cell_coor(self, cell):
+        """
+        Get the coordinates of a cell from its flat id.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            tuple: The (x, y) coordinates of the cell.
+        """
+        return divmod(cell, self.num_cols)
+
+    def begin_search(self):
+        """
+        Start a new search on the grid's search arrays.
+
+        Cells stamped by earlier searches are older than the returned generation, so they
+        count as unvisited without touching the arrays. The stamps are only cleared when the
+        generation counter would overflow. The search arrays are allocated on the first
+        call, so a search should read them from the grid after calling it.
+
+        Returns:
+            int: The new generation. The search should stamp cells it reaches with it and
+                 cells it expands with it + 1.
+        """
+        if self.stamp is None:
+            size = len(self)
+            self.g = array('d', [math.inf]) * size
+            self.h = array('d', [0.0]) * size
+            self.f = array('d', [math.inf]) * size
+            self.parent = array('l', [-1]) * size
+            self.stamp = array('I', [0]) * size
+        self.generation += 2
+        if self.generation >= 2 ** 32 - 1:
+            self.stamp = array('I', [0]) * len(self)
+            self.generation = 2
+        return self.generation
+
+    def is_current(self, cell):
+        """
+        Check whether the current search has reached a cell.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            bool: True if the cell's search state belongs to the current search.
+        """
+        return self.stamp is not None and self.stamp[cell] >= self.generation > 0
+
+    def memory_size(self):
+        """
+        Return the approximate memory used by the grid's cell arrays and adjacency tables.
+
+        Returns:
+            int: The size in bytes.
+        """
+        arrays = [self.g, self.h, self.f, self.parent, self.stamp] if self.stamp is not None else []
+        for _, neighbors, costs in self.adjacency_tables.values():
+            arrays.extend((neighbors, costs))
+        if self.components is not None:
+            arrays.append(self.components)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.blocked) + len(self.weighted)
+
+    def node(self, cell):
+        """
+        Get the Node for a cell id, with its search state copied from the cell arrays.
+
+        Cells the current search has not reached get the state of a fresh Node (g and f
+        infinite, h 0, no parent). In compact mode a new Node is built on every call and its
+        parent is left as None; use the cell's entry in the parent array to walk the search
+        tree instead.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            Node: The Node object for the cell.
+        """
+        x, y = divmod(cell, self.num_cols)
+        current = self.is_current(cell)
+        if self.grid is not None:
+            node = self.grid[x][y]
+            parent = self.parent[cell] if current else -1
+            node.parent = self.grid[parent // self.num_cols][parent % self.num_cols] if parent >= 0 else None
+        else:
+            node = Node(x, y, self)
+            node.blocked = bool(self.blocked[cell])
+            node.weighted = bool(self.weighted[cell])
+        if current:
+            node.g = self.g[cell]
+            node.h = self.h[cell]
+            node.f = self.f[cell]
+        else:
+            node.g = math.inf
+            node.h = 0
+            node.f = math.inf
+        return node
+
+    def set_blocked(self, coor, blocked):
+        """
+        Set whether the cell at the specified coordinates is a wall.
+
+        Args:
+            coor (tuple): A tuple (x, y) representing the coordinates of the cell.
+            blocked (bool): True to make the cell a wall, False to clear it.
+        """
+        x, y = coor
+        cell = self.cell_id(x, y)
+        self.blocked[cell] = 1 if blocked else 0
+        self._patch_adjacency(cell)
+        self._update_components(cell)
+        self._notify(cell)
+        if self.grid is not None:
+            self.grid[x][y].blocked = bool(blocked)
+
+    def set_weighted(self, coor, weighted):
+        """
+        Set whether the cell at the specified coordinates is weighted.
+
+        Args:
+            coor (tuple): A tuple (x, y) representing the coordinates of the cell.
+            weighted (bool): True to make the cell weighted, False to clear it.
+        """
+        x, y = coor
+        cell = self.cell_id(x, y)
+        self.weighted[cell] = 1 if weighted else 0
+        self._patch_adjacency(cell)
+        self._notify(cell)
+        if self.grid is not None:
+            self.grid[x][y].weighted = bool(weighted)
+
+    def set_weight_cost(self, weight_cost):
+        """
+        Change the cost to traverse a weighted node.
+
+        Args:
+            weight_cost (float): The new cost to traverse a weighted node.
+        """
+        self.weight_cost = weight_cost
+        self.adjacency_tables.clear()
+        self._notify(None)
+
+    def set_moves_diagonally(self, moves_diagonally):
+        """
+        Change whether diagonal movement is allowed.
+
+        Args:
+            moves_diagonally (bool): Whether diagonal movement is allowed.
+        """
+        self.moves_diagonally = moves_diagonally
+        self.adjacency_tables.clear()
+        self.components = None
+        self._notify(None)
+
+    def component(self, cell):
+        """
+        Get the connected component of a cell, labelling the grid on first use.
+
+        Two open cells are in the same component if a path of open cells joins them, moving
+        diagonally when the grid moves diagonally.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            int: The component's label, or 0 if the cell is a wall.
+        """
+        if self.components is None:
+            self._label_components()
+        label = int(self.components[cell])
+        parents = self.component_parents
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]  # path halving
+            label = parents[label]
+        return label
+
+    def connected(self, source, target):
+        """
+        Check whether a path can exist between two cells, in O(1) once the grid is labelled.
+
+        Args:
+            source (int): The id of the first cell.
+            target (int): The id of the second cell.
+
+        Returns:
+            bool: False if the target is a wall, or both cells are open and in different
+                  components, otherwise True. A search starting on a wall still leaves
+                  through its open neighbors, so a walled source is not ruled out here.
+        """
+        if source == target:
+            return True
+        if self.blocked[target]:
+            return False
+        if self.blocked[source]:
+            return True
+        return self.component(source) == self.component(target)
+
+    def add_observer(self, observer):
+        """
+        Register an object to be told about wall and weight changes.
+
+        Args:
+            observer (object): An object with a grid_changed(cell) method.
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
         """
-        return self.grid[coor[0]][coor[1]]
+        Stop telling an object about wall and weight changes.
+
+        Args:
+            observer (object): A previously registered observer.
+        """
+        self.observers.remove(observer)
+
+    def _notify(self, cell):
+        """
+        Tell every observer that a cell, or the whole grid if cell is None, changed.
+
+        Args:
+            cell (int or None): The id of the cell that changed.
+        """
+        for observer in self.observers:
+            observer.grid_changed(cell)
+
+    def _label_components(self):
+        """
+        Label the connected components of the open cells in bulk.
+        """
+        open_cells = np.frombuffer(self.blocked, dtype=np.uint8).reshape(self.num_rows, self.num_cols) == 0
+        structure = np.ones((3, 3), dtype=bool) if self.moves_diagonally else None
+        labels, count = ndimage.label(open_cells, structure=structure)
+        self.components = labels.ravel()
+        self.component_parents = list(range(count + 1))
+
+    def _update_components(self, cell):
+        """
+        Update the component labels after a cell's wall status changed.
+
+        A cell that opens joins the components of its open neighbors, which are merged. A
+        cell that closes keeps the labels valid if its open neighbors stay connected around
+        it; otherwise it may split its component, and the pieces cut off are relabelled (see
+        _split_component).
+
+        Args:
+            cell (int): The id of the cell that changed.
+        """
+        components = self.components
+        if components is None:
+            return
+        if self.blocked[cell]:
+            was_open = components[cell]
+            components[cell] = 0
+            if was_open and self._may_split(cell):
+                self._split_component(cell)
+        elif not components[cell]:
+            roots = set(self.component(neighbor) for neighbor in self.cell_neighbors(cell))
+            if roots:
+                root = min(roots)
+                for other in roots:
+                    self.component_parents[other] = root
+            else:
+                root = len(self.component_parents)
+                self.component_parents.append(root)
+            components[cell] = root
+
+    def _may_split(self, cell):
+        """
+        Check whether walling off a cell may disconnect its open neighbors, by looking for a
+        path between them through the eight cells around it.
+
+        Args:
+            cell (int): The id of the cell that was walled off.
+
+        Returns:
+            bool: False if the open neighbors are still connected around the cell.
+        """
+        x, y = divmod(cell, self.num_cols)
+        around = [(dx, dy) for dx, dy in DIRECTIONS
+                  if self.is_valid(x + dx, y + dy) and not self.blocked[self.cell_id(x + dx, y + dy)]]
+        reach = 1 if self.moves_diagonally else 0
+        neighbors = [(dx, dy) for dx, dy in around if reach or not (dx and dy)]
+        if len(neighbors) < 2:
+            return False
+        # flood the open cells around the cell from its first neighbor
+        seen = {neighbors[0]}
+        stack = [neighbors[0]]
+        while stack:
+            dx, dy = stack.pop()
+            for other in around:
+                if other not in seen and abs(other[0] - dx) + abs(other[1] - dy) <= 1 + reach \
+                   and max(abs(other[0] - dx), abs(other[1] - dy)) == 1:
+                    seen.add(other)
+                    stack.append(other)
+        return any(neighbor not in seen for neighbor in neighbors)
+
+    def _split_component(self, cell):
+        """
+        Relabel the pieces of a component that a new wall may have split.
+
+        A flood starts from each open neighbor of the cell and the floods advance one cell
+        at a time in turn. Floods that meet are in the same piece. A piece whose floods all
+        run out of cells is cut off and gets a new label; once a single piece is still
+        spreading, it keeps the old label. Only the cells of the pieces cut off, and about as
+        many of the remaining piece, are visited. When the wall splits the component into
+        large pieces, the floods give up and the labels are dropped instead, to be rebuilt in
+        bulk when next needed, which is faster once more than about 1 in 128 cells would be
+        visited.
+
+        Args:
+            cell (int): The id of the cell that was walled off.
+        """
+        components = self.components
+        starts = self.cell_neighbors(cell)
+        owner = {start: i for i, start in enumerate(starts)}
+        frontiers = [[start] for start in starts]
+        # union-find over the floods, merged when they meet
+        pieces = list(range(len(starts)))
+
+        def piece(i):
+            while pieces[i] != i:
+                pieces[i] = pieces[pieces[i]]
+                i = pieces[i]
+            return i
+
+        limit = max(len(self) // 128, 1024)
+        while True:
+            active = set(piece(i) for i, frontier in enumerate(frontiers) if frontier)
+            if len(active) <= 1:
+                break
+            if len(owner) > limit:
+                self.components = None
+                return
+            for i, frontier in enumerate(frontiers):
+                if not frontier:
+                    continue
+                for neighbor in self.cell_neighbors(frontier.pop()):
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = i
+                        frontier.append(neighbor)
+                    elif piece(other) != piece(i):
+                        pieces[piece(other)] = piece(i)
+
+        finished = {}
+        for i in range(len(starts)):
+            if piece(i) not in active:
+                finished.setdefault(piece(i), [])
+        for other, i in owner.items():
+            cells = finished.get(piece(i))
+            if cells is not None:
+                cells.append(other)
+        for cells in finished.values():
+            label = len(self.component_parents)
+            self.component_parents.append(label)
+            components[cells] = label
 
     def is_valid(self, x, y):
         """
@@ -54,7 +506,7 @@ class Grid:
             bool: True if (x, y) is within the grid bounds, False otherwise.
         """
         return x >= 0 and y >= 0 and x < self.num_rows and y < self.num_cols
-    
+
     def get_node_weight(self, node):
         """
         Get the traversal cost for a given node.
@@ -65,10 +517,8 @@ class Grid:
         Returns:
             float: The cost to traverse the node (weight_cost if weighted, otherwise 1).
         """
-        if self.grid[node.x][node.y].is_weighted():
-            return self.weight_cost
-        return 1
-    
+        return self.cell_weight(self.cell_id(node.x, node.y))
+
     def get_edge_weight(self, node1, node2):
         """
         Calculate the cost to move from node1 to node2, considering weights and diagonal movement.
@@ -80,16 +530,8 @@ class Grid:
         Returns:
             float: The cost to move from node1 to node2. Diagonal moves cost sqrt(2) times the node weight.
         """
-        x_diff = abs(node1.x - node2.x)
-        y_diff = abs(node1.y - node2.y)
-        weight = 1
-        if self.grid[node2.x][node2.y].is_weighted():
-            weight = self.weight_cost
-        if x_diff + y_diff == 2:
-            return math.sqrt(2) * weight
-        else:
-            return 1 * weight
-    
+        return self.cell_edge_weight(self.cell_id(node1.x, node1.y), self.cell_id(node2.x, node2.y))
+
     def get_neighbors(self, node):
         """
         Get all valid, non-blocked neighboring nodes of a given node.
@@ -101,31 +543,159 @@ class Grid:
             list: A list of neighboring Node objects that are within bounds and not blocked.
                   Includes diagonal neighbors if moves_diagonally is True.
         """
+        return [self.node(cell) for cell in self.cell_neighbors(self.cell_id(node.x, node.y))]
+
+    def cell_weight(self, cell):
+        """
+        Get the traversal cost for a cell id.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            float: The cost to traverse the cell (weight_cost if weighted, otherwise 1).
+        """
+        if self.weighted[cell]:
+            return self.weight_cost
+        return 1
+
+    def cell_edge_weight(self, cell1, cell2):
+        """
+        Calculate the cost to move from cell1 to cell2, considering weights and diagonal movement.
+
+        Args:
+            cell1 (int): The starting cell id.
+            cell2 (int): The destination cell id.
+
+        Returns:
+            float: The cost to move from cell1 to cell2. Diagonal moves cost sqrt(2) times the cell weight.
+        """
+        x1, y1 = divmod(cell1, self.num_cols)
+        x2, y2 = divmod(cell2, self.num_cols)
+        weight = 1
+        if self.weighted[cell2]:
+            weight = self.weight_cost
+        if abs(x1 - x2) + abs(y1 - y2) == 2:
+            return math.sqrt(2) * weight
+        else:
+            return 1 * weight
+
+    def cell_neighbors(self, cell):
+        """
+        Get the ids of all valid, non-blocked neighbors of a cell.
+
+        Neighbors are listed left, right, up, down, then up left, up right, down left and
+        down right when diagonal movement is allowed.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            list: A list of neighboring cell ids that are within bounds and not blocked.
+        """
+        x, y = divmod(cell, self.num_cols)
+        cols = self.num_cols
+        blocked = self.blocked
         neighbors = []
         # Left
-        if self.is_valid(node.x - 1, node.y) and not self.grid[node.x - 1][node.y].is_blocked(): 
-            neighbors.append(self.grid[node.x - 1][node.y])
+        if x > 0 and not blocked[cell - cols]:
+            neighbors.append(cell - cols)
         # Right
-        if self.is_valid(node.x + 1, node.y) and not self.grid[node.x + 1][node.y].is_blocked(): 
-            neighbors.append(self.grid[node.x + 1][node.y])
+        if x < self.num_rows - 1 and not blocked[cell + cols]:
+            neighbors.append(cell + cols)
         # Up
-        if self.is_valid(node.x, node.y - 1) and not self.grid[node.x][node.y - 1].is_blocked(): 
-            neighbors.append(self.grid[node.x][node.y - 1])
+        if y > 0 and not blocked[cell - 1]:
+            neighbors.append(cell - 1)
         # Down
-        if self.is_valid(node.x, node.y + 1) and not self.grid[node.x][node.y + 1].is_blocked(): 
-            neighbors.append(self.grid[node.x][node.y + 1])
-        
+        if y < cols - 1 and not blocked[cell + 1]:
+            neighbors.append(cell + 1)
+
         if self.moves_diagonally:
             # Up left
-            if self.is_valid(node.x - 1, node.y - 1) and not self.grid[node.x - 1][node.y - 1].is_blocked(): 
-                neighbors.append(self.grid[node.x - 1][node.y - 1])
+            if self.is_valid(x - 1, y - 1) and not blocked[cell - cols - 1]:
+                neighbors.append(cell - cols - 1)
             # Up right
-            if self.is_valid(node.x + 1, node.y - 1) and not self.grid[node.x + 1][node.y - 1].is_blocked(): 
-                neighbors.append(self.grid[node.x + 1][node.y - 1])
+            if self.is_valid(x + 1, y - 1) and not blocked[cell + cols - 1]:
+                neighbors.append(cell + cols - 1)
             # Down left
-            if self.is_valid(node.x - 1, node.y + 1) and not self.grid[node.x - 1][node.y + 1].is_blocked(): 
-                neighbors.append(self.grid[node.x - 1][node.y + 1])
+            if self.is_valid(x - 1, y + 1) and not blocked[cell - cols + 1]:
+                neighbors.append(cell - cols + 1)
             # Down right
-            if self.is_valid(node.x + 1, node.y + 1) and not self.grid[node.x + 1][node.y + 1].is_blocked(): 
-                neighbors.append(self.grid[node.x + 1][node.y + 1])
-        return neighbors
\ No newline at end of file
+            if self.is_valid(x + 1, y + 1) and not blocked[cell + cols + 1]:
+                neighbors.append(cell + cols + 1)
+        return neighbors
+
+    def adjacency(self, moves_diagonally=None):
+        """
+        Get the packed adjacency table of the grid, building it on first use.
+
+        The table has a fixed number of slots per cell (4, or 8 when the grid moves
+        diagonally), in the same order as cell_neighbors. Slot k of cell c is at index
+        c * stride + k and holds the neighbor's id, or -1 if it is outside the grid or
+        blocked, along with the cost of moving to it. Wall and weight changes patch the
+        affected slots in place.
+
+        Args:
+            moves_diagonally (bool, optional): Whether edge costs are computed for diagonal
+                movement (sqrt(2) times the cell weight on diagonals) or as the plain cell
+                weight. Defaults to the grid's moves_diagonally.
+
+        Returns:
+            tuple: A tuple (stride, neighbors, costs) where neighbors and costs are flat arrays.
+        """
+        if moves_diagonally is None:
+            moves_diagonally = self.moves_diagonally
+        moves_diagonally = bool(moves_diagonally)
+        table = self.adjacency_tables.get(moves_diagonally)
+        if table is None:
+            table = self._build_adjacency(moves_diagonally)
+            self.adjacency_tables[moves_diagonally] = table
+        return table
+
+    def _build_adjacency(self, moves_diagonally):
+        """
+        Build the packed adjacency table for adjacency().
+
+        Args:
+            moves_diagonally (bool): Whether diagonal edges cost sqrt(2) times the cell weight.
+
+        Returns:
+            tuple: A tuple (stride, neighbors, costs).
+        """
+        rows, cols = self.num_rows, self.num_cols
+        stride = 8 if self.moves_diagonally else 4
+        ids = np.arange(rows * cols, dtype=np.dtype('l')).reshape(rows, cols)
+        blocked = np.frombuffer(self.blocked, dtype=np.uint8).reshape(rows, cols).astype(bool)
+        weighted = np.frombuffer(self.weighted, dtype=np.uint8).reshape(rows, cols).astype(bool)
+        weight_cost = math.nan if self.weight_cost is None else float(self.weight_cost)
+        straight_costs = np.where(weighted, weight_cost, 1.0)
+        diagonal_costs = math.sqrt(2) * straight_costs if moves_diagonally else straight_costs
+
+        neighbor_ids = np.full((rows, cols, stride), -1, dtype=np.dtype('l'))
+        neighbor_costs = np.zeros((rows, cols, stride))
+        for k, (dx, dy) in enumerate(DIRECTIONS[:stride]):
+            # cells whose neighbor in this direction is inside the grid, and those neighbors
+            src = (slice(max(-dx, 0), rows - max(dx, 0)), slice(max(-dy, 0), cols - max(dy, 0)))
+            dst = (slice(max(dx, 0), rows - max(-dx, 0)), slice(max(dy, 0), cols - max(-dy, 0)))
+            neighbor_ids[src + (k,)] = np.where(blocked[dst], -1, ids[dst])
+            neighbor_costs[src + (k,)] = (diagonal_costs if k >= 4 else straight_costs)[dst]
+
+        return stride, array('l', neighbor_ids.tobytes()), array('d', neighbor_costs.tobytes())
+
+    def _patch_adjacency(self, cell):
+        """
+        Update the slots that point at a cell in every cached adjacency table after
+        the cell's wall or weight status changed.
+
+        Args:
+            cell (int): The id of the cell that changed.
+        """
+        x, y = divmod(cell, self.num_cols)
+        blocked = self.blocked[cell]
+        weight = self.weight_cost if self.weighted[cell] else 1
+        for moves_diagonally, (stride, neighbors, costs) in self.adjacency_tables.items():
+            for k, (dx, dy) in enumerate(DIRECTIONS[:stride]):
+                if self.is_valid(x + dx, y + dy):
+                    slot = self.cell_id(x + dx, y + dy) * stride + OPPOSITE_DIRECTIONS[k]
+                    neighbors[slot] = -1 if blocked else cell
+                    costs[slot] = math.sqrt(2) * weight if moves_diagonally and k >= 4 else weight
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import threading
+import time
+import uuid
+
+class GridSession:
+    def __init__(self, grid):
+        """
+        Initialize a GridSession object holding a server-side grid between requests.
+
+        Args:
+            grid (Grid): The grid stored for this session.
+
+        Attributes:
+            grid (Grid): The grid stored for this session.
+            lock (threading.Lock): Held while the grid is edited or searched.
+            last_used (float): Monotonic time of the last access.
+            planners (dict): Incremental planners kept for this grid, by algorithm name.
+            landmarks (Landmarks or None): Landmark tables for the 'alt' heuristic, built on
+                                           first use.
+        """
+        self.grid = grid
+        self.planners = {}
+        self.landmarks = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class GridStore:
+    def __init__(self, max_sessions=64, ttl=30 * 60):
+        """
+        Initialize a GridStore, a bounded store of grid sessions.
+
+        Sessions idle for longer than ttl seconds are evicted, and once the store holds
+        max_sessions sessions the least recently used one is evicted to make room.
+
+        Args:
+            max_sessions (int, optional): Maximum number of sessions kept. Defaults to 64.
+            ttl (float, optional): Seconds a session may stay idle. Defaults to 30 minutes.
+
+        Attributes:
+            max_sessions (int): Maximum number of sessions kept.
+            ttl (float): Seconds a session may stay idle.
+            sessions (OrderedDict): Sessions by id, least recently used first.
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Return the number of sessions in the store.
+
+        Returns:
+            int: The number of sessions.
+        """
+        return len(self.sessions)
+
+    def create(self, grid):
+        """
+        Store a grid in a new session.
+
+        Args:
+            grid (Grid): The grid to store.
+
+        Returns:
+            str: The id of the new session.
+        """
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            while len(self.sessions) >= self.max_sessions:
+                self.sessions.popitem(last=False)
+            self.sessions[session_id] = GridSession(grid)
+        return session_id
+
+    def get(self, session_id):
+        """
+        Look up a session and mark it as recently used.
+
+        Args:
+            session_id (str): The id of the session.
+
+        Returns:
+            GridSession or None: The session, or None if it does not exist or has expired.
+        """
+        with self._lock:
+            self._evict_expired()
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        """
+        Remove a session from the store.
+
+        Args:
+            session_id (str): The id of the session.
+
+        Returns:
+            bool: True if the session existed, False otherwise.
+        """
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def _evict_expired(self):
+        """
+        Remove the sessions that have been idle for longer than the ttl.
+        """
+        cutoff = time.monotonic() - self.ttl
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_used >= cutoff:
+                break
+            del self.sessions[session_id]
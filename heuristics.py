@@ -0,0 +1,144 @@
+import math
+
+# Heuristics A* and Jump Point Search can be guided by
+HEURISTICS = ['manhattan', 'octile', 'euclidean', 'alt']
+
+def default_heuristic(grid):
+    """
+    Get the tightest admissible heuristic without preprocessing for a grid's movement mode.
+
+    Args:
+        grid (Grid): The grid to search.
+
+    Returns:
+        str: 'octile' if the grid moves diagonally, otherwise 'manhattan'.
+    """
+    return 'octile' if grid.moves_diagonally else 'manhattan'
+
+def min_edge_cost(grid):
+    """
+    Get the cheapest cost of a straight move on a grid, which scales the distance
+    heuristics so they stay admissible when weighted cells cost less than 1.
+
+    Args:
+        grid (Grid): The grid to search.
+
+    Returns:
+        float: The smaller of 1 and the weight cost if the grid has weighted cells, otherwise 1.
+    """
+    if 1 in grid.weighted and grid.weight_cost < 1:
+        return grid.weight_cost
+    return 1
+
+def heuristic_function(name, grid, goal, moves_diagonally=False, landmarks=None, reverse=False):
+    """
+    Build the heuristic estimating the cost from any cell of a grid to a goal cell.
+
+    - 'manhattan': dx + dy, exact for 4-way movement on open ground. Not admissible when
+      the grid moves diagonally.
+    - 'octile': straight steps plus diagonal steps at their cost (max(dx, dy) plus
+      (sqrt(2) - 1) * min(dx, dy) with diagonal costs), exact for 8-way movement on open ground.
+    - 'euclidean': the straight-line distance.
+    - 'alt': the larger of the default heuristic and the landmark bound
+      d(L, goal) - d(L, cell) over precomputed landmarks L (triangle inequality).
+
+    The distances are multiplied by min_edge_cost(grid), so every heuristic but
+    'manhattan' on diagonal grids is admissible and consistent. 'euclidean' therefore only
+    equals the plain distance of search_algorithms.euclidean_dist_heuristic when no move
+    costs less than 1; below that the plain distance overestimates, and the scaled one
+    changes the order cells are expanded in and their f costs.
+
+    Args:
+        name (str or None): One of HEURISTICS, or None for default_heuristic(grid).
+        grid (Grid): The grid to search.
+        goal (int): The goal cell id.
+        moves_diagonally (bool, optional): Whether diagonal moves cost sqrt(2) times the cell
+            weight. Defaults to False.
+        landmarks (Landmarks, optional): Landmark tables built for this grid with the same
+            movement costs; required for 'alt'. Defaults to None.
+        reverse (bool, optional): Whether to estimate the cost from the goal to each cell
+            instead, for searches over reversed edges. Only 'alt' bounds differ, since edge
+            costs depend on the cell entered. Defaults to False.
+
+    Returns:
+        function: A function taking a cell id and returning its estimated cost to the goal.
+
+    Raises:
+        ValueError: If name is unknown, or 'alt' is asked for without matching landmarks.
+    """
+    if name is None:
+        name = default_heuristic(grid)
+    if name not in HEURISTICS:
+        raise ValueError(f'Unknown heuristic {name!r}')
+
+    cols = grid.num_cols
+    goal_x, goal_y = divmod(goal, cols)
+    scale = min_edge_cost(grid)
+
+    if name == 'euclidean':
+        def heuristic(cell):
+            return scale * math.sqrt(math.pow(goal_x - cell // cols, 2) + math.pow(goal_y - cell % cols, 2))
+        return heuristic
+
+    if name == 'manhattan':
+        def heuristic(cell):
+            return scale * (abs(cell // cols - goal_x) + abs(cell % cols - goal_y))
+        return heuristic
+
+    if name == 'alt':
+        if landmarks is None or landmarks.moves_diagonally != bool(moves_diagonally):
+            raise ValueError('The alt heuristic needs landmarks built with the same movement costs')
+        base = heuristic_function(None, grid, goal, moves_diagonally)
+        # landmarks in another component than the goal give no bound
+        bounds = [(table, table[goal]) for table in landmarks.tables() if table[goal] != math.inf]
+        sign = -1 if reverse else 1
+
+        def heuristic(cell):
+            best = base(cell)
+            for table, to_goal in bounds:
+                bound = sign * (to_goal - table[cell])
+                if bound > best:
+                    best = bound
+            return best
+        return heuristic
+
+    # octile: each diagonal step replaces two straight ones
+    extra = (math.sqrt(2) if moves_diagonally else 1) - 1 if grid.moves_diagonally else 1
+
+    def heuristic(cell):
+        dx = abs(cell // cols - goal_x)
+        dy = abs(cell % cols - goal_y)
+        if dx < dy:
+            dx, dy = dy, dx
+        return scale * (dx + extra * dy)
+    return heuristic
+
+def nearest_goal_heuristic(name, grid, goals, moves_diagonally=False, landmarks=None):
+    """
+    Build the heuristic estimating the cost from any cell of a grid to the nearest of several
+    goal cells, for searches that may stop at any of them.
+
+    The estimate is the smallest of the heuristic_function estimates to each goal. A lower
+    bound on the cost to every goal bounds the cost to the nearest one, so it stays
+    admissible, and the minimum of consistent heuristics is consistent.
+
+    Args:
+        name (str or None): One of HEURISTICS, or None for default_heuristic(grid).
+        grid (Grid): The grid to search.
+        goals (list): The goal cell ids.
+        moves_diagonally (bool, optional): As for heuristic_function. Defaults to False.
+        landmarks (Landmarks, optional): As for heuristic_function. Defaults to None.
+
+    Returns:
+        function: A function taking a cell id and returning its estimated cost to the nearest goal.
+
+    Raises:
+        ValueError: As for heuristic_function.
+    """
+    estimates = [heuristic_function(name, grid, goal, moves_diagonally, landmarks) for goal in goals]
+    if len(estimates) == 1:
+        return estimates[0]
+
+    def heuristic(cell):
+        return min(estimate(cell) for estimate in estimates)
+    return heuristic
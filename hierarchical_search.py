@@ -0,0 +1,547 @@
+from heuristics import heuristic_function
+from priority_queue import PriorityQueue
+from search_algorithms import CANCEL_CHECK_INTERVAL, a_star_path_metrics, _a_star_f_costs
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+import numpy as np
+import math
+
+class HPAStar:
+    def __init__(self, grid, cluster_size=16, max_entrance_width=6):
+        """
+        Initialize a Hierarchical Pathfinding A* (HPA*) planner for repeated searches on one grid.
+
+        The grid is split into square clusters. Where free cells face each other across the
+        border of two clusters, one or two of them are chosen as entrances, and the cost of
+        the shortest path between every two entrances of a cluster is computed while staying
+        inside the cluster. A search then runs A* on this much smaller abstract graph of
+        entrances, and refines each step of the abstract path into cells with a small A*
+        search inside one cluster.
+
+        The abstraction is built on the first search. Wall and weight changes (through
+        Node.block/unblock/add_weight/remove_weight or the Grid setters) only mark the
+        clusters around the changed cell, and the next search rebuilds just those. Changing
+        the weight cost or the movement mode rebuilds everything.
+
+        Paths are near-optimal rather than optimal: they always go through entrances, so
+        they can be slightly longer than a_star's. Both searches are guided by the grid's
+        default heuristic, as a_star is (see heuristics.heuristic_function).
+
+        Args:
+            grid (Grid): The grid to search. The planner registers itself as an observer.
+            cluster_size (int, optional): Side of a cluster, in cells. Defaults to 16.
+            max_entrance_width (int, optional): Free stretches of a border at least this wide
+                get an entrance at each end instead of one in the middle. Defaults to 6.
+
+        Attributes:
+            grid (Grid): The grid being searched.
+            cluster_size (int): Side of a cluster, in cells.
+            max_entrance_width (int): Width from which a border stretch gets two entrances.
+            cluster_rows (int): Number of clusters along the rows of the grid.
+            cluster_cols (int): Number of clusters along the columns of the grid.
+            borders (dict): Transitions (cell_a, cell_b) between two neighboring clusters, as
+                lists keyed by the cluster ids (a, b) with a < b.
+            clusters (dict): For each cluster id, a tuple (entrances, intra, exits) where
+                intra maps each entrance to its (entrance, cost) edges inside the cluster and
+                exits maps it to its (cell, cost) edges into neighboring clusters.
+            dirty_borders (set): Borders to rebuild before the next search.
+            dirty_clusters (set): Clusters to rebuild before the next search.
+            abstract_expanded (int): Number of abstract nodes expanded by the last search.
+            refined_expanded (int): Number of cells expanded refining the last abstract path.
+            clusters_rebuilt (int): Number of clusters rebuilt before the last search.
+            estimate (function or None): The heuristic towards the last search's target.
+        """
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.max_entrance_width = max_entrance_width
+        self.cluster_rows = -(-grid.num_rows // cluster_size)
+        self.cluster_cols = -(-grid.num_cols // cluster_size)
+        self.borders = {}
+        self.clusters = {}
+        self.dirty_borders = set()
+        self.dirty_clusters = set()
+        self.abstract_expanded = 0
+        self.refined_expanded = 0
+        self.clusters_rebuilt = 0
+        self.estimate = None
+        self._mark_all()
+        grid.add_observer(self)
+
+    def grid_changed(self, cell):
+        """
+        Record a change to the grid; called by the grid for each wall or weight change.
+
+        A cell belongs to the borders of every cluster within one step of it, since it can
+        be an entrance, the cell an entrance leads into, or a wall next to a diagonal
+        crossing. Those borders and clusters are rebuilt before the next search.
+
+        Args:
+            cell (int or None): The id of the changed cell, or None if the whole grid changed.
+        """
+        if cell is None:
+            self._mark_all()
+            return
+        grid = self.grid
+        x, y = grid.cell_coor(cell)
+        touched = set()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if grid.is_valid(x + dx, y + dy):
+                    touched.add(self._cluster_at(x + dx, y + dy))
+        self.dirty_clusters.update(touched)
+        for a in touched:
+            for b in touched:
+                if a < b:
+                    self.dirty_borders.add((a, b))
+
+    def close(self):
+        """
+        Stop observing the grid.
+        """
+        self.grid.remove_observer(self)
+
+    def stats(self):
+        """
+        Report the work done by the last search.
+
+        Returns:
+            dict: The abstract nodes expanded ('abstract_expanded'), the cells expanded while
+                  refining the abstract path ('refined_expanded') and the clusters rebuilt
+                  after grid changes ('clusters_rebuilt').
+        """
+        return {'abstract_expanded': self.abstract_expanded, 'refined_expanded': self.refined_expanded,
+                'clusters_rebuilt': self.clusters_rebuilt}
+
+    def search(self, source, target, cancel=None):
+        """
+        Find a near-optimal path from source to target through the cluster abstraction.
+
+        Args:
+            source (Node): The starting node.
+            target (Node): The goal node.
+            cancel (CancelToken, optional): Token checked after each rebuilt cluster and every
+                CANCEL_CHECK_INTERVAL expanded nodes; the search raises jobs.SearchCancelled
+                once it trips. Clusters not rebuilt yet are rebuilt by the next search.
+                Defaults to None.
+
+        Returns:
+            tuple: A tuple containing:
+                - visited_ordered (list): List of abstract nodes (the source, entrances and
+                  the target) in the order they were expanded.
+                - path (list): List of nodes representing the refined path from source to target (inclusive).
+                - path_length (float): The path length, computed like a_star's.
+                - path_cost (float): The path cost, computed like a_star's.
+
+        Notes:
+            - If the source and target are the same node, returns an empty list.
+            - If no path is found, returns (visited_ordered, [], 0, 0).
+            - If the source or the target is a wall, returns ([], [], 0, 0) without
+              searching, as LPAStar.search does.
+        """
+        if source == target:
+            return []
+        grid = self.grid
+        source_id = grid.cell_id(source.x, source.y)
+        target_id = grid.cell_id(target.x, target.y)
+        if grid.blocked[source_id] or grid.blocked[target_id]:
+            self.abstract_expanded = self.refined_expanded = 0
+            return [], [], 0, 0
+        self._refresh(cancel)
+        target_cluster = self._cluster_of(target_id)
+        self.estimate = heuristic_function(None, grid, target_id, grid.moves_diagonally)
+
+        # connect the source and target to the entrances of their clusters
+        source_cluster = self._cluster_of(source_id)
+        same_cluster = target_id if source_cluster == target_cluster else None
+        source_edges = [(cell, cost, source_cluster) for cell, cost
+                        in self._cluster_costs(source_cluster, source_id, same_cluster).items()]
+        target_edges = self._cluster_costs(target_cluster, target_id, reverse=True)
+
+        frontier = PriorityQueue()
+        g = {source_id: 0}
+        parent = {source_id: None}
+        visited = set()
+        visited_ordered = []
+        frontier.insert(source_id, self._heuristic(source_id))
+        found = False
+        while len(frontier) > 0:
+            cell = frontier.pop()
+            if cell in visited:
+                continue
+            visited.add(cell)
+            visited_ordered.append(cell)
+            if cancel is not None and len(visited_ordered) % CANCEL_CHECK_INTERVAL == 0:
+                cancel.check()
+            if cell == target_id:
+                found = True
+                break
+
+            cluster = self._cluster_of(cell)
+            entrances, intra, exits = self.clusters[cluster]
+            if cell == source_id:
+                edges = list(source_edges)
+            else:
+                edges = [(neighbor, cost, cluster) for neighbor, cost in intra.get(cell, ())]
+                if cluster == target_cluster and cell in target_edges:
+                    edges.append((target_id, target_edges[cell], cluster))
+            edges.extend((neighbor, cost, None) for neighbor, cost in exits.get(cell, ()))
+
+            for neighbor, cost, via in edges:
+                if neighbor in visited:
+                    continue
+                new_g = g[cell] + cost
+                if new_g < g.get(neighbor, math.inf):
+                    g[neighbor] = new_g
+                    parent[neighbor] = (cell, via)
+                    priority = new_g + self._heuristic(neighbor)
+                    if neighbor in frontier:
+                        frontier.update_priority(neighbor, priority)
+                    else:
+                        frontier.insert(neighbor, priority)
+        self.abstract_expanded = len(visited_ordered)
+
+        visited_nodes = [self._node(cell, g[cell]) for cell in visited_ordered]
+        self.refined_expanded = 0
+        if not found:
+            return visited_nodes, [], 0, 0
+
+        hops = []
+        cell = target_id
+        while parent[cell] is not None:
+            previous, via = parent[cell]
+            hops.append((previous, cell, via))
+            cell = previous
+        path = [source_id]
+        for previous, cell, via in reversed(hops):
+            if via is None:  # a step across a cluster border
+                path.append(cell)
+            else:
+                path.extend(self._refine(previous, cell, via, cancel)[1:])
+
+        f = _a_star_f_costs(grid, path, grid.moves_diagonally, self.estimate)
+        path_length, path_cost = a_star_path_metrics(grid, path, f, grid.moves_diagonally)
+        return visited_nodes, [grid.node(cell) for cell in path], path_length, path_cost
+
+    def _mark_all(self):
+        """
+        Mark every border and cluster for rebuilding.
+        """
+        self.clusters.clear()
+        self.borders.clear()
+        count = self.cluster_rows * self.cluster_cols
+        self.dirty_clusters = set(range(count))
+        self.dirty_borders = set()
+        for a in range(count):
+            for b in self._neighbor_clusters(a):
+                if a < b:
+                    self.dirty_borders.add((a, b))
+
+    def _refresh(self, cancel=None):
+        """
+        Rebuild the dirty borders, then the dirty clusters.
+
+        Args:
+            cancel (CancelToken, optional): Token checked after each rebuilt cluster. The
+                clusters rebuilt so far stay clean and the rest stay dirty. Defaults to None.
+        """
+        self.stride, self.neighbors, self.costs = self.grid.adjacency()
+        for a, b in self.dirty_borders:
+            if b in self._neighbor_clusters(a):
+                self.borders[(a, b)] = self._build_border(a, b)
+        self.dirty_borders.clear()
+        self.clusters_rebuilt = 0
+        while self.dirty_clusters:
+            cluster = self.dirty_clusters.pop()
+            self.clusters[cluster] = self._build_cluster(cluster)
+            self.clusters_rebuilt += 1
+            if cancel is not None:
+                cancel.check()
+
+    def _cluster_at(self, x, y):
+        """
+        Get the id of the cluster containing a cell.
+
+        Args:
+            x (int): Row index.
+            y (int): Column index.
+
+        Returns:
+            int: The cluster id.
+        """
+        return (x // self.cluster_size) * self.cluster_cols + y // self.cluster_size
+
+    def _cluster_of(self, cell):
+        """
+        Get the id of the cluster containing a cell.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            int: The cluster id.
+        """
+        return self._cluster_at(*self.grid.cell_coor(cell))
+
+    def _cluster_bounds(self, cluster):
+        """
+        Get the cells covered by a cluster.
+
+        Args:
+            cluster (int): The cluster id.
+
+        Returns:
+            tuple: (x0, x1, y0, y1), the cluster covers rows x0 to x1 - 1 and columns y0 to y1 - 1.
+        """
+        i, j = divmod(cluster, self.cluster_cols)
+        x0, y0 = i * self.cluster_size, j * self.cluster_size
+        return x0, min(x0 + self.cluster_size, self.grid.num_rows), y0, min(y0 + self.cluster_size, self.grid.num_cols)
+
+    def _neighbor_clusters(self, cluster):
+        """
+        Get the clusters a path can step into from a cluster.
+
+        Args:
+            cluster (int): The cluster id.
+
+        Returns:
+            list: Ids of the clusters sharing a side with it, and with diagonal movement
+                  also those sharing a corner.
+        """
+        i, j = divmod(cluster, self.cluster_cols)
+        steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        if self.grid.moves_diagonally:
+            steps += [(-1, -1), (1, -1), (-1, 1), (1, 1)]
+        return [(i + di) * self.cluster_cols + j + dj for di, dj in steps
+                if 0 <= i + di < self.cluster_rows and 0 <= j + dj < self.cluster_cols]
+
+    def _build_border(self, a, b):
+        """
+        Choose the transitions between two neighboring clusters.
+
+        Every maximal stretch of facing free cells gets a transition in its middle, or one at
+        each end if it is at least max_entrance_width wide. With diagonal movement, a
+        diagonal crossing also gets one when both cells next to it are walls, since no
+        straight crossing can replace it then.
+
+        Args:
+            a (int): The first cluster id.
+            b (int): The second cluster id, below or to the right of a.
+
+        Returns:
+            list: Transitions (cell_a, cell_b) with cell_a in a and cell_b in b.
+        """
+        grid = self.grid
+        blocked = grid.blocked
+        ax0, ax1, ay0, ay1 = self._cluster_bounds(a)
+        bx0, bx1, by0, by1 = self._cluster_bounds(b)
+        if bx0 >= ax1 and (by0 >= ay1 or by1 <= ay0):
+            # clusters sharing a corner: a single diagonal crossing
+            ay, by = (ay1 - 1, by0) if by0 >= ay1 else (ay0, by1 - 1)
+            cell_a, cell_b = grid.cell_id(ax1 - 1, ay), grid.cell_id(bx0, by)
+            if (not blocked[cell_a] and not blocked[cell_b]
+                    and blocked[grid.cell_id(bx0, ay)] and blocked[grid.cell_id(ax1 - 1, by)]):
+                return [(cell_a, cell_b)]
+            return []
+
+        if bx0 >= ax1:  # b is below a
+            side_a = [grid.cell_id(ax1 - 1, y) for y in range(ay0, ay1)]
+            side_b = [grid.cell_id(bx0, y) for y in range(ay0, ay1)]
+        else:  # b is to the right of a
+            side_a = [grid.cell_id(x, ay1 - 1) for x in range(ax0, ax1)]
+            side_b = [grid.cell_id(x, by0) for x in range(ax0, ax1)]
+
+        transitions = []
+        width = len(side_a)
+        k = 0
+        while k < width:
+            if blocked[side_a[k]] or blocked[side_b[k]]:
+                k += 1
+                continue
+            start = k
+            while k < width and not blocked[side_a[k]] and not blocked[side_b[k]]:
+                k += 1
+            if k - start >= self.max_entrance_width:
+                transitions.append((side_a[start], side_b[start]))
+                transitions.append((side_a[k - 1], side_b[k - 1]))
+            else:
+                middle = (start + k - 1) // 2
+                transitions.append((side_a[middle], side_b[middle]))
+
+        if grid.moves_diagonally:
+            for k in range(width):
+                if blocked[side_a[k]] or not blocked[side_b[k]]:
+                    continue
+                for other in (k - 1, k + 1):
+                    if 0 <= other < width and not blocked[side_b[other]] and blocked[side_a[other]]:
+                        transitions.append((side_a[k], side_b[other]))
+        return transitions
+
+    def _build_cluster(self, cluster):
+        """
+        Compute a cluster's entrances and the edges of the abstract graph leaving them.
+
+        Args:
+            cluster (int): The cluster id.
+
+        Returns:
+            tuple: (entrances, intra, exits), see the clusters attribute.
+        """
+        grid = self.grid
+        exits = {}
+        for other in self._neighbor_clusters(cluster):
+            key = (cluster, other) if cluster < other else (other, cluster)
+            for cell_a, cell_b in self.borders.get(key, ()):
+                cell, neighbor = (cell_a, cell_b) if cluster < other else (cell_b, cell_a)
+                if grid.moves_diagonally:
+                    cost = grid.cell_edge_weight(cell, neighbor)
+                else:
+                    cost = grid.cell_weight(neighbor)
+                exits.setdefault(cell, []).append((neighbor, cost))
+        entrances = list(exits)
+
+        intra = {}
+        if entrances:
+            matrix, local = self._cluster_graph(cluster)
+            rows = [local(cell) for cell in entrances]
+            dist = csgraph_dijkstra(matrix, directed=True, indices=rows)[:, rows].tolist()
+            for cell, row in zip(entrances, dist):
+                intra[cell] = [(other, cost) for other, cost in zip(entrances, row)
+                               if other != cell and cost != math.inf]
+        return entrances, intra, exits
+
+    def _cluster_graph(self, cluster):
+        """
+        Build the graph of the moves that stay inside a cluster.
+
+        Args:
+            cluster (int): The cluster id.
+
+        Returns:
+            tuple: (matrix, local) where matrix is a sparse matrix of edge costs between the
+                   cluster's cells and local maps a cell id to its row in the matrix.
+        """
+        x0, x1, y0, y1 = self._cluster_bounds(cluster)
+        cols, stride = self.grid.num_cols, self.stride
+        width = y1 - y0
+        size = (x1 - x0) * width
+        cells = (np.arange(x0, x1)[:, None] * cols + np.arange(y0, y1)[None, :]).ravel()
+        slots = (cells[:, None] * stride + np.arange(stride)[None, :]).ravel()
+        neighbors = np.frombuffer(self.neighbors, dtype=np.dtype('l'))[slots]
+        costs = np.frombuffer(self.costs, dtype=np.float64)[slots]
+        nx, ny = np.divmod(neighbors, cols)
+        inside = (neighbors >= 0) & (nx >= x0) & (nx < x1) & (ny >= y0) & (ny < y1)
+        rows = np.repeat(np.arange(size), stride)[inside]
+        columns = (nx[inside] - x0) * width + ny[inside] - y0
+        matrix = csr_matrix((costs[inside], (rows, columns)), shape=(size, size))
+
+        def local(cell):
+            x, y = divmod(cell, cols)
+            return (x - x0) * width + y - y0
+        return matrix, local
+
+    def _cluster_costs(self, cluster, cell, other=None, reverse=False):
+        """
+        Compute the costs between a cell and the entrances of its cluster, staying inside it.
+
+        Args:
+            cluster (int): The cluster id.
+            cell (int): The cell id, e.g. the source or target.
+            other (int, optional): Another cell of the cluster to compute the cost to, e.g.
+                the target when it shares the source's cluster. Defaults to None.
+            reverse (bool, optional): Whether to compute the costs from each entrance to the
+                cell instead of from the cell to each entrance. Defaults to False.
+
+        Returns:
+            dict: The cost for each reachable entrance (and other), not including the cell itself.
+        """
+        matrix, local = self._cluster_graph(cluster)
+        if reverse:
+            matrix = matrix.T.tocsr()
+        dist = csgraph_dijkstra(matrix, directed=True, indices=local(cell))
+        ends = list(self.clusters[cluster][0])
+        if other is not None:
+            ends.append(other)
+        return {end: float(dist[local(end)]) for end in ends if end != cell and dist[local(end)] != np.inf}
+
+    def _refine(self, start, goal, cluster, cancel=None):
+        """
+        Find the cells of one abstract step with A* restricted to a cluster.
+
+        Args:
+            start (int): The cell id the step starts from.
+            goal (int): The cell id the step ends at.
+            cluster (int): The cluster the step stays in.
+            cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL cells
+                expanded by this search's refinements. Defaults to None.
+
+        Returns:
+            list: Cell ids from start to goal (inclusive).
+        """
+        grid = self.grid
+        stride, neighbors, costs = self.stride, self.neighbors, self.costs
+        x0, x1, y0, y1 = self._cluster_bounds(cluster)
+        cols = grid.num_cols
+        estimate = heuristic_function(None, grid, goal, grid.moves_diagonally)
+        frontier = PriorityQueue()
+        g = {start: 0}
+        parent = {start: None}
+        visited = set()
+        frontier.insert(start, 0)
+        while len(frontier) > 0:
+            cell = frontier.pop()
+            visited.add(cell)
+            self.refined_expanded += 1
+            if cancel is not None and self.refined_expanded % CANCEL_CHECK_INTERVAL == 0:
+                cancel.check()
+            if cell == goal:
+                break
+            for k in range(cell * stride, cell * stride + stride):
+                neighbor = neighbors[k]
+                if neighbor < 0 or neighbor in visited:
+                    continue
+                x, y = divmod(neighbor, cols)
+                if not (x0 <= x < x1 and y0 <= y < y1):
+                    continue
+                new_g = g[cell] + costs[k]
+                if new_g < g.get(neighbor, math.inf):
+                    g[neighbor] = new_g
+                    parent[neighbor] = cell
+                    priority = new_g + estimate(neighbor)
+                    if neighbor in frontier:
+                        frontier.update_priority(neighbor, priority)
+                    else:
+                        frontier.insert(neighbor, priority)
+        path = [goal]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def _heuristic(self, cell):
+        """
+        Estimate the cost from a cell to the target.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            float: The default heuristic's estimate (see heuristics.default_heuristic).
+        """
+        return self.estimate(cell)
+
+    def _node(self, cell, g):
+        """
+        Build the Node for an abstract node with the planner's costs.
+
+        Args:
+            cell (int): The cell id.
+            g (float): The abstract search's cost from the source.
+
+        Returns:
+            Node: The Node, with g set to the given cost and f to g + h.
+        """
+        node = self.grid.node(cell)
+        node.g = g
+        node.h = self._heuristic(cell)
+        node.f = node.g + node.h
+        return node
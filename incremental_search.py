@@ -0,0 +1,295 @@
+from grid import OPPOSITE_DIRECTIONS
+from priority_queue import PriorityQueue
+from heuristics import heuristic_function, min_edge_cost
+from search_algorithms import CANCEL_CHECK_INTERVAL, a_star_path_metrics, dijkstra_path_metrics
+from array import array
+import math
+
+class LPAStar:
+    def __init__(self, grid, use_heuristic=True):
+        """
+        Initialize a Lifelong Planning A* (LPA*) planner for repeated searches on one grid.
+
+        The planner keeps its g and rhs values between searches. When walls or weights change
+        (through Node.block/unblock/add_weight/remove_weight or the Grid setters), only the
+        changed cells are queued, and the next search repairs the part of the shortest-path
+        tree they affect instead of starting from scratch. Changing the source or target, the
+        weight cost or the movement mode starts a full search, and so does a change that lowers
+        the cheapest move cost the heuristic is scaled by (see heuristics.min_edge_cost).
+
+        Args:
+            grid (Grid): The grid to search. The planner registers itself as an observer.
+            use_heuristic (bool, optional): Whether to guide the search with the grid's default
+                heuristic like A* (True) or to search like Dijkstra's algorithm (False).
+                Defaults to True.
+
+        Attributes:
+            grid (Grid): The grid being searched.
+            use_heuristic (bool): Whether the default heuristic is used.
+            source_id (int or None): Source cell id of the stored search, None before the first search.
+            target_id (int or None): Target cell id of the stored search.
+            estimate (function or None): The heuristic towards the target, from
+                heuristics.heuristic_function, or None without a heuristic.
+            scale (float or None): The min_edge_cost(grid) the stored search was started with.
+            g (array): Cost from source to each cell as of the last expansion.
+            rhs (array): One-step lookahead cost from source to each cell.
+            frontier (PriorityQueue): Cells whose g and rhs disagree, keyed by (f, g).
+            changed (set): Ids of cells changed since the last search.
+            expanded (int): Number of cells expanded by the last search.
+            full_expanded (int): Number of cells expanded by the last search that started from scratch.
+        """
+        self.grid = grid
+        self.use_heuristic = use_heuristic
+        self.source_id = None
+        self.target_id = None
+        self.estimate = None
+        self.scale = None
+        self.g = None
+        self.rhs = None
+        self.frontier = None
+        self.changed = set()
+        self.expanded = 0
+        self.full_expanded = 0
+        grid.add_observer(self)
+
+    def grid_changed(self, cell):
+        """
+        Record a change to the grid; called by the grid for each wall or weight change.
+
+        Args:
+            cell (int or None): The id of the changed cell, or None if the whole grid changed.
+        """
+        if cell is None:
+            self.source_id = None
+        else:
+            self.changed.add(cell)
+
+    def close(self):
+        """
+        Stop observing the grid.
+        """
+        self.grid.remove_observer(self)
+
+    def stats(self):
+        """
+        Report the work done by the last search.
+
+        Returns:
+            dict: The cells expanded by the last search ('expanded') and by the last search
+                  that started from scratch ('full_search_expanded').
+        """
+        return {'expanded': self.expanded, 'full_search_expanded': self.full_expanded}
+
+    def search(self, source, target, cancel=None):
+        """
+        Find the shortest path from source to target, reusing the previous search if possible.
+
+        Args:
+            source (Node): The starting node.
+            target (Node): The goal node.
+            cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+                cells; the search raises jobs.SearchCancelled once it trips. The cells
+                expanded so far stay consistent, so the next search carries on from them.
+                Defaults to None.
+
+        Returns:
+            tuple: A tuple containing:
+                - visited_ordered (list): List of nodes expanded by this search, in order.
+                - path (list): List of nodes representing the shortest path from source to target (inclusive).
+                - path_length (float): Same as a_star's path_length (or dijkstra's path_cost).
+                - path_cost (float): Same as a_star's path_cost (or dijkstra's path_length).
+
+        Notes:
+            - If the source and target are the same node, returns an empty list.
+            - If no path is found, returns (visited_ordered, [], 0, 0).
+            - If the source or the target is a wall, returns ([], [], 0, 0) without searching.
+              The changes made since the last search are kept for the next one.
+            - The path cost always equals a fresh search's, but when several shortest paths
+              exist the planner may return a different one than a_star or dijkstra would.
+        """
+        if source == target:
+            return []
+        grid = self.grid
+        source_id = grid.cell_id(source.x, source.y)
+        target_id = grid.cell_id(target.x, target.y)
+        if grid.blocked[source_id] or grid.blocked[target_id]:
+            self.expanded = 0
+            return [], [], 0, 0
+        self.stride, self.neighbors, self.costs = grid.adjacency()
+
+        # a lower cheapest move cost makes the stored keys overestimate, so start over
+        full = source_id != self.source_id or target_id != self.target_id or min_edge_cost(grid) != self.scale
+        if full:
+            self._reset(source_id, target_id)
+        else:
+            for cell in self.changed:
+                self._update_cell(cell)
+                for k in range(cell * self.stride, cell * self.stride + self.stride):
+                    if self.neighbors[k] >= 0:
+                        self._update_cell(self.neighbors[k])
+        self.changed.clear()
+
+        visited_ordered = self._compute_shortest_path(cancel)
+        self.expanded = len(visited_ordered)
+        if full:
+            self.full_expanded = self.expanded
+
+        visited_nodes = [self._node(cell) for cell in visited_ordered]
+        if self.g[target_id] == math.inf:
+            return visited_nodes, [], 0, 0
+
+        path = self._extract_path()
+        if not path:
+            return visited_nodes, [], 0, 0
+        if self.use_heuristic:
+            f = {cell: self.g[cell] + self._heuristic(cell) for cell in path}
+            f[target_id] = 0
+            path_length, path_cost = a_star_path_metrics(grid, path, f, grid.moves_diagonally)
+        else:
+            path_length, path_cost = dijkstra_path_metrics(grid, path, grid.moves_diagonally)
+        return visited_nodes, [self._node(cell) for cell in path], path_length, path_cost
+
+    def _reset(self, source_id, target_id):
+        """
+        Discard the stored search and start a new one from source_id to target_id.
+
+        Args:
+            source_id (int): The source cell id.
+            target_id (int): The target cell id.
+        """
+        size = len(self.grid)
+        self.source_id = source_id
+        self.target_id = target_id
+        self.scale = min_edge_cost(self.grid)
+        if self.use_heuristic:
+            self.estimate = heuristic_function(None, self.grid, target_id, self.grid.moves_diagonally)
+        self.g = array('d', [math.inf]) * size
+        self.rhs = array('d', [math.inf]) * size
+        self.frontier = PriorityQueue()
+        self.rhs[source_id] = 0
+        self.frontier.insert(source_id, self._key(source_id))
+
+    def _heuristic(self, cell):
+        """
+        Estimate the cost from a cell to the target.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            float: The default heuristic's estimate (see heuristics.default_heuristic), or 0
+                   without a heuristic.
+        """
+        if not self.use_heuristic:
+            return 0
+        return self.estimate(cell)
+
+    def _key(self, cell):
+        """
+        Calculate a cell's priority in the frontier.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            tuple: (min(g, rhs) + h, min(g, rhs)).
+        """
+        cost = min(self.g[cell], self.rhs[cell])
+        return (cost + self._heuristic(cell), cost)
+
+    def _update_cell(self, cell):
+        """
+        Recompute a cell's rhs value from its neighbors and requeue it if it is inconsistent.
+
+        Args:
+            cell (int): The cell id.
+        """
+        if cell != self.source_id:
+            rhs = math.inf
+            if not self.grid.blocked[cell]:
+                stride, neighbors, costs, g = self.stride, self.neighbors, self.costs, self.g
+                for k in range(stride):
+                    neighbor = neighbors[cell * stride + k]
+                    if neighbor >= 0:
+                        cost = g[neighbor] + costs[neighbor * stride + OPPOSITE_DIRECTIONS[k]]
+                        if cost < rhs:
+                            rhs = cost
+            self.rhs[cell] = rhs
+        if cell in self.frontier:
+            self.frontier.remove(cell)
+        if self.g[cell] != self.rhs[cell]:
+            self.frontier.insert(cell, self._key(cell))
+
+    def _compute_shortest_path(self, cancel=None):
+        """
+        Expand inconsistent cells until the target's cost is settled.
+
+        Args:
+            cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL
+                expanded cells. Defaults to None.
+
+        Returns:
+            list: Ids of the expanded cells, in order.
+        """
+        g, rhs, frontier = self.g, self.rhs, self.frontier
+        stride, neighbors = self.stride, self.neighbors
+        target_id = self.target_id
+        visited_ordered = []
+        while len(frontier) > 0 and (frontier.peek()[0] < self._key(target_id) or rhs[target_id] != g[target_id]):
+            if cancel is not None and len(visited_ordered) % CANCEL_CHECK_INTERVAL == 0:
+                cancel.check()
+            cell = frontier.pop()
+            visited_ordered.append(cell)
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = math.inf
+                self._update_cell(cell)
+            for k in range(cell * stride, cell * stride + stride):
+                if neighbors[k] >= 0:
+                    self._update_cell(neighbors[k])
+        return visited_ordered
+
+    def _extract_path(self):
+        """
+        Walk back from the target along the cheapest predecessors.
+
+        Returns:
+            list: Cell ids from source to target (inclusive), or an empty list if the walk
+                  reaches a cell without a predecessor of finite cost or does not reach the
+                  source within one step per cell.
+        """
+        stride, neighbors, costs, g = self.stride, self.neighbors, self.costs, self.g
+        path = [self.target_id]
+        for _ in range(len(self.grid)):
+            cell = path[-1]
+            if cell == self.source_id:
+                path.reverse()
+                return path
+            best, best_cost = None, math.inf
+            for k in range(stride):
+                neighbor = neighbors[cell * stride + k]
+                if neighbor >= 0:
+                    cost = g[neighbor] + costs[neighbor * stride + OPPOSITE_DIRECTIONS[k]]
+                    if cost < best_cost:
+                        best, best_cost = neighbor, cost
+            if best is None:
+                return []
+            path.append(best)
+        return []
+
+    def _node(self, cell):
+        """
+        Build the Node for a cell with the planner's costs.
+
+        Args:
+            cell (int): The cell id.
+
+        Returns:
+            Node: The Node, with g set to the planner's cost and f to g + h.
+        """
+        node = self.grid.node(cell)
+        node.g = self.g[cell]
+        node.h = self._heuristic(cell)
+        node.f = node.g + node.h
+        return node
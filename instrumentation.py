@@ -0,0 +1,166 @@
+from bisect import bisect_left
+import threading
+import time
+
+# Upper bounds (in seconds) of the search latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Upper bounds (in cells) of the grid size label, e.g. 2500 for grids up to 50x50
+GRID_SIZE_BOUNDS = (2500, 10000, 62500, 250000, 1000000)
+# Search counters and the metric each one is added to
+COUNTER_METRICS = {
+    'expanded': 'pathfinder_nodes_expanded_total',
+    'relaxations': 'pathfinder_relaxations_total',
+    'heap_pushes': 'pathfinder_heap_pushes_total',
+    'heap_pops': 'pathfinder_heap_pops_total',
+    'heap_decrease_keys': 'pathfinder_heap_decrease_keys_total',
+}
+
+class SearchStats:
+    def __init__(self):
+        """
+        Initialize SearchStats, the work counters and phase times of one request.
+
+        Phases are timed as laps: mark(phase) charges the time since the previous mark (or
+        since the stats were created) to that phase, so timing a phase costs one clock read.
+
+        Attributes:
+            counters (dict): Work counters filled by the search, see search_algorithms._record_stats.
+            phases (dict): Seconds spent in each phase, e.g. 'grid', 'walls', 'search', 'result'.
+            last (float): perf_counter() time of the last mark.
+        """
+        self.counters = {}
+        self.phases = {}
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """
+        Charge the time since the last mark to a phase.
+
+        Args:
+            phase (str): Name of the phase that just ended.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def total(self):
+        """
+        Get the time spent in all phases.
+
+        Returns:
+            float: The total in seconds.
+        """
+        return sum(self.phases.values())
+
+    def to_dict(self):
+        """
+        Get the stats in the form attached to responses.
+
+        Returns:
+            dict: The counters, plus the phase times in milliseconds under 'phases_ms'.
+        """
+        return {**self.counters, 'phases_ms': {phase: seconds * 1000 for phase, seconds in self.phases.items()}}
+
+def grid_size_label(num_cells):
+    """
+    Get the grid size label of a grid, the smallest of GRID_SIZE_BOUNDS it fits in.
+
+    Args:
+        num_cells (int): Number of cells in the grid.
+
+    Returns:
+        str: The bound as a string, or '+Inf' for grids larger than all of them.
+    """
+    index = bisect_left(GRID_SIZE_BOUNDS, num_cells)
+    return str(GRID_SIZE_BOUNDS[index]) if index < len(GRID_SIZE_BOUNDS) else '+Inf'
+
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Initialize Metrics, a thread-safe registry of search metrics rendered in the
+        Prometheus text format.
+
+        Args:
+            buckets (tuple, optional): Upper bounds of the latency histogram buckets, in
+                seconds. Defaults to LATENCY_BUCKETS.
+
+        Attributes:
+            buckets (tuple): Upper bounds of the latency histogram buckets.
+            latencies (dict): Maps (algorithm, grid_size, cache) to [bucket counts, sum], where
+                              the bucket counts are per bucket plus one for +Inf, not cumulative.
+            counters (dict): Maps (metric name, labels) to the counter value.
+            lock (Lock): Guards latencies and counters.
+        """
+        self.buckets = buckets
+        self.latencies = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def observe(self, algorithm, num_cells, seconds, stats=None, cache='miss'):
+        """
+        Record one search request.
+
+        Args:
+            algorithm (str): The algorithm label, e.g. 'astar' or 'bidirectional_dijkstra'.
+            num_cells (int): Number of cells in the grid.
+            seconds (float): Time taken to answer the request.
+            stats (SearchStats, optional): The request's counters and phase times to add to
+                the totals. Defaults to None.
+            cache (str, optional): 'hit' if the request was answered from the result cache,
+                otherwise 'miss'. Defaults to 'miss'.
+        """
+        key = (algorithm, grid_size_label(num_cells), cache)
+        index = bisect_left(self.buckets, seconds)
+        with self.lock:
+            histogram = self.latencies.get(key)
+            if histogram is None:
+                histogram = self.latencies[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            if stats is not None:
+                for name, value in stats.counters.items():
+                    metric = COUNTER_METRICS.get(name)
+                    if metric is not None:
+                        self._add(metric, (('algorithm', algorithm),), value)
+                for phase, phase_seconds in stats.phases.items():
+                    self._add('pathfinder_phase_seconds_total', (('algorithm', algorithm), ('phase', phase)), phase_seconds)
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            str: The metrics.
+        """
+        lines = ['# HELP pathfinder_search_duration_seconds Time taken to answer a search request.',
+                 '# TYPE pathfinder_search_duration_seconds histogram']
+        with self.lock:
+            for (algorithm, grid_size, cache), (counts, total) in sorted(self.latencies.items()):
+                labels = f'algorithm="{algorithm}",grid_size="{grid_size}",cache="{cache}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'pathfinder_search_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'pathfinder_search_duration_seconds_sum{{{labels}}} {total}')
+                lines.append(f'pathfinder_search_duration_seconds_count{{{labels}}} {cumulative}')
+
+            names = sorted(set(name for name, _ in self.counters))
+            for name in names:
+                lines.append(f'# TYPE {name} counter')
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        label_text = ','.join(f'{label}="{label_value}"' for label, label_value in labels)
+                        lines.append(f'{name}{{{label_text}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _add(self, name, labels, value):
+        """
+        Add to a counter. The caller must hold the lock.
+
+        Args:
+            name (str): The metric name.
+            labels (tuple): The (label, value) pairs of the counter.
+            value (float): The amount to add.
+        """
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
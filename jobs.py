@@ -0,0 +1,248 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Final states of a job
+FINISHED_STATES = ('done', 'failed', 'cancelled', 'timeout')
+
+class SearchCancelled(Exception):
+    def __init__(self, reason):
+        """
+        Initialize SearchCancelled, raised inside a search whose CancelToken was cancelled
+        or ran past its deadline.
+
+        Args:
+            reason (str): 'cancelled' or 'timeout'.
+
+        Attributes:
+            reason (str): Why the search stopped.
+        """
+        super().__init__(reason)
+        self.reason = reason
+
+class CancelToken:
+    def __init__(self, timeout=None):
+        """
+        Initialize CancelToken, which a search checks now and then to stop early.
+
+        Searches call check() every few hundred expanded cells (see
+        search_algorithms.CANCEL_CHECK_INTERVAL), so a cancelled or late search stops within
+        a few milliseconds without being interrupted in the middle of updating its state.
+
+        Args:
+            timeout (float, optional): Seconds from now after which the search is stopped.
+                Defaults to None, no deadline.
+
+        Attributes:
+            deadline (float or None): time.monotonic() time after which check() raises.
+            reason (str or None): 'cancelled' or 'timeout' once the token has tripped.
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+
+    def cancel(self, reason='cancelled'):
+        """
+        Ask the search to stop at its next check.
+
+        Args:
+            reason (str, optional): Reason reported by SearchCancelled. Defaults to 'cancelled'.
+        """
+        if self.reason is None:
+            self.reason = reason
+
+    def check(self):
+        """
+        Stop the search if it was cancelled or its deadline has passed.
+
+        Raises:
+            SearchCancelled: If the token has tripped.
+        """
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = 'timeout'
+        if self.reason is not None:
+            raise SearchCancelled(self.reason)
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when too many jobs are queued or running."""
+
+class Job:
+    def __init__(self, timeout=None):
+        """
+        Initialize Job, one search run by a JobManager.
+
+        Args:
+            timeout (float, optional): Seconds the job may take from its submission,
+                including the time spent queued. Defaults to None, no deadline.
+
+        Attributes:
+            id (str): Unique id of the job.
+            token (CancelToken): Token the search checks for cancellation.
+            status (str): 'queued', 'running', or one of FINISHED_STATES.
+            result: Return value of the job's function once done.
+            created (float): time.monotonic() time of submission.
+            finished_at (float or None): time.monotonic() time it finished.
+            finished (Event): Set once the job reaches a final state.
+        """
+        self.id = uuid.uuid4().hex
+        self.token = CancelToken(timeout)
+        self.status = 'queued'
+        self.result = None
+        self.created = time.monotonic()
+        self.finished_at = None
+        self.finished = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the job to finish.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most. Defaults to None, no limit.
+
+        Returns:
+            bool: Whether the job finished.
+        """
+        return self.finished.wait(timeout)
+
+    def to_dict(self):
+        """
+        Get the job's state in the form returned by the /jobs routes.
+
+        Returns:
+            dict: 'job_id', 'status' and 'elapsed_ms'.
+        """
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return {'job_id': self.id, 'status': self.status, 'elapsed_ms': (end - self.created) * 1000}
+
+class JobManager:
+    def __init__(self, max_workers=1, max_pending=4, ttl=300):
+        """
+        Initialize JobManager, a bounded pool of threads that run searches off the request
+        thread, with a deadline and a cancellation token per search.
+
+        At most max_workers searches run at once and max_pending more wait for a thread;
+        further submissions are refused, so a few huge requests cannot tie up every worker.
+        Finished jobs are kept for ttl seconds so their results can be polled.
+
+        Args:
+            max_workers (int, optional): Number of search threads. Defaults to 1.
+            max_pending (int, optional): Number of jobs that may wait for a thread. Defaults to 4.
+            ttl (float, optional): Seconds a finished job is kept. Defaults to 300.
+
+        Attributes:
+            max_workers (int): Number of search threads.
+            max_pending (int): Number of jobs that may wait for a thread.
+            ttl (float): Seconds a finished job is kept.
+            executor (ThreadPoolExecutor or None): The threads, started on first use.
+            jobs (dict): Maps job ids to Job objects.
+            lock (Lock): Guards executor and jobs.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.executor = None
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, function, timeout=None):
+        """
+        Queue a search.
+
+        Args:
+            function (callable): Called on a search thread with the job's CancelToken; its
+                return value becomes the job's result. It should pass the token to the search.
+            timeout (float, optional): Seconds the job may take from now. Defaults to None.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            JobQueueFull: If max_workers + max_pending jobs are already queued or running.
+        """
+        job = Job(timeout)
+        with self.lock:
+            self._prune()
+            active = sum(1 for other in self.jobs.values() if other.status not in FINISHED_STATES)
+            if active >= self.max_workers + self.max_pending:
+                raise JobQueueFull()
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='search')
+            self.jobs[job.id] = job
+            self.executor.submit(self._run, job, function)
+        return job
+
+    def get(self, job_id):
+        """
+        Look up a job.
+
+        Args:
+            job_id (str): The job's id.
+
+        Returns:
+            Job or None: The job, or None if it is unknown or expired.
+        """
+        with self.lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A queued job never starts and a running one stops at its next check.
+
+        Args:
+            job_id (str): The job's id.
+
+        Returns:
+            Job or None: The job, or None if it is unknown or expired.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            job.token.cancel()
+        return job
+
+    def stats(self):
+        """
+        Get the number of jobs in each state.
+
+        Returns:
+            dict: Maps each state to its number of jobs.
+        """
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+    def _run(self, job, function):
+        """
+        Run a job on a search thread and record how it ended.
+
+        Args:
+            job (Job): The job.
+            function (callable): The job's function.
+        """
+        try:
+            job.token.check()  # cancelled or out of time while queued
+            job.status = 'running'
+            job.result = function(job.token)
+            job.status = 'done'
+        except SearchCancelled as e:
+            job.status = e.reason
+        except Exception:
+            logger.exception('Job %s failed', job.id)
+            job.status = 'failed'
+        job.finished_at = time.monotonic()
+        job.finished.set()
+
+    def _prune(self):
+        """
+        Forget jobs that finished more than ttl seconds ago. The caller must hold the lock.
+        """
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
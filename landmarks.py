@@ -0,0 +1,88 @@
+from search_algorithms import dijkstra_distance_field
+import numpy as np
+
+class Landmarks:
+    def __init__(self, grid, count=8):
+        """
+        Initialize Landmarks, the distance tables of the ALT ('alt') heuristic.
+
+        A few landmark cells are spread over the grid by farthest-point selection and the
+        cost from each of them to every cell is computed with Dijkstra's algorithm. For any
+        landmark L, d(L, goal) - d(L, cell) is a lower bound on the cost from cell to goal, which
+        is much tighter than a distance heuristic on maps with walls. The tables are rebuilt on
+        first use after the grid changes, so they pay off for repeated queries on a grid that
+        stays the same.
+
+        Args:
+            grid (Grid): The grid to build the tables for. Diagonal moves cost sqrt(2) times the
+                cell weight when the grid moves diagonally.
+            count (int, optional): Number of landmarks. Defaults to 8.
+
+        Attributes:
+            grid (Grid): The grid the tables are built for.
+            count (int): Number of landmarks.
+            moves_diagonally (bool): Movement mode the tables were built with.
+            cells (list): Ids of the landmark cells.
+            distances (list): For each landmark, an array with the cost from it to each cell,
+                              infinity if unreachable.
+            stale (bool): Whether the grid changed since the tables were built.
+        """
+        self.grid = grid
+        self.count = count
+        self.moves_diagonally = bool(grid.moves_diagonally)
+        self.cells = []
+        self.distances = []
+        self.stale = True
+        grid.add_observer(self)
+
+    def grid_changed(self, cell):
+        """
+        Mark the tables as out of date after a change to the grid.
+
+        Args:
+            cell (int or None): The id of the cell that changed, or None for the whole grid.
+        """
+        self.stale = True
+        self.moves_diagonally = bool(self.grid.moves_diagonally)
+
+    def close(self):
+        """
+        Stop following changes to the grid.
+        """
+        self.grid.remove_observer(self)
+
+    def tables(self):
+        """
+        Get the landmark distance tables, rebuilding them if the grid changed.
+
+        Returns:
+            list: One array per landmark with the cost from it to each cell.
+        """
+        if self.stale:
+            self._build()
+        return self.distances
+
+    def _build(self):
+        """
+        Pick the landmarks and compute their distance tables.
+
+        The first landmark is the cell farthest from the first open cell; each next one is
+        the cell farthest from all landmarks picked so far.
+        """
+        grid = self.grid
+        self.cells = []
+        self.distances = []
+        open_cells = np.flatnonzero(np.frombuffer(grid.blocked, dtype=np.uint8) == 0)
+        if len(open_cells):
+            _, distances, _ = dijkstra_distance_field(grid, grid.node(int(open_cells[0])), self.moves_diagonally)
+            nearest = np.frombuffer(distances, dtype=np.float64).copy()
+            while len(self.cells) < self.count:
+                reachable = np.where(np.isfinite(nearest), nearest, -1)
+                cell = int(np.argmax(reachable))
+                if reachable[cell] <= 0 and self.cells:
+                    break  # every reachable cell already is a landmark
+                _, distances, _ = dijkstra_distance_field(grid, grid.node(cell), self.moves_diagonally)
+                self.cells.append(cell)
+                self.distances.append(distances)
+                nearest = np.minimum(nearest if len(self.cells) > 1 else np.inf, np.frombuffer(distances, dtype=np.float64))
+        self.stale = False
@@ -1,12 +1,14 @@
 
 class Node:
-    def __init__(self, x, y):
+    def __init__(self, x, y, grid=None):
         """
         Initialize a Node object representing a cell in the grid.
 
         Args:
             x (int): The row index of the node.
             y (int): The column index of the node.
+            grid (Grid, optional): The grid that owns this cell. When set, wall and weight
+                changes are written through to the grid's cell arrays. Defaults to None.
 
         Attributes:
             x (int): Row index.
@@ -18,6 +20,7 @@ class Node:
             f (float): Total cost (g + h).
             blocked (bool): Whether the node is blocked (wall).
             weighted (bool): Whether the node is weighted.
+            grid (Grid or None): The grid that owns this cell, if any.
         """
         self.x = x
         self.y = y
@@ -29,6 +32,7 @@ class Node:
         self.f = float('inf')
         self.blocked = False
         self.weighted = False
+        self.grid = grid
 
     def __eq__(self, other):
         """
@@ -103,12 +107,16 @@ class Node:
         Mark this node as blocked (wall).
         """
         self.blocked = True
+        if self.grid is not None:
+            self.grid.set_blocked(self.coor, True)
 
     def unblock(self):
         """
         Mark this node as unblocked (not a wall).
         """
         self.blocked = False
+        if self.grid is not None:
+            self.grid.set_blocked(self.coor, False)
 
     def is_blocked(self):
         """
@@ -124,12 +132,16 @@ class Node:
         Mark this node as weighted.
         """
         self.weighted = True
+        if self.grid is not None:
+            self.grid.set_weighted(self.coor, True)
 
     def remove_weight(self):
         """
         Remove the weighted status from this node.
         """
         self.weighted = False
+        if self.grid is not None:
+            self.grid.set_weighted(self.coor, False)
 
     def is_weighted(self):
         """
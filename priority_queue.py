@@ -1,14 +1,20 @@
-import heapq
+import bisect
 
 class PriorityQueue(object):
     """
     A queue structure where each element is served in order of priority.
-    Higher priority elements are popped before lower priority elements.  
+    Higher priority elements are popped before lower priority elements.
     If two elements have the same priority, they pop in the order they were added to the queue.
 
+    The queue is a binary min-heap indexed by node, so insert, pop and update_priority
+    run in O(log n) and membership checks run in O(1).
+
     Attributes:
-        queue (list): List of tuples (priority, counter, node) in the priority queue.
-        counter (int): Counter to maintain insertion order for nodes with equal priority.
+        queue (list): Binary heap of tuples (priority, counter, node).
+        index (dict): Maps each queued node to its position in the heap.
+        counter (int): Counter to maintain insertion order for nodes with equal priority,
+                       which is also the number of inserts.
+        updates (int): Number of update_priority calls for queued nodes.
     """
 
     def __init__(self):
@@ -16,7 +22,9 @@ class PriorityQueue(object):
         Initialize a new Priority Queue.
         """
         self.queue = []
+        self.index = {}
         self.counter = 0
+        self.updates = 0
 
     def __iter__(self):
         """
@@ -35,7 +43,7 @@ class PriorityQueue(object):
             str: String representation of the queue.
         """
         return f"{self.queue}"
-    
+
     def pop(self):
         """
         Remove and return the node with the highest priority (lowest f value).
@@ -47,31 +55,87 @@ class PriorityQueue(object):
         Raises:
             KeyError: If the priority queue is empty.
         """
-        while self.queue:
-            heapq.heapify(self.queue)
-            _, _, node = heapq.heappop(self.queue)
-            return node
-        raise KeyError('This priority queue is empty')
+        if not self.queue:
+            raise KeyError('This priority queue is empty')
+        queue = self.queue
+        last = queue.pop()
+        del self.index[last[2]]
+        if not queue:
+            return last[2]
+        top = queue[0]
+        del self.index[top[2]]
+        queue[0] = last
+        self.index[last[2]] = 0
+        self._sift_down(0)
+        return top[2]
+
+    def peek(self):
+        """
+        Return the node with the highest priority and its priority without removing it.
+
+        Returns:
+            tuple: A tuple (priority, node).
+
+        Raises:
+            KeyError: If the priority queue is empty.
+        """
+        if not self.queue:
+            raise KeyError('This priority queue is empty')
+        priority, _, node = self.queue[0]
+        return priority, node
 
-    def insert(self, node):
+    def insert(self, node, priority=None):
         """
         Insert a node into the priority queue.
 
         Args:
-            node (Node): The node to insert. Its priority is determined by its f value.
+            node (Node): The node to insert.
+            priority (float, optional): The node's priority. Defaults to the node's f value.
         """
-        self.queue.append((node.f, self.counter, node))
+        if priority is None:
+            priority = node.f
+        self.queue.append((priority, self.counter, node))
+        self.index[node] = len(self.queue) - 1
         self.counter += 1
+        self._sift_up(len(self.queue) - 1)
 
     def update_priority(self, node, new_priority):
         """
         Update the priority (f value) of a specific node in the queue.
+        The node keeps its original insertion order for tie-breaking.
 
         Args:
             node (Node): The node whose priority should be updated.
             new_priority (float): The new priority value (f value) for the node.
         """
-        self.queue = [(new_priority, x[1], node) if x[2] == node else x for x in self.queue]
+        pos = self.index.get(node)
+        if pos is None:
+            return
+        self.updates += 1
+        old_priority, count, _ = self.queue[pos]
+        self.queue[pos] = (new_priority, count, node)
+        if new_priority < old_priority:
+            self._sift_up(pos)
+        else:
+            self._sift_down(pos)
+
+    def remove(self, node):
+        """
+        Remove a specific node from the priority queue.
+
+        Args:
+            node (Node): The node to remove.
+
+        Raises:
+            KeyError: If the node is not in the queue.
+        """
+        pos = self.index.pop(node)
+        last = self.queue.pop()
+        if pos < len(self.queue):
+            self.queue[pos] = last
+            self.index[last[2]] = pos
+            self._sift_up(pos)
+            self._sift_down(self.index[last[2]])
 
     def __contains__(self, node):
         """
@@ -83,7 +147,7 @@ class PriorityQueue(object):
         Returns:
             bool: True if the node is in the queue, False otherwise.
         """
-        return node in [n[-1] for n in self.queue]
+        return node in self.index
 
     def __eq__(self, other):
         """
@@ -110,4 +174,196 @@ class PriorityQueue(object):
         """
         Remove all nodes from the priority queue.
         """
-        self.queue = []
\ No newline at end of file
+        self.queue = []
+        self.index = {}
+
+    def _sift_up(self, pos):
+        """
+        Move the entry at pos towards the root until the heap property holds.
+
+        Args:
+            pos (int): Heap position of the entry to move.
+        """
+        queue = self.queue
+        index = self.index
+        entry = queue[pos]
+        while pos > 0:
+            parent_pos = (pos - 1) >> 1
+            parent = queue[parent_pos]
+            if entry < parent:
+                queue[pos] = parent
+                index[parent[2]] = pos
+                pos = parent_pos
+            else:
+                break
+        queue[pos] = entry
+        index[entry[2]] = pos
+
+    def _sift_down(self, pos):
+        """
+        Move the entry at pos towards the leaves until the heap property holds.
+
+        Args:
+            pos (int): Heap position of the entry to move.
+        """
+        queue = self.queue
+        index = self.index
+        size = len(queue)
+        entry = queue[pos]
+        child_pos = 2 * pos + 1
+        while child_pos < size:
+            right_pos = child_pos + 1
+            if right_pos < size and queue[right_pos] < queue[child_pos]:
+                child_pos = right_pos
+            child = queue[child_pos]
+            if child < entry:
+                queue[pos] = child
+                index[child[2]] = pos
+                pos = child_pos
+                child_pos = 2 * pos + 1
+            else:
+                break
+        queue[pos] = entry
+        index[entry[2]] = pos
+
+
+class BucketQueue(object):
+    """
+    A priority queue for small non-negative integer priorities (Dial's algorithm).
+    Nodes are kept in one bucket per priority, in a ring of max_step + 1 buckets, so insert,
+    update_priority and pop take O(1) time apart from ordering ties within a bucket.
+    If two elements have the same priority, they pop in the order they were added to the queue,
+    exactly like PriorityQueue.
+
+    Priorities must never be lower than the last popped priority, and never more than max_step
+    above it. Dijkstra's algorithm with integer edge costs between 1 and max_step satisfies both,
+    and so does A* with the Manhattan heuristic when edge costs plus 1 stay within max_step.
+
+    Attributes:
+        max_step (int): Largest allowed gap between a new priority and the current one.
+        buckets (list): Ring of buckets, each a list of (-counter, node) entries.
+        entries (dict): Maps each queued node to its (priority, counter).
+        current (int or None): The priority being popped, None until the first insert.
+        drain (list): Entries of the current priority, sorted so the next node is last.
+        counter (int): Counter to maintain insertion order for nodes with equal priority,
+                       which is also the number of inserts.
+        updates (int): Number of update_priority calls for queued nodes.
+    """
+
+    def __init__(self, max_step):
+        """
+        Initialize a new Bucket Queue.
+
+        Args:
+            max_step (int): Largest allowed gap between a new priority and the current one,
+                i.e. the largest edge cost.
+        """
+        self.max_step = int(max_step)
+        self.buckets = [[] for _ in range(self.max_step + 1)]
+        self.entries = {}
+        self.current = None
+        self.drain = []
+        self.counter = 0
+        self.updates = 0
+
+    def pop(self):
+        """
+        Remove and return the node with the lowest priority.
+        If multiple nodes have the same priority, the one inserted first is returned.
+
+        Returns:
+            Node: The node with the lowest priority.
+
+        Raises:
+            KeyError: If the queue is empty.
+        """
+        if not self.entries:
+            raise KeyError('This priority queue is empty')
+        while True:
+            while self.drain:
+                neg_count, node = self.drain.pop()
+                if self.entries.get(node) == (self.current, -neg_count):
+                    del self.entries[node]
+                    return node
+            # move on to the next bucket; stale entries of moved nodes are skipped above
+            self.current += 1
+            slot = self.current % len(self.buckets)
+            self.drain = self.buckets[slot]
+            self.drain.sort()
+            self.buckets[slot] = []
+
+    def insert(self, node, priority):
+        """
+        Insert a node into the queue.
+
+        Args:
+            node (Node): The node to insert.
+            priority (int): The node's priority.
+
+        Raises:
+            ValueError: If the priority is out of the queue's range.
+        """
+        self._place(node, priority, self.counter)
+        self.counter += 1
+
+    def update_priority(self, node, new_priority):
+        """
+        Update the priority of a specific node in the queue.
+        The node keeps its original insertion order for tie-breaking.
+
+        Args:
+            node (Node): The node whose priority should be updated.
+            new_priority (int): The new priority value for the node.
+
+        Raises:
+            ValueError: If the priority is out of the queue's range.
+        """
+        entry = self.entries.get(node)
+        if entry is None:
+            return
+        self.updates += 1
+        self._place(node, new_priority, entry[1])
+
+    def _place(self, node, priority, count):
+        """
+        Record a node's priority and add it to the matching bucket.
+
+        Args:
+            node (Node): The node.
+            priority (int): The node's priority.
+            count (int): The node's insertion counter.
+
+        Raises:
+            ValueError: If the priority is out of the queue's range.
+        """
+        if self.current is None:
+            self.current = int(priority)
+        step = priority - self.current
+        if step < 0 or step > self.max_step or step % 1 != 0:
+            raise ValueError(f'Priority {priority} is out of range for this bucket queue')
+        self.entries[node] = (priority, count)
+        if step == 0:
+            bisect.insort(self.drain, (-count, node))
+        else:
+            self.buckets[int(priority) % len(self.buckets)].append((-count, node))
+
+    def __contains__(self, node):
+        """
+        Check if a node is present in the queue.
+
+        Args:
+            node (Node): The node to check for.
+
+        Returns:
+            bool: True if the node is in the queue, False otherwise.
+        """
+        return node in self.entries
+
+    def __len__(self):
+        """
+        Return the number of nodes in the queue.
+
+        Returns:
+            int: The number of nodes in the queue.
+        """
+        return len(self.entries)
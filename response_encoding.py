@@ -0,0 +1,181 @@
+import gzip
+import json
+import struct
+import numpy as np
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are only gzip-compressed
+    brotli = None
+
+# Media type of the binary search result format
+BINARY_MIMETYPE = 'application/vnd.pav.search-result'
+# Ways to store the cell id arrays of the binary format
+ARRAY_ENCODINGS = ['raw', 'delta', 'rle']
+
+_MAGIC = b'PAVR'
+_VERSION = 1
+# magic, version, array encoding, reserved, num_cols, path_length, path_cost, visited count, path count
+_HEADER = struct.Struct('<4sBBHIddII')
+
+def encode_result(result, num_cols, array_encoding='raw'):
+    """
+    Encode a search result in the compact binary format.
+
+    Layout (little-endian):
+        - header: magic b'PAVR', uint8 version (1), uint8 array encoding (index in
+          ARRAY_ENCODINGS), uint16 reserved, uint32 num_cols, float64 path_length,
+          float64 path_cost, uint32 number of visited cells, uint32 number of path cells
+        - visited cell ids (x * num_cols + y), as a cell array
+        - node_costs, float32 per visited cell
+        - path cell ids, as a cell array
+        - uint32 byte length, then a UTF-8 JSON object with the result's other fields
+          (e.g. 'scanned' or planner statistics), {} if there are none
+
+    A cell array is a uint32 word count followed by that many 32-bit words: the uint32 ids
+    ('raw'), the first id and the int32 differences between consecutive ids ('delta'), or
+    (int32 difference, uint32 repeat count) pairs of the 'delta' words, with the first id
+    counted as a difference from 0 ('rle'). Delta and run-length encoding make visited
+    orders and paths, which mostly step to nearby cells, compress much better.
+
+    Args:
+        result (dict): A result from run_search. Without 'visited' and 'node_costs' (a
+            search without trace), both are encoded as empty.
+        num_cols (int): Number of columns in the grid.
+        array_encoding (str, optional): One of ARRAY_ENCODINGS. Defaults to 'raw'.
+
+    Returns:
+        bytes: The encoded result.
+
+    Raises:
+        ValueError: If array_encoding is unknown.
+    """
+    if array_encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f'Unknown array encoding {array_encoding!r}')
+    visited = _cell_ids(result.get('visited', []), num_cols)
+    path = _cell_ids(result['path'], num_cols)
+    extras = {key: value for key, value in result.items()
+              if key not in ('visited', 'path', 'node_costs', 'path_length', 'path_cost')}
+    extras = json.dumps(extras, separators=(',', ':')).encode()
+
+    header = _HEADER.pack(_MAGIC, _VERSION, ARRAY_ENCODINGS.index(array_encoding), 0, num_cols,
+                          result['path_length'], result['path_cost'], len(visited), len(path))
+    return b''.join([header,
+                     _encode_cells(visited, array_encoding),
+                     np.asarray(result.get('node_costs', []), dtype='<f4').tobytes(),
+                     _encode_cells(path, array_encoding),
+                     struct.pack('<I', len(extras)), extras])
+
+def decode_result(data):
+    """
+    Decode a search result encoded by encode_result.
+
+    Args:
+        data (bytes): The encoded result.
+
+    Returns:
+        dict: The result with 'visited' and 'path' as lists of (x, y) coordinates and
+              'node_costs' as float32 values, plus the other fields.
+
+    Raises:
+        ValueError: If data is not in the binary format.
+    """
+    magic, version, encoding, _, num_cols, path_length, path_cost, visited_count, path_count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError('Not an encoded search result')
+    array_encoding = ARRAY_ENCODINGS[encoding]
+    offset = _HEADER.size
+    visited, offset = _decode_cells(data, offset, array_encoding)
+    node_costs = np.frombuffer(data, dtype='<f4', count=visited_count, offset=offset)
+    offset += 4 * visited_count
+    path, offset = _decode_cells(data, offset, array_encoding)
+    (extras_length,) = struct.unpack_from('<I', data, offset)
+    extras = json.loads(data[offset + 4:offset + 4 + extras_length])
+
+    result = {'visited': [divmod(cell, num_cols) for cell in visited.tolist()],
+              'path': [divmod(cell, num_cols) for cell in path.tolist()],
+              'path_length': path_length, 'path_cost': path_cost, 'node_costs': node_costs.tolist()}
+    result.update(extras)
+    return result
+
+def compress(body, accept_encodings):
+    """
+    Compress a response body with the best encoding the client accepts.
+
+    Args:
+        body (bytes): The response body.
+        accept_encodings (Accept): The request's parsed Accept-Encoding header.
+
+    Returns:
+        tuple: (body, encoding) where encoding is 'br', 'gzip' or None if the body was
+               left uncompressed.
+    """
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+    encoding = accept_encodings.best_match(offers)
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
+
+def _cell_ids(coordinates, num_cols):
+    """
+    Convert a list of (x, y) coordinates to an array of cell ids.
+
+    Args:
+        coordinates (list): List of (x, y) coordinates.
+        num_cols (int): Number of columns in the grid.
+
+    Returns:
+        ndarray: The int64 cell ids.
+    """
+    cells = np.asarray(coordinates, dtype=np.int64).reshape(-1, 2)
+    return cells[:, 0] * num_cols + cells[:, 1]
+
+def _encode_cells(cells, array_encoding):
+    """
+    Encode a cell array for encode_result.
+
+    Args:
+        cells (ndarray): The cell ids.
+        array_encoding (str): One of ARRAY_ENCODINGS.
+
+    Returns:
+        bytes: The word count and the words.
+    """
+    if array_encoding == 'raw':
+        words = cells.astype('<u4')
+    else:
+        deltas = np.diff(cells, prepend=0).astype('<i4')
+        if array_encoding == 'delta':
+            words = deltas
+        else:
+            starts = np.flatnonzero(np.diff(deltas, prepend=deltas[:1] - 1)) if len(deltas) else deltas
+            runs = np.diff(np.append(starts, len(deltas)))
+            words = np.empty(2 * len(starts), dtype='<i4')
+            words[0::2] = deltas[starts]
+            words[1::2] = runs
+    return struct.pack('<I', len(words)) + words.tobytes()
+
+def _decode_cells(data, offset, array_encoding):
+    """
+    Decode a cell array written by _encode_cells.
+
+    Args:
+        data (bytes): The encoded result.
+        offset (int): Position of the cell array in data.
+        array_encoding (str): One of ARRAY_ENCODINGS.
+
+    Returns:
+        tuple: (cells, offset) with the cell ids and the position after the array.
+    """
+    (count,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    if array_encoding == 'raw':
+        cells = np.frombuffer(data, dtype='<u4', count=count, offset=offset).astype(np.int64)
+    else:
+        words = np.frombuffer(data, dtype='<i4', count=count, offset=offset).astype(np.int64)
+        if array_encoding == 'rle':
+            words = np.repeat(words[0::2], words[1::2])
+        cells = np.cumsum(words)
+    return cells, offset + 4 * count
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from array import array
+import hashlib
+import threading
+
+def grid_fingerprint(algorithm, num_rows, num_cols, walls, weights, weight_cost, allow_diagonal, source, target, options=None):
+    """
+    Compute a canonical hash of a search request.
+
+    Walls and weights are converted to flat cell ids, deduplicated and sorted, so the order
+    and repetition of cells in the request do not matter.
+
+    Args:
+        algorithm (str): Name of the search algorithm.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        walls (list): List of coordinates representing wall nodes.
+        weights (list): List of coordinates representing weighted nodes.
+        weight_cost (float): The cost to traverse a weighted node.
+        allow_diagonal (bool): Whether diagonal movement is allowed.
+        source (tuple): Coordinates (x, y) of the source node.
+        target (tuple): Coordinates (x, y) of the target node.
+        options (dict, optional): Other request options that change the response. Defaults to None.
+
+    Returns:
+        bytes or None: A 16-byte digest, or None if a coordinate is outside the grid.
+    """
+    cells = []
+    for coordinates in (walls, weights):
+        ids = set()
+        for x, y in coordinates:
+            if not (0 <= x < num_rows and 0 <= y < num_cols):
+                return None
+            ids.add(x * num_cols + y)
+        cells.append(array('q', sorted(ids)).tobytes())
+
+    digest = hashlib.blake2b(digest_size=16)
+    # repr keeps 5 and 5.0 apart, since they serialize differently in the response
+    header = repr((algorithm, num_rows, num_cols, repr(weight_cost), bool(allow_diagonal),
+                   tuple(source), tuple(target), sorted((options or {}).items()), len(cells[0])))
+    digest.update(header.encode())
+    digest.update(cells[0])
+    digest.update(cells[1])
+    return digest.digest()
+
+class ResultCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Initialize a ResultCache, an LRU cache of serialized search responses.
+
+        Args:
+            max_bytes (int, optional): Maximum total size of the cached responses. Defaults to 64 MiB.
+
+        Attributes:
+            max_bytes (int): Maximum total size of the cached responses.
+            size (int): Current total size of the cached responses.
+            entries (OrderedDict): Cached responses by fingerprint, least recently used first.
+            sizes (dict): Size in bytes of each cached response.
+            hits (int): Number of lookups that found a response.
+            misses (int): Number of lookups that did not.
+            evictions (int): Number of responses evicted to stay within max_bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Return the number of cached responses.
+
+        Returns:
+            int: The number of cached responses.
+        """
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Look up a cached response and mark it as recently used.
+
+        Args:
+            key (bytes): The request fingerprint.
+
+        Returns:
+            bytes or None: The cached response body, or None on a miss.
+        """
+        with self._lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return body
+
+    def pop(self, key):
+        """
+        Look up a cached entry and remove it from the cache, so the caller has it to itself
+        until it puts it back.
+
+        Args:
+            key (bytes): The fingerprint.
+
+        Returns:
+            object or None: The cached entry, or None on a miss.
+        """
+        with self._lock:
+            body = self.entries.pop(key, None)
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.size -= self.sizes.pop(key)
+            return body
+
+    def put(self, key, body, size=None):
+        """
+        Cache a response body, evicting least recently used responses to make room.
+        Bodies larger than max_bytes are not cached.
+
+        Args:
+            key (bytes): The request fingerprint.
+            body (bytes): The serialized response, or any object whose len() is its size
+                in bytes.
+            size (int, optional): Size of body in bytes, for objects whose len() is not.
+                Defaults to len(body).
+        """
+        if size is None:
+            size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self.size -= self.sizes.pop(key)
+            while self.entries and self.size + size > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.size -= self.sizes.pop(evicted)
+                self.evictions += 1
+            self.entries[key] = body
+            self.sizes[key] = size
+            self.size += size
+
+    def clear(self):
+        """
+        Remove all cached responses. The counters are kept.
+        """
+        with self._lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, number of entries, size in bytes and max_bytes.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self.entries), 'bytes': self.size, 'max_bytes': self.max_bytes}
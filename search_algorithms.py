@@ -1,103 +1,1001 @@
-from priority_queue import PriorityQueue
+from priority_queue import BucketQueue, PriorityQueue
+from grid import DIRECTIONS, OPPOSITE_DIRECTIONS
+from heuristics import default_heuristic, heuristic_function, nearest_goal_heuristic
+from wavefront import uses_wavefront, wavefront
+from array import array
+import numpy as np
+import heapq
 import math
+import time
 
+# Cells expanded between two checks of a search's cancellation token
+CANCEL_CHECK_INTERVAL = 1024
 
-def a_star(grid, source, target, moves_diagonally=False):
+# Largest priority step Dijkstra's algorithm and A* use a bucket queue for; it allocates one bucket per unit of cost
+BUCKET_QUEUE_MAX_STEP = 64
+
+def a_star(grid, source, target, moves_diagonally=False, stats=None, heuristic=None, landmarks=None, epsilon=1, cancel=None,
+           frames=None, frame_size=None):
     """
     Perform the A* pathfinding algorithm to find the shortest path from source to target on a grid.
 
+    The source and the target may also be lists of nodes: the search then starts from all
+    the sources at once and stops at the first target it expands, which gives the shortest
+    path from any source to any target. The heuristic estimates the cost to the nearest
+    target (see heuristics.nearest_goal_heuristic), so it stays admissible for the whole set.
+
     Args:
         grid (Grid): The grid to search through.
-        source (Node): The starting node.
-        target (Node): The goal node.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
         moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None, the
+            tightest admissible one for the grid's movement mode (see heuristics.default_heuristic).
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        epsilon (float, optional): Inflation factor of the heuristic (weighted A*). With a
+            consistent heuristic the path costs at most epsilon times the shortest one, and
+            fewer cells are expanded as epsilon grows. The f scores, and so path_cost, include
+            the inflation. Defaults to 1, plain A*.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells; the search raises jobs.SearchCancelled once it trips. Defaults to None.
+        frames (list, optional): If given, filled with the animation frames the visited
+            cells fall into, see _collect. Defaults to None.
+        frame_size (int, optional): Number of visited cells per frame. Defaults to None,
+            one frame per layer of cells expanded with the same f score.
 
     Returns:
         tuple: A tuple containing:
             - visited_ordered (list): List of nodes visited in the order they were explored.
             - path (list): List of nodes representing the shortest path from source to target (inclusive).
+              With lists of sources or targets, it runs from the source it left to the
+              target it reached.
             - path_length (float): The total length of the shortest path.
             - path_cost (float): The total cost of the shortest path.
 
     Notes:
-        - If the source and target are the same node, returns an empty list.
+        - If the source and target are the same node, returns an empty list. With lists, a
+          cell in both gives a path of that cell alone.
         - If no path is found, returns (visited_ordered, [], 0, 0).
+        - Search state is kept in the grid's cell arrays and stamped with a new generation
+          (see Grid.begin_search), so the grid can be searched again without resetting it.
+          Node objects are only built for the visited cells and the path.
     """
-    path_length = 0
-    path_cost = 0
-    if source == target:
+    if source == target and not isinstance(source, list):
         return []
     else:
-        frontier = PriorityQueue()
-        visited = set([])
-        visited_ordered = []  # Only for display purposes
+        chunk_size, layers = _chunking(cancel, frames, frame_size)
+        visited_ordered, (path, path_length, path_cost) = _collect(a_star_chunks(grid, source, target, moves_diagonally, chunk_size, stats,
+                                                                                 heuristic, landmarks, epsilon, layers),
+                                                                   cancel, frames, grid)
+        return _to_nodes(grid, visited_ordered), _to_nodes(grid, path), path_length, path_cost
+
+def a_star_chunks(grid, source, target, moves_diagonally=False, chunk_size=None, stats=None, heuristic=None, landmarks=None,
+                  epsilon=1, layers=False):
+    """
+    Run A* like a_star, yielding the visited cells as the search goes.
+
+    Each chunk is yielded once its cells are final: their f costs in grid.f do not change
+    afterwards (the target's is set to 0 before the last chunk, as in a_star).
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        chunk_size (int, optional): Number of visited cells per chunk. Defaults to None,
+            which yields all of them in one chunk at the end.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None, the
+            tightest admissible one for the grid's movement mode (see heuristics.default_heuristic).
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        epsilon (float, optional): Inflation factor of the heuristic, as for a_star. Defaults to 1.
+        layers (bool, optional): Whether to also end a chunk whenever the f score of the
+            expanded cells changes, so each chunk holds cells of a single f score. Defaults to False.
+
+    Yields:
+        list: Ids of the next visited cells, in the order they were explored.
+
+    Returns:
+        tuple: (path, path_length, path_cost) where path is a list of cell ids, or ([], 0, 0)
+               if no path is found.
+    """
+    expanded = 0
+    chunk = []  # visited cells not yielded yet
+    source_ids = _cell_ids(grid, source)
+    frontier = _a_star_frontier(grid, moves_diagonally, heuristic, epsilon, len(source_ids))
+    target_ids = _cell_ids(grid, target)
+    targets = set(target_ids)
+    estimate = nearest_goal_heuristic(heuristic, grid, target_ids, moves_diagonally, landmarks)
+    stride, neighbors, costs = grid.adjacency(moves_diagonally)
+    # cells stamped reached are in the frontier, cells stamped closed have been expanded
+    reached = grid.begin_search()
+    closed = reached + 1
+    g, h, f, parent, stamp = grid.g, grid.h, grid.f, grid.parent, grid.stamp
+
+    # process starting nodes
+    for source_id in source_ids:
+        stamp[source_id] = reached
+        g[source_id] = 0
+        h[source_id] = estimate(source_id)
+        f[source_id] = epsilon * h[source_id]
+        frontier.insert(source_id, f[source_id])
 
-        # process starting node
-        source.set_g(0)
-        source.set_h(euclidean_dist_heuristic(source, target))
-        source.set_f(source.h)
-        frontier.insert(source)
+    while len(frontier) > 0:
+        cell = frontier.pop()  # pop cell with lowest f score
 
+        if stamp[cell] != closed:
+            if layers and chunk and f[cell] != f[chunk[-1]]:  # a new cost layer starts
+                yield chunk
+                chunk = []
+            stamp[cell] = closed
+            expanded += 1
+            chunk.append(cell)
+
+            if cell in targets:  # if a goal node is reached, stop
+                path = _trace_path(parent, source_ids, cell)
+                f[cell] = 0
+                path_length, path_cost = a_star_path_metrics(grid, path, f, moves_diagonally)
+                _record_stats(stats, expanded, frontier, starts=len(source_ids))
+                yield chunk
+                return path, path_length, path_cost
+
+            if chunk_size and len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+            for k in range(cell * stride, cell * stride + stride):
+                neighbor = neighbors[k]
+                if neighbor >= 0 and stamp[neighbor] != closed:  # iterate through unexplored neighbors
+                    neighbor_g = costs[k] + g[cell]
+                    neighbor_h = estimate(neighbor)
+                    neighbor_f = neighbor_g + epsilon * neighbor_h
+
+                    if stamp[neighbor] == reached:
+                        if neighbor_g < g[neighbor]:  # check if g score improved
+                            parent[neighbor] = cell
+                            g[neighbor] = neighbor_g
+                            h[neighbor] = neighbor_h
+                            f[neighbor] = neighbor_f
+                            frontier.update_priority(neighbor, neighbor_f) # replace node's f score with lower one
+                    else:
+                        stamp[neighbor] = reached
+                        parent[neighbor] = cell
+                        g[neighbor] = neighbor_g
+                        h[neighbor] = neighbor_h
+                        f[neighbor] = neighbor_f
+                        frontier.insert(neighbor, neighbor_f)
+    # No path found
+    _record_stats(stats, expanded, frontier, starts=len(source_ids))
+    yield chunk
+    return [], 0, 0
+
+def ara_star(grid, source, target, moves_diagonally=False, epsilon=3, epsilon_step=0.5, budget_ms=None, budget_expansions=None,
+             heuristic=None, landmarks=None, stats=None, cancel=None):
+    """
+    Perform Anytime Repairing A* (ARA*): find a path quickly with an inflated heuristic, then
+    keep improving it with smaller inflation factors while the budget lasts.
+
+    Each iteration is a weighted A* search that reuses the costs found by the previous ones,
+    so it only re-expands the cells whose costs improved. After every iteration the path
+    found so far is published with a proven suboptimality bound: its cost is at most bound
+    times the cost of the shortest path. The search ends once the bound reaches 1 (the path
+    is optimal) or the budget runs out, and returns the last published path.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node): The starting node.
+        target (Node): The goal node.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        epsilon (float, optional): Inflation factor of the first iteration, at least 1. Defaults to 3.
+        epsilon_step (float, optional): How much the inflation factor drops after each
+            iteration, down to 1. Defaults to 0.5.
+        budget_ms (float, optional): Wall-clock budget in milliseconds. Defaults to None, no limit.
+        budget_expansions (int, optional): Maximum number of cells to expand over all
+            iterations. Defaults to None, no limit.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None, the
+            tightest admissible one for the grid's movement mode.
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells, as for a_star. Unlike the budget, it discards the path found so far.
+            Defaults to None.
+
+    Returns:
+        tuple: A tuple containing:
+            - visited_ordered (list): List of nodes expanded by all iterations, in order. A
+              cell expanded again by a later iteration appears again.
+            - path (list): List of nodes of the best path found (inclusive), empty if none.
+            - path_length (float): The total length of the path.
+            - path_cost (float): The path cost, computed like a_star's (without inflation).
+            - iterations (list): One dict per published path, with the iteration's
+              'epsilon', the path's suboptimality 'bound', its 'path_length', the cells
+              'expanded' so far and the milliseconds elapsed ('time_ms').
+            - exhausted (bool): Whether the budget ran out before the path was proven optimal.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list.
+        - If no path is found, returns (visited_ordered, [], 0, 0, [], exhausted).
+    """
+    if source == target:
+        return []
+
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000 if budget_ms is not None else None
+    source_id = grid.cell_id(source.x, source.y)
+    target_id = grid.cell_id(target.x, target.y)
+    estimate = heuristic_function(heuristic, grid, target_id, moves_diagonally, landmarks)
+    stride, neighbors, costs = grid.adjacency(moves_diagonally)
+    # cells stamped reached have a cost from this search; costs carry over between iterations
+    reached = grid.begin_search()
+    g, h, f, parent, stamp = grid.g, grid.h, grid.f, grid.parent, grid.stamp
+
+    stamp[source_id] = reached
+    g[source_id] = 0
+    h[source_id] = estimate(source_id)
+    f[source_id] = epsilon * h[source_id]
+    frontier = PriorityQueue()
+    frontier.insert(source_id, f[source_id])
+    queues = [frontier]
+    inconsistent = set()  # cells improved after their expansion in this iteration
+    visited_ordered = []  # Only for display purposes
+    iterations = []
+    best_path = []
+    exhausted = False
+
+    while True:
+        closed = set()
         while len(frontier) > 0:
-            node = frontier.pop()  # pop node with lowest f score
-            
-            if node not in visited:
-                visited.add(node)
-                visited_ordered.append(node)
-                
-                if node == target:  # if goal node is reached, stop
-                    path = [target]
-                    target.set_f(0)
-                    path_cost += source.f
-                    while path[-1] != source:
-                        path.append(path[-1].parent)
-                        if moves_diagonally:
-                            path_length += grid.get_edge_weight(path[-1], path[-2])
-                        else:
-                            path_length += grid.get_node_weight(path[-1])
-                        path_cost += path[-1].f
-                    path.reverse()
-                    return visited_ordered, path, path_length, path_cost
-                
-                neighbors = grid.get_neighbors(node)
-                for neighbor in neighbors:
-                    if neighbor not in visited:  # iterate through unexplored neighbors
-                        if moves_diagonally:
-                            neighbor_g = grid.get_edge_weight(node, neighbor) + node.g
-                        else:
-                            neighbor_g = grid.get_node_weight(neighbor) + node.g
-                        neighbor_h = euclidean_dist_heuristic(neighbor, target)
-                        neighbor_f = neighbor_g + neighbor_h
-
-                        if neighbor in frontier:
-                            if neighbor_g < neighbor.g:  # check if g score improved
-                                neighbor.set_parent(node)
-                                neighbor.set_g(neighbor_g)
-                                neighbor.set_h(neighbor_h)
-                                neighbor.set_f(neighbor_f)
-                                frontier.update_priority(neighbor, neighbor_f) # replace node's f score with lower one
-                        else:
-                            neighbor.set_parent(node)
-                            neighbor.set_g(neighbor_g)
-                            neighbor.set_h(neighbor_h)
-                            neighbor.set_f(neighbor_f)
-                            frontier.insert(neighbor)
-        # No path found
-        return visited_ordered, [], 0, 0
+            priority, cell = frontier.peek()
+            if stamp[target_id] == reached and g[target_id] <= priority:
+                break  # no cell left in the frontier can improve the path to the target
+            if (budget_expansions is not None and len(visited_ordered) >= budget_expansions) or \
+               (deadline is not None and len(visited_ordered) % 64 == 0 and time.perf_counter() >= deadline):
+                exhausted = True
+                break
+            frontier.pop()
+            closed.add(cell)
+            visited_ordered.append(cell)
+            if cancel is not None and len(visited_ordered) % CANCEL_CHECK_INTERVAL == 0:
+                cancel.check()
+
+            for k in range(cell * stride, cell * stride + stride):
+                neighbor = neighbors[k]
+                if neighbor < 0:
+                    continue
+                neighbor_g = costs[k] + g[cell]
+                if stamp[neighbor] != reached:
+                    stamp[neighbor] = reached
+                    g[neighbor] = math.inf
+                    h[neighbor] = estimate(neighbor)
+                if neighbor_g < g[neighbor]:  # check if g score improved
+                    parent[neighbor] = cell
+                    g[neighbor] = neighbor_g
+                    f[neighbor] = neighbor_g + epsilon * h[neighbor]
+                    if neighbor in closed:
+                        inconsistent.add(neighbor)
+                    elif neighbor in frontier:
+                        frontier.update_priority(neighbor, f[neighbor])
+                    else:
+                        frontier.insert(neighbor, f[neighbor])
+
+        if exhausted or stamp[target_id] != reached or g[target_id] == math.inf:
+            break
+
+        # publish the path with the bound given by the lowest unexpanded f score
+        best_path = _trace_path(parent, source_id, target_id)
+        lower = min((g[cell] + h[cell] for cell in list(frontier.index) + list(inconsistent)), default=math.inf)
+        bound = min(epsilon, g[target_id] / lower) if lower > 0 else epsilon
+        bound = max(bound, 1.0)
+        iterations.append({'epsilon': epsilon, 'bound': bound, 'path_length': g[target_id],
+                           'expanded': len(visited_ordered), 'time_ms': (time.perf_counter() - start) * 1000})
+        if bound <= 1 or epsilon <= 1:
+            break
+
+        # next iteration: less inflation, and the improved closed cells go back in the frontier
+        epsilon = max(1, epsilon - epsilon_step)
+        cells = list(frontier.index) + list(inconsistent)
+        frontier = PriorityQueue()
+        queues.append(frontier)
+        for cell in cells:
+            f[cell] = g[cell] + epsilon * h[cell]
+            frontier.insert(cell, f[cell])
+        inconsistent = set()
+
+    _record_stats(stats, len(visited_ordered), *queues)
+    nodes = _to_nodes(grid, visited_ordered)
+    if not best_path:
+        return nodes, [], 0, 0, iterations, exhausted
+    path_f = _a_star_f_costs(grid, best_path, moves_diagonally, estimate)
+    path_length, path_cost = a_star_path_metrics(grid, best_path, path_f, moves_diagonally)
+    return nodes, _to_nodes(grid, best_path), path_length, path_cost, iterations, exhausted
 
-def dijkstra(grid, source, target, moves_diagonally=False): 
+def dijkstra(grid, source, target, moves_diagonally=False, stats=None, cancel=None, frames=None, frame_size=None):
     """
     Perform Dijkstra's algorithm to find the shortest path from source to target on a grid.
 
+    The source and the target may also be lists of nodes, as for a_star.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells, as for a_star. Defaults to None.
+        frames (list, optional): If given, filled with the animation frames the visited
+            cells fall into, see _collect. Defaults to None.
+        frame_size (int, optional): Number of visited cells per frame. Defaults to None,
+            one frame per layer of cells expanded at the same cost.
+
+    Returns:
+        tuple: A tuple containing:
+            - visited_ordered (list): List of nodes visited in the order they were explored.
+            - path (list): List of nodes representing the shortest path from source to target
+              (inclusive), from the source it left to the target it reached with lists.
+            - path_cost (float): The total cost of the shortest path.
+            - path_length (float): The total length of the shortest path.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list. With lists, a
+          cell in both gives a path of that cell alone.
+        - If no path is found, returns (visited_ordered, [], 0, 0).
+        - Search state is kept in the grid's cell arrays and stamped with a new generation
+          (see Grid.begin_search), so the grid can be searched again without resetting it.
+          Node objects are only built for the visited cells and the path.
+        - When every move costs 1 (see wavefront.uses_wavefront), the search runs as a
+          vectorized breadth-first search with the same result.
+    """
+    if source == target and not isinstance(source, list):
+        return []
+    elif uses_wavefront(grid, moves_diagonally):
+        source_ids = _cell_ids(grid, source)
+        target_ids = _cell_ids(grid, target)
+        order, layer_starts, discovered = wavefront(grid, source_ids, target_ids, cancel)
+        visited_ordered = order.tolist()
+        path, path_cost, path_length = [], 0, 0
+        if visited_ordered[-1] in target_ids:
+            path = _trace_path(grid.parent, source_ids, visited_ordered[-1])
+            grid.f[path[-1]] = 0
+            path_cost, path_length = dijkstra_path_metrics(grid, path, moves_diagonally)
+        if frames is not None:
+            # the layers are the breadth-first search's own, cut into frame_size cells if asked
+            if frame_size is None:
+                ends = layer_starts[1:]
+            else:
+                ends = range(frame_size, len(visited_ordered) + frame_size, frame_size)
+            costs = np.frombuffer(grid.f, dtype=np.float64)[order]
+            start = 0
+            for end in ends:
+                end = min(end, len(visited_ordered))
+                frames.append((end, float(costs[start:end].min()), float(costs[start:end].max())))
+                start = end
+        if stats is not None:
+            # the counters a first-in, first-out frontier would have reported
+            stats.update(expanded=len(visited_ordered), heap_pushes=discovered, heap_pops=len(visited_ordered),
+                         heap_decrease_keys=0, relaxations=discovered - len(source_ids))
+        return _to_nodes(grid, visited_ordered), _to_nodes(grid, path), path_cost, path_length
+    else:
+        chunk_size, layers = _chunking(cancel, frames, frame_size)
+        visited_ordered, (path, path_cost, path_length) = _collect(dijkstra_chunks(grid, source, target, moves_diagonally, chunk_size,
+                                                                                   stats, layers), cancel, frames, grid)
+        return _to_nodes(grid, visited_ordered), _to_nodes(grid, path), path_cost, path_length
+
+def dijkstra_chunks(grid, source, target, moves_diagonally=False, chunk_size=None, stats=None, layers=False):
+    """
+    Run Dijkstra's algorithm like dijkstra, yielding the visited cells as the search goes.
+
+    Each chunk is yielded once its cells are final: their costs in grid.f do not change
+    afterwards (the target's is set to 0 before the last chunk, as in dijkstra).
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        chunk_size (int, optional): Number of visited cells per chunk. Defaults to None,
+            which yields all of them in one chunk at the end.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        layers (bool, optional): Whether to also end a chunk whenever the cost of the
+            expanded cells changes, so each chunk holds cells of a single cost. Defaults to False.
+
+    Yields:
+        list: Ids of the next visited cells, in the order they were explored.
+
+    Returns:
+        tuple: (path, path_cost, path_length) where path is a list of cell ids, or ([], 0, 0)
+               if no path is found.
+    """
+    frontier = _dijkstra_frontier(grid, moves_diagonally)
+    expanded = 0
+    chunk = []  # visited cells not yielded yet
+    stride, neighbors, costs = grid.adjacency(moves_diagonally)
+    source_ids = _cell_ids(grid, source)
+    targets = set(_cell_ids(grid, target))
+    # cells stamped reached are in the frontier, cells stamped closed have been expanded
+    reached = grid.begin_search()
+    closed = reached + 1
+    f, parent, stamp = grid.f, grid.parent, grid.stamp
+
+    # process starting nodes
+    for source_id in source_ids:
+        stamp[source_id] = reached
+        f[source_id] = 0
+        frontier.insert(source_id, f[source_id])
+
+    while len(frontier) > 0:
+        cell = frontier.pop()  # pop cell with lowest f score
+        if stamp[cell] != closed:
+            if layers and chunk and f[cell] != f[chunk[-1]]:  # a new cost layer starts
+                yield chunk
+                chunk = []
+            stamp[cell] = closed
+            expanded += 1
+            chunk.append(cell)
+
+            if cell in targets:  # if a goal node is reached, stop
+                path = _trace_path(parent, source_ids, cell)
+                f[cell] = 0
+                path_cost, path_length = dijkstra_path_metrics(grid, path, moves_diagonally)
+                _record_stats(stats, expanded, frontier, starts=len(source_ids))
+                yield chunk
+                return path, path_cost, path_length
+
+            if chunk_size and len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+            for k in range(cell * stride, cell * stride + stride):
+                neighbor = neighbors[k]
+                if neighbor >= 0 and stamp[neighbor] != closed:  # iterate through unexplored neighbors
+                    neighbor_f = costs[k] + f[cell]
+
+                    if stamp[neighbor] == reached:
+                        if neighbor_f < f[neighbor]:  # check if score improved
+                            parent[neighbor] = cell
+                            f[neighbor] = neighbor_f
+                            frontier.update_priority(neighbor, neighbor_f) # replace node's score with lower one
+                    else:
+                        stamp[neighbor] = reached
+                        parent[neighbor] = cell
+                        f[neighbor] = neighbor_f
+                        frontier.insert(neighbor, neighbor_f)
+
+    # No path found
+    _record_stats(stats, expanded, frontier, starts=len(source_ids))
+    yield chunk
+    return [], 0, 0
+
+def dijkstra_distance_field(grid, source, moves_diagonally=False, cancel=None):
+    """
+    Run Dijkstra's algorithm from source until every reachable cell is settled.
+
+    Cells are expanded in exactly the order dijkstra would expand them, so dijkstra's
+    visited list for any target is the prefix of the returned order up to that target.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node): The starting node.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells; the search raises jobs.SearchCancelled once it trips. Defaults to None.
+
+    Returns:
+        tuple: A tuple containing:
+            - order (array): Ids of the reachable cells in the order they were expanded.
+            - distances (array): Cost from source to each cell, indexed by cell id, or
+              infinity if the cell is unreachable.
+            - parents (array): Id of each cell's predecessor on its shortest path, or -1 for
+              the source and unreachable cells.
+    """
+    if uses_wavefront(grid, moves_diagonally):
+        source_id = grid.cell_id(source.x, source.y)
+        order, _, _ = wavefront(grid, source_id, cancel=cancel)
+        distances = np.full(len(grid), math.inf)
+        parents = np.full(len(grid), -1, dtype=np.dtype('l'))
+        distances[order] = np.frombuffer(grid.f, dtype=np.float64)[order]
+        parents[order] = np.frombuffer(grid.parent, dtype=np.dtype('l'))[order]
+        parents[source_id] = -1
+        return array('l', order.tobytes()), array('d', distances.tobytes()), array('l', parents.tobytes())
+
+    frontier = _dijkstra_frontier(grid, moves_diagonally)
+    order = array('l')
+    stride, neighbors, costs = grid.adjacency(moves_diagonally)
+    source_id = grid.cell_id(source.x, source.y)
+    reached = grid.begin_search()
+    closed = reached + 1
+    f, parent, stamp = grid.f, grid.parent, grid.stamp
+
+    stamp[source_id] = reached
+    f[source_id] = 0
+    frontier.insert(source_id, f[source_id])
+    while len(frontier) > 0:
+        cell = frontier.pop()
+        if stamp[cell] != closed:
+            stamp[cell] = closed
+            order.append(cell)
+            if cancel is not None and len(order) % CANCEL_CHECK_INTERVAL == 0:
+                cancel.check()
+            for k in range(cell * stride, cell * stride + stride):
+                neighbor = neighbors[k]
+                if neighbor >= 0 and stamp[neighbor] != closed:
+                    neighbor_f = costs[k] + f[cell]
+                    if stamp[neighbor] == reached:
+                        if neighbor_f < f[neighbor]:
+                            parent[neighbor] = cell
+                            f[neighbor] = neighbor_f
+                            frontier.update_priority(neighbor, neighbor_f)
+                    else:
+                        stamp[neighbor] = reached
+                        parent[neighbor] = cell
+                        f[neighbor] = neighbor_f
+                        frontier.insert(neighbor, neighbor_f)
+
+    # cells outside the reachable set keep stale values from earlier searches in the grid arrays
+    distances = array('d', [math.inf]) * len(grid)
+    parents = array('l', [-1]) * len(grid)
+    for cell in order:
+        distances[cell] = f[cell]
+        parents[cell] = parent[cell]
+    parents[source_id] = -1
+    return order, distances, parents
+
+def a_star_untraced(grid, source, target, moves_diagonally=False, stats=None, heuristic=None, landmarks=None, epsilon=1,
+                    cancel=None):
+    """
+    Run A* like a_star, but return only the path, without the visited cells.
+
+    The search keeps no per-cell state beyond an expanded-cell bitset and packed parent
+    directions (see _untraced_search), about 2 MB on a 2000x2000 grid, and does not use the
+    grid's search arrays or adjacency table. The rest is the frontier's costs and heap
+    entries, which dominate: about 7 MB at the peak on a 2000x2000 grid with 30% walls and
+    around 50 MB on an open one, where a_star needs several hundred MB.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None.
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        epsilon (float, optional): Inflation factor of the heuristic, as for a_star. Defaults to 1.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells. Defaults to None.
+
+    Returns:
+        tuple: A tuple (path, path_length, path_cost) as returned by a_star. Among paths of
+               equal cost, the path may differ from a_star's.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list.
+        - If no path is found, returns ([], 0, 0).
+    """
+    if source == target and not isinstance(source, list):
+        return []
+    target_ids = _cell_ids(grid, target)
+    estimate = nearest_goal_heuristic(heuristic, grid, target_ids, moves_diagonally, landmarks)
+    path, path_g = _untraced_search(grid, _cell_ids(grid, source), target_ids, moves_diagonally, estimate, epsilon, stats, cancel)
+    if not path:
+        return [], 0, 0
+    # the f costs a_star gives the path cells
+    f = {cell: cell_g + epsilon * estimate(cell) for cell, cell_g in zip(path, path_g)}
+    f[path[-1]] = 0
+    path_length, path_cost = a_star_path_metrics(grid, path, f, moves_diagonally)
+    return _to_nodes(grid, path), path_length, path_cost
+
+def dijkstra_untraced(grid, source, target, moves_diagonally=False, stats=None, cancel=None):
+    """
+    Run Dijkstra's algorithm like dijkstra, but return only the path, with the memory use
+    of a_star_untraced.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node or list): The starting node, or a list of starting nodes.
+        target (Node or list): The goal node, or a list of goal nodes.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells. Defaults to None.
+
+    Returns:
+        tuple: A tuple (path, path_cost, path_length) as returned by dijkstra. Among paths
+               of equal cost, the path may differ from dijkstra's.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list.
+        - If no path is found, returns ([], 0, 0).
+    """
+    if source == target and not isinstance(source, list):
+        return []
+    path, _ = _untraced_search(grid, _cell_ids(grid, source), _cell_ids(grid, target), moves_diagonally, stats=stats,
+                               cancel=cancel)
+    if not path:
+        return [], 0, 0
+    path_cost, path_length = dijkstra_path_metrics(grid, path, moves_diagonally)
+    return _to_nodes(grid, path), path_cost, path_length
+
+def _untraced_search(grid, source_ids, target_ids, moves_diagonally, estimate=None, epsilon=1, stats=None, cancel=None):
+    """
+    Run A*, or Dijkstra's algorithm without an estimate, keeping only what is needed to
+    rebuild the path.
+
+    Expanded cells are marked in a bitset (one bit per cell), and each expanded cell's
+    parent is stored as the 3-bit index in DIRECTIONS of the move that entered it, packed
+    into a bytearray. Tentative costs are only kept for cells in the frontier. A lower cost
+    pushes a new heap entry with the cell's first insertion order, as PriorityQueue's
+    update_priority keeps it, so cells are expanded in the same order as with a
+    PriorityQueue frontier; the stale entries are skipped when popped. Neighbors and move
+    costs are computed from the cell coordinates and the grid's wall and weight bytes,
+    with the same values as the adjacency table. On a 2000x2000 grid the bitset and the
+    directions take 2 MB, against over 150 MB for the grid's search arrays.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source_ids (list): The distinct source cell ids.
+        target_ids (list): The target cell ids.
+        moves_diagonally (bool): Whether diagonal moves cost sqrt(2) times the cell weight.
+        estimate (function, optional): Heuristic estimate of a cell's cost to the nearest
+            target. Defaults to None, Dijkstra's algorithm.
+        epsilon (float, optional): Inflation factor of the estimate. Defaults to 1.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells. Defaults to None.
+
+    Returns:
+        tuple: (path, path_g) where path is a list of cell ids from a source to the target
+               reached (inclusive), or [] if no path is found, and path_g the cost from the
+               source to each path cell.
+    """
+    rows, cols = grid.num_rows, grid.num_cols
+    blocked, weighted = grid.blocked, grid.weighted
+    weight_cost = math.nan if grid.weight_cost is None else float(grid.weight_cost)
+    diagonal_factor = math.sqrt(2) if moves_diagonally else 1.0
+    # (dx, dy, cell id offset, cost factor) of each move, in adjacency slot order
+    moves = [(dx, dy, dx * cols + dy, diagonal_factor if k >= 4 else 1.0)
+             for k, (dx, dy) in enumerate(DIRECTIONS[:8 if grid.moves_diagonally else 4])]
+    closed = bytearray((len(grid) + 7) // 8)
+    # one spare byte, so reading a code at the end never runs past the array
+    codes = bytearray((3 * len(grid) + 7) // 8 + 1)
+    open_g = {}  # tentative cost and insertion order of each cell in the frontier
+    targets = set(target_ids)
+
+    # heap entries (priority, insertion order, cost, cell, direction the cell was entered
+    # from); the cost breaks ties between a cell's entries whose priorities round equal
+    frontier = []
+    for order, source_id in enumerate(source_ids):
+        open_g[source_id] = (0, order)
+        frontier.append((epsilon * estimate(source_id) if estimate else 0, order, 0, source_id, -1))
+    heapq.heapify(frontier)
+    inserts = len(frontier)
+    updates = 0
+    expanded = 0
+    reached = None
+
+    while frontier:
+        _, _, cell_g, cell, code = heapq.heappop(frontier)
+        if closed[cell >> 3] >> (cell & 7) & 1:
+            continue  # stale entry of an expanded cell
+        closed[cell >> 3] |= 1 << (cell & 7)
+        if code >= 0:
+            bit = 3 * cell
+            packed = code << (bit & 7)
+            codes[bit >> 3] |= packed & 255
+            codes[(bit >> 3) + 1] |= packed >> 8
+        del open_g[cell]
+        expanded += 1
+
+        if cell in targets:
+            reached = cell
+            break
+        if cancel is not None and expanded % CANCEL_CHECK_INTERVAL == 0:
+            cancel.check()
+
+        x, y = divmod(cell, cols)
+        for k, (dx, dy, offset, factor) in enumerate(moves):
+            if 0 <= x + dx < rows and 0 <= y + dy < cols:
+                neighbor = cell + offset
+                if not blocked[neighbor] and not closed[neighbor >> 3] >> (neighbor & 7) & 1:
+                    neighbor_g = factor * (weight_cost if weighted[neighbor] else 1.0) + cell_g
+                    entry = open_g.get(neighbor)
+                    if entry is None:
+                        order = inserts
+                        inserts += 1
+                    elif neighbor_g < entry[0]:
+                        order = entry[1]
+                        updates += 1
+                    else:
+                        continue
+                    open_g[neighbor] = (neighbor_g, order)
+                    priority = neighbor_g + epsilon * estimate(neighbor) if estimate else neighbor_g
+                    heapq.heappush(frontier, (priority, order, neighbor_g, neighbor, k))
+
+    if stats is not None:
+        # the counters a PriorityQueue frontier would have reported
+        stats.update(expanded=expanded, heap_pushes=inserts, heap_pops=expanded, heap_decrease_keys=updates,
+                     relaxations=inserts - len(source_ids) + updates)
+    if reached is None:
+        return [], []
+
+    # walk the direction codes back to a source, then add up the move costs forwards
+    sources = set(source_ids)
+    path = [reached]
+    entered = []
+    while path[-1] not in sources:
+        bit = 3 * path[-1]
+        code = (codes[bit >> 3] | codes[(bit >> 3) + 1] << 8) >> (bit & 7) & 7
+        entered.append(code)
+        path.append(path[-1] - moves[code][2])
+    path.reverse()
+    entered.reverse()
+    path_g = [0]
+    for cell, code in zip(path[1:], entered):
+        path_g.append(moves[code][3] * (weight_cost if weighted[cell] else 1.0) + path_g[-1])
+    return path, path_g
+
+def jump_point_search(grid, source, target, scanned=False, stats=None, heuristic=None, landmarks=None, cancel=None):
+    """
+    Perform Jump Point Search (JPS) to find the shortest path from source to target on a grid
+    with diagonal movement and no weighted cells.
+
+    JPS is A* that skips over cells in open areas: from each expanded cell it scans straight
+    and diagonal lines and only queues the "jump points" where a shortest path might turn,
+    so far fewer cells pass through the frontier. Moves follow the same rules as a_star
+    (straight moves cost 1, diagonal moves cost sqrt(2), diagonal moves may cut corners),
+    and the returned path has the same optimal cost.
+
+    Args:
+        grid (Grid): The grid to search through. It must allow diagonal movement and have no
+            weighted cells.
+        source (Node): The starting node.
+        target (Node): The goal node.
+        scanned (bool, optional): Whether to also record every cell looked at while jumping,
+            for visualization. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None, which is
+            'octile'.
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            jump points, as for a_star. Defaults to None.
+
+    Returns:
+        tuple: A tuple containing:
+            - visited_ordered (list): List of jump points in the order they were expanded.
+            - path (list): List of nodes representing the shortest path from source to target (inclusive).
+            - path_length (float): The total length of the shortest path.
+            - path_cost (float): The path cost, computed like a_star's.
+            - scanned_ordered (list): List of nodes scanned while jumping, empty unless scanned is True.
+
+    Raises:
+        ValueError: If the grid does not allow diagonal movement or has weighted cells.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list.
+        - If no path is found, returns (visited_ordered, [], 0, 0, scanned_ordered).
+    """
+    if not grid.moves_diagonally or 1 in grid.weighted:
+        raise ValueError('Jump point search needs diagonal movement and no weighted cells')
+    if source == target:
+        return []
+
+    rows, cols = grid.num_rows, grid.num_cols
+    blocked = grid.blocked
+    source_id = grid.cell_id(source.x, source.y)
+    target_id = grid.cell_id(target.x, target.y)
+    tx, ty = target.x, target.y
+    estimate = heuristic_function(heuristic, grid, target_id, True, landmarks)
+    sqrt2 = math.sqrt(2)
+    scanned_ordered = []  # Only for display purposes
+
+    def walkable(x, y):
+        return 0 <= x < rows and 0 <= y < cols and not blocked[x * cols + y]
+
+    def jump(x, y, dx, dy):
+        # Step from (x, y) in direction (dx, dy) until reaching a jump point, a wall or the edge
+        while True:
+            x += dx
+            y += dy
+            if not walkable(x, y):
+                return None
+            if scanned:
+                scanned_ordered.append(x * cols + y)
+            if x == tx and y == ty:
+                return x, y
+            if dx and dy:
+                if (walkable(x - dx, y + dy) and not walkable(x - dx, y)) or \
+                   (walkable(x + dx, y - dy) and not walkable(x, y - dy)):
+                    return x, y
+                if jump(x, y, dx, 0) is not None or jump(x, y, 0, dy) is not None:
+                    return x, y
+            elif dx:
+                if (walkable(x + dx, y + 1) and not walkable(x, y + 1)) or \
+                   (walkable(x + dx, y - 1) and not walkable(x, y - 1)):
+                    return x, y
+            else:
+                if (walkable(x + 1, y + dy) and not walkable(x + 1, y)) or \
+                   (walkable(x - 1, y + dy) and not walkable(x - 1, y)):
+                    return x, y
+
+    def pruned_directions(cell):
+        # Directions worth jumping in from cell, given the direction it was reached from
+        x, y = divmod(cell, cols)
+        if cell == source_id:
+            return [(dx, dy) for dx, dy in DIRECTIONS if walkable(x + dx, y + dy)]
+        px, py = divmod(parent[cell], cols)
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        directions = []
+        if dx and dy:
+            candidates = [(0, dy, True), (dx, 0, True), (dx, dy, True),
+                          (-dx, dy, not walkable(x - dx, y)), (dx, -dy, not walkable(x, y - dy))]
+        elif dx:
+            candidates = [(dx, 0, True), (dx, 1, not walkable(x, y + 1)), (dx, -1, not walkable(x, y - 1))]
+        else:
+            candidates = [(0, dy, True), (1, dy, not walkable(x + 1, y)), (-1, dy, not walkable(x - 1, y))]
+        for ddx, ddy, allowed in candidates:
+            if allowed and walkable(x + ddx, y + ddy):
+                directions.append((ddx, ddy))
+        return directions
+
+    frontier = PriorityQueue()
+    visited_ordered = []  # Only for display purposes
+    # cells stamped reached are in the frontier, cells stamped closed have been expanded
+    reached = grid.begin_search()
+    closed = reached + 1
+    g, h, f, parent, stamp = grid.g, grid.h, grid.f, grid.parent, grid.stamp
+
+    # process starting node
+    stamp[source_id] = reached
+    g[source_id] = 0
+    h[source_id] = estimate(source_id)
+    f[source_id] = h[source_id]
+    frontier.insert(source_id, f[source_id])
+
+    while len(frontier) > 0:
+        cell = frontier.pop()  # pop jump point with lowest f score
+        stamp[cell] = closed
+        visited_ordered.append(cell)
+        if cancel is not None and len(visited_ordered) % CANCEL_CHECK_INTERVAL == 0:
+            cancel.check()
+
+        if cell == target_id:  # if goal node is reached, stop
+            path = _expand_jump_path(grid, _trace_path(parent, source_id, target_id))
+            path_f = _a_star_f_costs(grid, path, True, estimate)
+            path_length, path_cost = a_star_path_metrics(grid, path, path_f, True)
+            _record_stats(stats, len(visited_ordered), frontier)
+            nodes = _to_nodes(grid, visited_ordered)
+            return nodes, _to_nodes(grid, path), path_length, path_cost, _to_nodes(grid, scanned_ordered)
+
+        x, y = divmod(cell, cols)
+        for dx, dy in pruned_directions(cell):
+            point = jump(x, y, dx, dy)
+            if point is None:
+                continue
+            jx, jy = point
+            neighbor = jx * cols + jy
+            if stamp[neighbor] == closed:
+                continue
+            steps = max(abs(jx - x), abs(jy - y))
+            diagonal_steps = min(abs(jx - x), abs(jy - y))
+            neighbor_g = g[cell] + diagonal_steps * sqrt2 + (steps - diagonal_steps)
+            if stamp[neighbor] == reached:
+                if neighbor_g < g[neighbor]:  # check if g score improved
+                    parent[neighbor] = cell
+                    g[neighbor] = neighbor_g
+                    f[neighbor] = neighbor_g + h[neighbor]
+                    frontier.update_priority(neighbor, f[neighbor])
+            else:
+                stamp[neighbor] = reached
+                parent[neighbor] = cell
+                g[neighbor] = neighbor_g
+                h[neighbor] = estimate(neighbor)
+                f[neighbor] = neighbor_g + h[neighbor]
+                frontier.insert(neighbor, f[neighbor])
+
+    # No path found
+    _record_stats(stats, len(visited_ordered), frontier)
+    return _to_nodes(grid, visited_ordered), [], 0, 0, _to_nodes(grid, scanned_ordered)
+
+def _expand_jump_path(grid, jump_path):
+    """
+    Fill in the cells between consecutive jump points of a JPS path.
+
+    Args:
+        grid (Grid): The grid the path runs through.
+        jump_path (list): Jump point cell ids from source to target (inclusive).
+
+    Returns:
+        list: The full list of cell ids from source to target (inclusive).
+    """
+    cols = grid.num_cols
+    path = [jump_path[0]]
+    for point in jump_path[1:]:
+        x, y = divmod(path[-1], cols)
+        px, py = divmod(point, cols)
+        dx = (px > x) - (px < x)
+        dy = (py > y) - (py < y)
+        while (x, y) != (px, py):
+            x += dx
+            y += dy
+            path.append(x * cols + y)
+    return path
+
+def bidirectional_a_star(grid, source, target, moves_diagonally=False, stats=None, heuristic=None, landmarks=None, cancel=None):
+    """
+    Perform bidirectional A* to find the shortest path from source to target on a grid.
+
+    One A* search grows from the source towards the target while a second grows from the
+    target towards the source over reversed edges, taking turns. The searches stop once the
+    cheapest connection found between them is no longer than the lowest f score left in
+    either frontier, so the path stays optimal with weighted cells and diagonal moves.
+    This pays off most when the heuristic is weak, e.g. around large obstacles.
+
     Args:
         grid (Grid): The grid to search through.
         source (Node): The starting node.
         target (Node): The goal node.
         moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        heuristic (str, optional): One of heuristics.HEURISTICS. Defaults to None, the
+            tightest admissible one for the grid's movement mode (see heuristics.default_heuristic).
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells, as for a_star. Defaults to None.
 
     Returns:
         tuple: A tuple containing:
-            - visited_ordered (list): List of nodes visited in the order they were explored.
+            - visited_ordered (list): List of nodes visited by both searches, interleaved in the order they were explored.
+            - path (list): List of nodes representing the shortest path from source to target (inclusive).
+            - path_length (float): The total length of the shortest path.
+            - path_cost (float): The path cost, computed like a_star's.
+
+    Notes:
+        - If the source and target are the same node, returns an empty list.
+        - If no path is found, returns (visited_ordered, [], 0, 0).
+        - Each visited node's f is its f score in the search that visited it.
+    """
+    if source == target:
+        return []
+    visited_ordered, path = _bidirectional_search(grid, source, target, moves_diagonally, True, stats, heuristic, landmarks, cancel)
+    if not path:
+        return visited_ordered, [], 0, 0
+    target_id = grid.cell_id(target.x, target.y)
+    f = _a_star_f_costs(grid, path, moves_diagonally, heuristic_function(heuristic, grid, target_id, moves_diagonally, landmarks))
+    path_length, path_cost = a_star_path_metrics(grid, path, f, moves_diagonally)
+    return visited_ordered, _to_nodes(grid, path), path_length, path_cost
+
+def bidirectional_dijkstra(grid, source, target, moves_diagonally=False, stats=None, cancel=None):
+    """
+    Perform bidirectional Dijkstra's algorithm to find the shortest path from source to target on a grid.
+
+    One search grows from the source while a second grows from the target over reversed
+    edges, taking turns, until the cheapest connection found between them is no longer than
+    the sum of the lowest costs left in the two frontiers.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node): The starting node.
+        target (Node): The goal node.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+        stats (dict, optional): If given, filled with the search's work counters, see
+            _record_stats. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells, as for a_star. Defaults to None.
+
+    Returns:
+        tuple: A tuple containing:
+            - visited_ordered (list): List of nodes visited by both searches, interleaved in the order they were explored.
             - path (list): List of nodes representing the shortest path from source to target (inclusive).
             - path_cost (float): The total cost of the shortest path.
             - path_length (float): The total length of the shortest path.
@@ -105,64 +1003,379 @@ def dijkstra(grid, source, target, moves_diagonally=False):
     Notes:
         - If the source and target are the same node, returns an empty list.
         - If no path is found, returns (visited_ordered, [], 0, 0).
+        - Each visited node's f is its cost from the end its search started at.
     """
-    path_cost = 0
-    path_length = 0
     if source == target:
         return []
+    visited_ordered, path = _bidirectional_search(grid, source, target, moves_diagonally, False, stats, cancel=cancel)
+    if not path:
+        return visited_ordered, [], 0, 0
+    path_cost, path_length = dijkstra_path_metrics(grid, path, moves_diagonally)
+    return visited_ordered, _to_nodes(grid, path), path_cost, path_length
+
+def _bidirectional_search(grid, source, target, moves_diagonally, use_heuristic, stats=None, heuristic=None, landmarks=None,
+                          cancel=None):
+    """
+    Run the alternating forward and backward searches for bidirectional_a_star and bidirectional_dijkstra.
+
+    Args:
+        grid (Grid): The grid to search through.
+        source (Node): The starting node.
+        target (Node): The goal node.
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+        use_heuristic (bool): Whether to guide each search with a heuristic estimate of the cost to the other end.
+        stats (dict, optional): If given, filled with the work counters of both searches
+            together, see _record_stats. Defaults to None.
+        heuristic (str, optional): With use_heuristic, one of heuristics.HEURISTICS.
+            Defaults to None, the default heuristic for the grid.
+        landmarks (Landmarks, optional): Landmark tables for the 'alt' heuristic. Defaults to None.
+        cancel (CancelToken, optional): Token checked every CANCEL_CHECK_INTERVAL expanded
+            cells. Defaults to None.
+
+    Returns:
+        tuple: A tuple (visited_ordered, path) of visited Node objects and the path's cell ids
+               from source to target, or an empty path if there is none.
+    """
+    stride, neighbors, costs = grid.adjacency(moves_diagonally)
+    source_id = grid.cell_id(source.x, source.y)
+    target_id = grid.cell_id(target.x, target.y)
+    # the search state lives in the dicts below; a new generation marks the grid's arrays stale
+    grid.begin_search()
+
+    if use_heuristic:
+        to_target = heuristic_function(heuristic, grid, target_id, moves_diagonally, landmarks)
+        # the backward search estimates the cost from the source to each cell
+        to_source = heuristic_function(heuristic, grid, source_id, moves_diagonally, landmarks, reverse=True)
     else:
-        frontier = PriorityQueue()
-        visited = set([])
-        visited_ordered = []  # Only for display purposes
+        to_target = to_source = lambda cell: 0
 
-        # process starting node
-        source.set_f(0)
-        frontier.insert(source)
+    # one entry per direction: frontier, g scores, parents, visited set, and the heuristic towards the end it heads for
+    forward = (PriorityQueue(), {source_id: 0}, {}, set(), to_target)
+    backward = (PriorityQueue(), {target_id: 0}, {}, set(), to_source)
+    forward[0].insert(source_id, to_target(source_id))
+    if grid.blocked[target_id]:  # no move enters a wall, so there is no path to it
+        _record_stats(stats, 0, forward[0])
+        return [], []
+    backward[0].insert(target_id, to_source(target_id))
 
-        while len(frontier) > 0:
-            node = frontier.pop()  # pop node with lowest f score
-            if node not in visited:
-                visited.add(node)
-                visited_ordered.append(node)
-                
-                if node == target:  # if goal node is reached, stop
-                    path = [target]
-                    target.set_f(0)
-                    while path[-1] != source:
-                        path.append(path[-1].parent)
-                        if moves_diagonally:
-                            edge_weight = grid.get_edge_weight(path[-1], path[-2])
-                            path_cost += edge_weight
-                            if edge_weight % 1 == 0:
-                                path_length += 1
-                            else:
-                                path_length += math.sqrt(2)
-                        else:
-                            path_cost += grid.get_node_weight(path[-1])
-                            path_length += 1
-                    path.reverse()
-                    return visited_ordered, path, path_cost, path_length
-                
-                neighbors = grid.get_neighbors(node)
-                for neighbor in neighbors:
-                    if neighbor not in visited:  # iterate through unexplored neighbors
-                        if moves_diagonally:
-                            neighbor_f = grid.get_edge_weight(node, neighbor) + node.f
-                        else:
-                            neighbor_f = grid.get_node_weight(neighbor) + node.f
-                        
-                        if neighbor in frontier:
-                            if neighbor_f < neighbor.f:  # check if score improved
-                                neighbor.set_parent(node)
-                                neighbor.set_f(neighbor_f)
-                                frontier.update_priority(neighbor, neighbor_f) # replace node's score with lower one
-                        else:
-                            neighbor.set_parent(node)
-                            neighbor.set_f(neighbor_f)
-                            frontier.insert(neighbor)
-
-        # No path found
-        return visited_ordered, [], 0, 0
+    best_cost = math.inf  # cost of the cheapest connection found so far
+    meeting_cell = None
+    visited_ordered = []  # Only for display purposes
+    visited_f = []
+    is_forward = True
+
+    while len(forward[0]) > 0 and len(backward[0]) > 0:
+        forward_min, backward_min = forward[0].peek()[0], backward[0].peek()[0]
+        if use_heuristic:
+            if forward_min >= best_cost or backward_min >= best_cost:
+                break  # either f score bounds every path not found yet
+        elif forward_min + backward_min >= best_cost:
+            break  # a shorter path would need cells closer to both ends
+
+        frontier, g, parent, visited, estimate = forward if is_forward else backward
+        other_g = backward[1] if is_forward else forward[1]
+        f_score, cell = frontier.peek()
+        frontier.pop()
+        visited.add(cell)
+        visited_ordered.append(cell)
+        visited_f.append(f_score)
+        if cancel is not None and len(visited_ordered) % CANCEL_CHECK_INTERVAL == 0:
+            cancel.check()
+
+        for k in range(stride):
+            neighbor = neighbors[cell * stride + k]
+            if neighbor < 0 or neighbor in visited:
+                continue
+            if is_forward:
+                neighbor_g = costs[cell * stride + k] + g[cell]
+            else:  # reversed edge: the cost of entering cell from neighbor
+                reverse_k = neighbor * stride + OPPOSITE_DIRECTIONS[k]
+                if neighbors[reverse_k] < 0:
+                    continue  # the move from neighbor into cell does not exist
+                neighbor_g = costs[reverse_k] + g[cell]
+
+            if neighbor in frontier:
+                if neighbor_g < g[neighbor]:  # check if g score improved
+                    parent[neighbor] = cell
+                    g[neighbor] = neighbor_g
+                    frontier.update_priority(neighbor, neighbor_g + estimate(neighbor))
+            else:
+                parent[neighbor] = cell
+                g[neighbor] = neighbor_g
+                frontier.insert(neighbor, neighbor_g + estimate(neighbor))
+
+            if neighbor in other_g and g[neighbor] + other_g[neighbor] < best_cost:
+                best_cost = g[neighbor] + other_g[neighbor]
+                meeting_cell = neighbor
+        is_forward = not is_forward
+
+    _record_stats(stats, len(visited_ordered), forward[0], backward[0])
+    nodes = _to_nodes(grid, visited_ordered)
+    for node, f_score in zip(nodes, visited_f):
+        node.f = f_score
+
+    if meeting_cell is None:
+        return nodes, []
+    path = _trace_path(forward[2], source_id, meeting_cell)
+    cell = meeting_cell
+    while cell != target_id:
+        cell = backward[2][cell]
+        path.append(cell)
+    return nodes, path
+
+def _a_star_f_costs(grid, path, moves_diagonally, estimate=None):
+    """
+    Calculate the f cost A* would have given each cell of a path, for a_star_path_metrics.
+
+    Args:
+        grid (Grid): The grid the path runs through.
+        path (list): Cell ids from source to target (inclusive).
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+        estimate (function, optional): The heuristic from heuristics.heuristic_function for
+            the path's target. Defaults to None, the Euclidean distance.
+
+    Returns:
+        dict: The f cost of each path cell: its cost along the path plus the heuristic
+              estimate to the target, and 0 for the target.
+    """
+    cols = grid.num_cols
+    target_x, target_y = grid.cell_coor(path[-1])
+    if estimate is None:
+        estimate = lambda cell: _euclidean_dist(cell // cols, cell % cols, target_x, target_y)
+    g = 0
+    f = {path[0]: estimate(path[0])}
+    for previous, cell in zip(path, path[1:]):
+        if moves_diagonally:
+            g = grid.cell_edge_weight(previous, cell) + g
+        else:
+            g = grid.cell_weight(cell) + g
+        f[cell] = g + estimate(cell)
+    f[path[-1]] = 0
+    return f
+
+def _dijkstra_frontier(grid, moves_diagonally):
+    """
+    Choose the frontier queue for Dijkstra's algorithm.
+
+    Without diagonal movement every edge costs 1 or the weight cost. When those are whole
+    numbers of at least 1, a bucket queue pops nodes in exactly the same order as the binary
+    heap in O(1) time; with no weighted cells it is a plain breadth-first queue. Weight costs
+    above BUCKET_QUEUE_MAX_STEP use the binary heap, since the bucket queue would allocate
+    that many buckets before the search starts.
+
+    Args:
+        grid (Grid): The grid to search through.
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+
+    Returns:
+        BucketQueue or PriorityQueue: An empty frontier queue.
+    """
+    if not moves_diagonally:
+        if 1 not in grid.weighted:
+            return BucketQueue(1)
+        weight_cost = grid.weight_cost
+        if (isinstance(weight_cost, (int, float)) and 1 <= weight_cost <= BUCKET_QUEUE_MAX_STEP
+                and float(weight_cost).is_integer()):
+            return BucketQueue(weight_cost)
+    return PriorityQueue()
+
+def _a_star_frontier(grid, moves_diagonally, heuristic, epsilon, starts):
+    """
+    Choose the frontier queue for A*.
+
+    Without diagonal movement, with whole weight costs of at least 1 and the Manhattan
+    heuristic (unscaled, since no move costs less than 1), every f score is a whole number.
+    The heuristic is consistent, so the f scores popped never decrease, and a move changes f
+    by its cost plus or minus 1. A bucket queue with one bucket per unit up to the largest
+    edge cost plus 1 then pops cells in exactly the same order as the binary heap. Inflated
+    heuristics (epsilon other than 1) and several sources, whose f scores may be far apart,
+    keep the binary heap, as do steps above BUCKET_QUEUE_MAX_STEP.
+
+    Args:
+        grid (Grid): The grid to search through.
+        moves_diagonally (bool): Whether diagonal movement is allowed.
+        heuristic (str or None): The heuristic name passed to the search.
+        epsilon (float): Inflation factor of the heuristic.
+        starts (int): Number of source cells.
+
+    Returns:
+        BucketQueue or PriorityQueue: An empty frontier queue.
+    """
+    if heuristic is None:
+        heuristic = default_heuristic(grid)
+    if heuristic == 'octile' and not grid.moves_diagonally:  # octile is then the Manhattan distance
+        heuristic = 'manhattan'
+    if not moves_diagonally and heuristic == 'manhattan' and epsilon == 1 and starts == 1:
+        if 1 not in grid.weighted:
+            return BucketQueue(2)
+        weight_cost = grid.weight_cost
+        if (isinstance(weight_cost, (int, float)) and 1 <= weight_cost <= BUCKET_QUEUE_MAX_STEP - 1
+                and float(weight_cost).is_integer()):
+            return BucketQueue(weight_cost + 1)
+    return PriorityQueue()
+
+def a_star_path_metrics(grid, path, f, moves_diagonally=False):
+    """
+    Calculate the path length and path cost reported by A* for a path.
+
+    Args:
+        grid (Grid): The grid the path runs through.
+        path (list): Cell ids from source to target (inclusive).
+        f (sequence): The f cost of each cell, indexed by cell id. The target's f cost is
+            expected to be 0.
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+
+    Returns:
+        tuple: A tuple (path_length, path_cost).
+    """
+    path_length = 0
+    path_cost = f[path[0]]
+    for i in range(len(path) - 2, -1, -1):  # walk back from the target
+        if moves_diagonally:
+            path_length += grid.cell_edge_weight(path[i], path[i + 1])
+        else:
+            path_length += grid.cell_weight(path[i])
+        path_cost += f[path[i]]
+    return path_length, path_cost
+
+def dijkstra_path_metrics(grid, path, moves_diagonally=False):
+    """
+    Calculate the path cost and path length reported by Dijkstra's algorithm for a path.
+
+    Args:
+        grid (Grid): The grid the path runs through.
+        path (list): Cell ids from source to target (inclusive).
+        moves_diagonally (bool, optional): Whether diagonal movement is allowed. Defaults to False.
+
+    Returns:
+        tuple: A tuple (path_cost, path_length).
+    """
+    path_cost = 0
+    path_length = 0
+    for i in range(len(path) - 2, -1, -1):  # walk back from the target
+        if moves_diagonally:
+            edge_weight = grid.cell_edge_weight(path[i], path[i + 1])
+            path_cost += edge_weight
+            if edge_weight % 1 == 0:
+                path_length += 1
+            else:
+                path_length += math.sqrt(2)
+        else:
+            path_cost += grid.cell_weight(path[i])
+            path_length += 1
+    return path_cost, path_length
+
+def _record_stats(stats, expanded, *frontiers, starts=None):
+    """
+    Fill a stats dict with the work counters of a finished search.
+
+    The counts are read from the frontier queues' own bookkeeping once the search is over,
+    so keeping them costs nothing inside the search loop.
+
+    Args:
+        stats (dict or None): The dict to fill, or None to do nothing.
+        expanded (int): Number of cells the search expanded.
+        *frontiers (PriorityQueue or BucketQueue): The search's frontier queues.
+        starts (int, optional): Number of start cells inserted before the search began.
+            Defaults to None, one per frontier.
+
+    Fills:
+        - expanded: cells expanded.
+        - heap_pushes, heap_pops, heap_decrease_keys: frontier queue operations.
+        - relaxations: times a cell's tentative cost was set or lowered (the start cells'
+          initial inserts are not counted).
+    """
+    if stats is None:
+        return
+    pushes = sum(frontier.counter for frontier in frontiers)
+    decrease_keys = sum(frontier.updates for frontier in frontiers)
+    stats['expanded'] = expanded
+    stats['heap_pushes'] = pushes
+    stats['heap_pops'] = pushes - sum(len(frontier) for frontier in frontiers)
+    stats['heap_decrease_keys'] = decrease_keys
+    stats['relaxations'] = pushes - (len(frontiers) if starts is None else starts) + decrease_keys
+
+def _chunking(cancel=None, frames=None, frame_size=None):
+    """
+    Choose how a_star and dijkstra chunk their search.
+
+    Args:
+        cancel (CancelToken, optional): The search's cancellation token. Defaults to None.
+        frames (list, optional): The list the search fills with frames. Defaults to None.
+        frame_size (int, optional): Number of visited cells per frame. Defaults to None.
+
+    Returns:
+        tuple: (chunk_size, layers) to pass to a_star_chunks or dijkstra_chunks. Each chunk is
+               a frame when frames are asked for.
+    """
+    if frames is not None:
+        return frame_size, frame_size is None
+    return (CANCEL_CHECK_INTERVAL if cancel is not None else None), False
+
+def _collect(search, cancel=None, frames=None, grid=None):
+    """
+    Run a chunked search to the end, gathering its chunks.
+
+    Args:
+        search (generator): A generator such as a_star_chunks or dijkstra_chunks.
+        cancel (CancelToken, optional): Token checked after each chunk. Defaults to None.
+        frames (list, optional): If given, filled with one (end, min_cost, max_cost) tuple per
+            non-empty chunk: the chunk ends before visited_ordered[end] and its cells' costs
+            range from min_cost to max_cost. Defaults to None.
+        grid (Grid, optional): The grid searched, whose grid.f costs are read once each
+            chunk is final; required with frames. Defaults to None.
+
+    Returns:
+        tuple: (visited_ordered, result) where visited_ordered joins all the chunks and
+               result is the generator's return value.
+    """
+    visited_ordered = []
+    while True:
+        try:
+            chunk = next(search)
+        except StopIteration as stop:
+            return visited_ordered, stop.value
+        visited_ordered.extend(chunk)
+        if frames is not None and chunk:
+            chunk_costs = [grid.f[cell] for cell in chunk]
+            frames.append((len(visited_ordered), min(chunk_costs), max(chunk_costs)))
+        if cancel is not None:
+            cancel.check()
+
+def _cell_ids(grid, nodes):
+    """
+    Get the cell ids of a search's source or target, given as a node or a list of nodes.
+
+    Args:
+        grid (Grid): The grid the nodes belong to.
+        nodes (Node or list): A node or a list of nodes.
+
+    Returns:
+        list: The distinct cell ids, in the order the nodes are given.
+    """
+    if isinstance(nodes, list):
+        return list(dict.fromkeys(grid.cell_id(node.x, node.y) for node in nodes))
+    return [grid.cell_id(nodes.x, nodes.y)]
+
+def _trace_path(parent, source_id, target_id):
+    """
+    Follow parent pointers from the target back to the source.
+
+    Args:
+        parent (sequence): The parent id of each cell, indexed by cell id.
+        source_id (int or list): The source cell id, or the source cell ids of a search
+            started from several cells; the path then stops at the first one it meets.
+        target_id (int): The target cell id.
+
+    Returns:
+        list: Cell ids from source to target (inclusive).
+    """
+    sources = set(source_id) if isinstance(source_id, list) else {source_id}
+    path = [target_id]
+    while path[-1] not in sources:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
 
 def euclidean_dist_heuristic(node1, node2):
     """
@@ -175,4 +1388,32 @@ def euclidean_dist_heuristic(node1, node2):
     Returns:
         float: The Euclidean distance between node1 and node2.
     """
-    return math.sqrt(math.pow(node2.x - node1.x, 2) + math.pow(node2.y - node1.y, 2))
\ No newline at end of file
+    return _euclidean_dist(node1.x, node1.y, node2.x, node2.y)
+
+def _euclidean_dist(x1, y1, x2, y2):
+    """
+    Calculate the Euclidean distance between two cells given by their coordinates.
+
+    Args:
+        x1 (int): Row index of the first cell.
+        y1 (int): Column index of the first cell.
+        x2 (int): Row index of the second cell.
+        y2 (int): Column index of the second cell.
+
+    Returns:
+        float: The Euclidean distance between the two cells.
+    """
+    return math.sqrt(math.pow(x2 - x1, 2) + math.pow(y2 - y1, 2))
+
+def _to_nodes(grid, cells):
+    """
+    Build the Node objects for a list of cell ids, e.g. the visited order or the path.
+
+    Args:
+        grid (Grid): The grid the cells belong to.
+        cells (list): List of cell ids.
+
+    Returns:
+        list: List of Node objects in the same order.
+    """
+    return [grid.node(cell) for cell in cells]
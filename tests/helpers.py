@@ -0,0 +1,102 @@
+import math
+import random
+from grid import Grid
+
+def random_grid(rng, max_size=16, weight_costs=(0.5, 1, 2, 5), moves_diagonally=None, wall_density=0.25, weight_density=0.2):
+    """
+    Build a random grid with walls and weighted cells.
+
+    Args:
+        rng (random.Random): The random number generator.
+        max_size (int, optional): Largest number of rows or columns. Defaults to 16.
+        weight_costs (tuple, optional): Weight costs to pick from. Defaults to (0.5, 1, 2, 5).
+        moves_diagonally (bool, optional): The movement mode, or None to pick one. Defaults to None.
+        wall_density (float, optional): Chance of each cell being a wall. Defaults to 0.25.
+        weight_density (float, optional): Chance of each open cell being weighted. Defaults to 0.2.
+
+    Returns:
+        Grid: The grid.
+    """
+    if moves_diagonally is None:
+        moves_diagonally = rng.random() < 0.5
+    grid = Grid(rng.randint(2, max_size), rng.randint(2, max_size), rng.choice(weight_costs), moves_diagonally)
+    for cell in range(len(grid)):
+        r = rng.random()
+        if r < wall_density:
+            grid.set_blocked(grid.cell_coor(cell), True)
+        elif r < wall_density + weight_density:
+            grid.set_weighted(grid.cell_coor(cell), True)
+    return grid
+
+def open_cells(rng, grid, count=2):
+    """
+    Pick distinct open cells of a grid.
+
+    Args:
+        rng (random.Random): The random number generator.
+        grid (Grid): The grid.
+        count (int, optional): Number of cells to pick. Defaults to 2.
+
+    Returns:
+        list: The cell ids, or None if the grid has fewer open cells.
+    """
+    cells = [cell for cell in range(len(grid)) if not grid.blocked[cell]]
+    if len(cells) < count:
+        return None
+    return rng.sample(cells, count)
+
+def path_cost(grid, path):
+    """
+    Add up the edge costs along a path, checking that each step is a move of the grid.
+
+    Args:
+        grid (Grid): The grid.
+        path (list): Nodes from source to target.
+
+    Returns:
+        float: The cost of the path, 0 for an empty one.
+    """
+    stride, neighbors, costs = grid.adjacency()
+    total = 0
+    cells = [grid.cell_id(node.x, node.y) for node in path]
+    for previous, cell in zip(cells, cells[1:]):
+        slots = [k for k in range(previous * stride, previous * stride + stride) if neighbors[k] == cell]
+        assert slots, f'{grid.cell_coor(previous)} -> {grid.cell_coor(cell)} is not a move'
+        total += costs[slots[0]]
+    return total
+
+def same_cost(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+def random_queries(seed, count=120, **grid_options):
+    """
+    Yield random grids with two distinct open endpoints.
+
+    Args:
+        seed (int): Seed of the random number generator.
+        count (int, optional): Number of grids to build; grids without two open cells are
+            skipped. Defaults to 120.
+        **grid_options: Keyword arguments passed on to random_grid.
+
+    Yields:
+        tuple: (grid, source, target) with source and target as Nodes.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        grid = random_grid(rng, **grid_options)
+        ends = open_cells(rng, grid)
+        if ends is not None:
+            yield grid, grid.node(ends[0]), grid.node(ends[1])
+
+def result_key(result):
+    """
+    Turn a search result into plain values that compare equal when two searches agree.
+
+    Args:
+        result (tuple): (visited, path, first, second) as returned by a_star or dijkstra.
+
+    Returns:
+        tuple: Visited cells with their f costs, path cells and the two path metrics.
+    """
+    visited, path, first, second = result
+    return [(node.x, node.y, node.f) for node in visited], [(node.x, node.y) for node in path], first, second
@@ -0,0 +1,48 @@
+import pytest
+
+import app as backend
+from helpers import random_queries, result_key
+from result_cache import ResultCache
+from search_algorithms import a_star, dijkstra
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+@pytest.mark.parametrize('search', [a_star, dijkstra])
+@pytest.mark.parametrize('frame_size', [None, 5])
+def test_animation_frames_cover_visited(search, frame_size):
+    for grid, source, target in random_queries(28, count=60):
+        frames = []
+        result = search(grid, source, target, grid.moves_diagonally, frames=frames, frame_size=frame_size)
+        assert result_key(result) == result_key(search(grid, source, target, grid.moves_diagonally))
+        costs = [node.f for node in result[0]]
+        start = 0
+        for end, min_cost, max_cost in frames:
+            assert (min_cost, max_cost) == (min(costs[start:end]), max(costs[start:end]))
+            if frame_size is not None:
+                assert end - start == frame_size or end == len(costs)
+            start = end
+        assert start == len(costs)
+
+
+@pytest.mark.parametrize('algorithm', ['astar', 'dijkstra'])
+@pytest.mark.parametrize('frames', ['layer', 4])
+def test_routes_return_frames_over_visited(client, algorithm, frames):
+    search = {'num_rows': 8, 'num_cols': 8, 'source': [0, 0], 'target': [7, 7], 'walls': [[3, y] for y in range(7)],
+              'weights': [[5, 5]], 'weightCost': 3}
+    expected = client.post(f'/{algorithm}', json=search).get_json()
+    result = client.post(f'/{algorithm}', json=dict(search, animationFrames=frames)).get_json()
+    animation_frames = result.pop('animation_frames')
+    assert result == expected
+    assert animation_frames[0]['start'] == 0 and animation_frames[-1]['end'] == len(expected['visited'])
+    for frame, following in zip(animation_frames, animation_frames[1:]):
+        assert frame['end'] == following['start']
+    for frame in animation_frames:
+        costs = expected['node_costs'][frame['start']:frame['end']]
+        assert (frame['min_cost'], frame['max_cost']) == (min(costs), max(costs))
+    assert client.post(f'/{algorithm}', json=dict(search, animationFrames=0)).status_code == 400
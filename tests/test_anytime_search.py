@@ -0,0 +1,24 @@
+from helpers import path_cost, random_queries, same_cost
+from search_algorithms import a_star, ara_star
+
+
+def test_anytime_search_ends_with_a_shortest_path():
+    for grid, source, target in random_queries(26, count=60):
+        _, path, _, _, iterations, exhausted = ara_star(grid, source, target, grid.moves_diagonally)
+        expected = a_star(grid, source, target, grid.moves_diagonally)[1]
+        assert not exhausted
+        assert bool(path) == bool(expected)
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+        assert not iterations or iterations[-1]['bound'] == 1
+
+
+def test_anytime_bounds_shrink_and_costs_stay_within_them():
+    for grid, source, target in random_queries(27, count=60):
+        _, path, _, _, iterations, _ = ara_star(grid, source, target, grid.moves_diagonally, epsilon=3, epsilon_step=0.5)
+        if not path:
+            continue
+        best = path_cost(grid, a_star(grid, source, target, grid.moves_diagonally)[1])
+        bounds = [iteration['bound'] for iteration in iterations]
+        assert bounds == sorted(bounds, reverse=True) and bounds[0] <= 3
+        for iteration in iterations:
+            assert iteration['path_length'] <= iteration['bound'] * best + 1e-9
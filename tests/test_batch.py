@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+import app as backend
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'batch_workers', 3)
+    monkeypatch.setattr(backend, 'batch_pool', None)
+    yield backend.app.test_client()
+    if backend.batch_pool is not None:
+        backend.batch_pool.shutdown()
+
+
+def test_batch_results_follow_the_query_order(client):
+    rng = random.Random(11)
+    grid = {'num_rows': 12, 'num_cols': 12, 'weightCost': 3, 'allowDiagonal': True,
+            'walls': [[rng.randrange(12), rng.randrange(12)] for _ in range(30)]}
+    grid['weights'] = [[x, y] for x, y in ([rng.randrange(12), rng.randrange(12)] for _ in range(20))
+                       if [x, y] not in grid['walls']]
+    open_cells = [[x, y] for x in range(12) for y in range(12) if [x, y] not in grid['walls']]
+    queries = []
+    for _ in range(40):
+        source, target = rng.sample(open_cells, 2)
+        queries.append({'algorithm': rng.choice(['astar', 'dijkstra']), 'source': source, 'target': target,
+                        'bidirectional': rng.random() < 0.3})
+    queries.append({'algorithm': 'jps', 'source': open_cells[0], 'target': open_cells[-1]})
+
+    response = client.post('/batch', json=dict(grid, queries=queries))
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results):
+        del result['time_ms']
+        options = {'bidirectional': query['bidirectional']} if 'bidirectional' in query else {}
+        expected = client.post(f"/{query['algorithm']}", json=dict(grid, source=query['source'], target=query['target'], **options))
+        assert result == expected.get_json()
+
+
+def test_batch_rejects_unknown_algorithms(client):
+    queries = [{'algorithm': 'astar', 'source': [0, 0], 'target': [2, 2]},
+               {'algorithm': 'bfs', 'source': [0, 0], 'target': [2, 2]}]
+    response = client.post('/batch', json={'num_rows': 3, 'num_cols': 3, 'queries': queries})
+    assert response.status_code == 400
+    assert client.post('/batch', json={'num_rows': 3, 'num_cols': 3, 'queries': []}).status_code == 400
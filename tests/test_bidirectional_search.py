@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from grid import Grid
+from helpers import path_cost, random_grid, same_cost
+from search_algorithms import a_star, bidirectional_a_star, bidirectional_dijkstra, dijkstra
+
+
+@pytest.mark.parametrize('bidirectional, fresh', [(bidirectional_a_star, a_star), (bidirectional_dijkstra, dijkstra)])
+def test_bidirectional_search_matches_one_way_search(bidirectional, fresh):
+    rng = random.Random(9)
+    for _ in range(150):
+        grid = random_grid(rng)
+        # walled ends included: a search may start on a wall but never enter one
+        source, target = rng.sample(range(len(grid)), 2)
+        source, target = grid.node(source), grid.node(target)
+        _, path, _, _ = bidirectional(grid, source, target, grid.moves_diagonally)
+        expected = fresh(grid, source, target, grid.moves_diagonally)[1]
+        assert bool(path) == bool(expected)
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+
+
+@pytest.mark.parametrize('bidirectional', [bidirectional_a_star, bidirectional_dijkstra])
+def test_bidirectional_search_finds_no_path_into_a_wall(bidirectional):
+    grid = Grid(3, 1)
+    grid.set_blocked((0, 0), True)
+    assert bidirectional(grid, grid.node(2), grid.node(0))[1] == []
+    grid.set_blocked((2, 0), True)
+    assert bidirectional(grid, grid.node(2), grid.node(0))[1] == []
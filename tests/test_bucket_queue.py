@@ -0,0 +1,87 @@
+import random
+import time
+
+import pytest
+
+import search_algorithms
+from helpers import open_cells, random_grid, random_queries, result_key
+from priority_queue import BucketQueue, PriorityQueue
+from search_algorithms import BUCKET_QUEUE_MAX_STEP, _a_star_frontier, _dijkstra_frontier, a_star, dijkstra
+
+
+def test_bucket_queue_pops_like_the_priority_queue():
+    rng = random.Random(2)
+    heap, buckets = PriorityQueue(), BucketQueue(5)
+    current = 0
+    for _ in range(3000):
+        if rng.random() < 0.5 or len(heap) == 0:
+            node = rng.randrange(200)
+            priority = current + rng.randint(1, 5)
+            if node in heap:
+                if priority < heap.queue[heap.index[node]][0]:
+                    heap.update_priority(node, priority)
+                    buckets.update_priority(node, priority)
+            else:
+                heap.insert(node, priority)
+                buckets.insert(node, priority)
+        else:
+            current = heap.peek()[0]
+            assert buckets.pop() == heap.pop()
+        assert len(buckets) == len(heap)
+
+
+@pytest.mark.parametrize('weight_cost, queue', [(1, BucketQueue), (3, BucketQueue), (BUCKET_QUEUE_MAX_STEP, BucketQueue),
+                                                (BUCKET_QUEUE_MAX_STEP + 1, PriorityQueue), (2e7, PriorityQueue),
+                                                (2.5, PriorityQueue), (0.5, PriorityQueue)])
+def test_bucket_queue_is_only_used_for_small_integer_costs(weight_cost, queue):
+    rng = random.Random(1)
+    grid = random_grid(rng, weight_costs=(weight_cost,), moves_diagonally=False, weight_density=0.5)
+    grid.set_weighted((0, 0), True)
+    assert type(_dijkstra_frontier(grid, False)) is queue
+
+
+def test_bucket_queue_matches_the_binary_heap(monkeypatch):
+    rng = random.Random(2)
+    for _ in range(150):
+        grid = random_grid(rng, weight_costs=(1, 2, 5, 9), moves_diagonally=False)
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        with_buckets = result_key(dijkstra(grid, source, target))
+        with monkeypatch.context() as patch:
+            patch.setattr(search_algorithms, '_dijkstra_frontier', lambda grid, moves_diagonally: PriorityQueue())
+            assert result_key(dijkstra(grid, source, target)) == with_buckets
+
+
+@pytest.mark.parametrize('weight_cost, heuristic, epsilon, starts, queue',
+                         [(1, None, 1, 1, BucketQueue), (5, 'octile', 1, 1, BucketQueue),
+                          (BUCKET_QUEUE_MAX_STEP - 1, 'manhattan', 1, 1, BucketQueue),
+                          (BUCKET_QUEUE_MAX_STEP, None, 1, 1, PriorityQueue), (2.5, None, 1, 1, PriorityQueue),
+                          (0.5, None, 1, 1, PriorityQueue), (1, 'euclidean', 1, 1, PriorityQueue),
+                          (1, None, 1.5, 1, PriorityQueue), (1, None, 1, 2, PriorityQueue)])
+def test_a_star_bucket_queue_needs_whole_f_scores(weight_cost, heuristic, epsilon, starts, queue):
+    rng = random.Random(1)
+    grid = random_grid(rng, weight_costs=(weight_cost,), moves_diagonally=False, weight_density=0.5)
+    grid.set_weighted((0, 0), True)
+    assert type(_a_star_frontier(grid, False, heuristic, epsilon, starts)) is queue
+
+
+def test_a_star_bucket_queue_matches_the_binary_heap(monkeypatch):
+    for grid, source, target in random_queries(3, count=150, weight_costs=(1, 2, 5, 9), moves_diagonally=False):
+        assert type(_a_star_frontier(grid, False, None, 1, 1)) is BucketQueue
+        stats, expected_stats = {}, {}
+        with_buckets = result_key(a_star(grid, source, target, stats=stats))
+        with monkeypatch.context() as patch:
+            patch.setattr(search_algorithms, '_a_star_frontier', lambda *args: PriorityQueue())
+            assert result_key(a_star(grid, source, target, stats=expected_stats)) == with_buckets
+        assert stats['expanded'] == expected_stats['expanded']
+
+
+def test_huge_weight_cost_does_not_allocate_buckets():
+    from app import app
+    start = time.perf_counter()
+    response = app.test_client().post('/dijkstra', json={'num_rows': 5, 'num_cols': 5, 'source': [0, 0], 'target': [4, 4],
+                                                         'walls': [], 'weights': [[2, 2]], 'weightCost': 2e7})
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 1
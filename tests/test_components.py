@@ -0,0 +1,74 @@
+import random
+from collections import deque
+
+import pytest
+
+import app as backend
+from grid import Grid
+from result_cache import ResultCache
+
+
+def flood_components(grid):
+    """Label the open cells by breadth-first search, as the reference for Grid.component."""
+    labels = [0] * len(grid)
+    count = 0
+    for start in range(len(grid)):
+        if grid.blocked[start] or labels[start]:
+            continue
+        count += 1
+        labels[start] = count
+        queue = deque([start])
+        while queue:
+            for neighbor in grid.cell_neighbors(queue.popleft()):
+                if not labels[neighbor]:
+                    labels[neighbor] = count
+                    queue.append(neighbor)
+    return labels
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+@pytest.mark.parametrize('moves_diagonally', [False, True])
+def test_labels_follow_wall_changes(moves_diagonally):
+    rng = random.Random(21)
+    for _ in range(40):
+        grid = Grid(rng.randint(2, 14), rng.randint(2, 14), 1, moves_diagonally)
+        for cell in range(len(grid)):
+            if rng.random() < 0.3:
+                grid.set_blocked(grid.cell_coor(cell), True)
+        grid.component(0)
+        for _ in range(30):
+            cell = rng.randrange(len(grid))
+            grid.set_blocked(grid.cell_coor(cell), not grid.blocked[cell])
+            assert grid.components is not None
+            expected = flood_components(grid)
+            # the two labellings must give the same partition of the open cells
+            pairs = set((grid.component(other), expected[other]) for other in range(len(grid)) if not grid.blocked[other])
+            assert len(pairs) == len(set(label for label, _ in pairs)) == len(set(label for _, label in pairs))
+            source, target = rng.randrange(len(grid)), rng.randrange(len(grid))
+            if source != target and not grid.blocked[source]:
+                same = not grid.blocked[target] and expected[source] == expected[target]
+                assert grid.connected(source, target) == same
+
+def test_walled_targets_are_not_searched(client):
+    search = {'num_rows': 5, 'num_cols': 5, 'source': [0, 0], 'target': [4, 4], 'walls': [[4, 4]],
+              'weights': [], 'weightCost': 1}
+    for algorithm in ('astar', 'dijkstra', 'jps'):
+        result = client.post(f'/{algorithm}', json=search).get_json()
+        assert result['reachable'] is False
+        assert (result['visited'], result['path'], result['expanded']) == ([], [], 0)
+
+
+def test_even_splits_are_relabelled_in_bulk():
+    grid = Grid(100, 100, 1)
+    for y in range(99):
+        grid.set_blocked((50, y), True)
+    assert grid.connected(0, len(grid) - 1)
+    grid.set_blocked((50, 99), True)
+    assert grid.components is None
+    assert not grid.connected(0, len(grid) - 1)
@@ -0,0 +1,57 @@
+import base64
+import math
+from array import array
+
+import pytest
+
+import app as backend
+from distance_field import DistanceField
+from helpers import path_cost, random_queries, result_key, same_cost
+from result_cache import ResultCache
+from search_algorithms import dijkstra, dijkstra_distance_field
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+def test_distance_field_order_is_a_prefix_of_dijkstra():
+    for grid, source, target in random_queries(27, count=60):
+        order, distances, _ = dijkstra_distance_field(grid, source, grid.moves_diagonally)
+        visited, path, _, _ = dijkstra(grid, source, target, grid.moves_diagonally)
+        assert list(order[:len(visited)]) == [grid.cell_id(node.x, node.y) for node in visited]
+        target_id = grid.cell_id(target.x, target.y)
+        if path:
+            assert same_cost(distances[target_id], path_cost(grid, path))
+        else:
+            assert distances[target_id] == math.inf
+
+
+def test_distance_field_rebuilds_dijkstra_results():
+    for grid, source, target in random_queries(28, count=60):
+        field = DistanceField(grid, source, grid.moves_diagonally)
+        assert result_key(field.dijkstra(target)) == result_key(dijkstra(grid, source, target, grid.moves_diagonally))
+
+
+def test_distance_field_route_round_trip(client):
+    request = {'num_rows': 4, 'num_cols': 5, 'source': [0, 0], 'walls': [[1, 0], [1, 1], [1, 2], [1, 3], [1, 4]],
+               'weights': [[0, 2]], 'weightCost': 4}
+    response = client.post('/distance-field', json=request)
+    assert response.status_code == 200
+    field = response.get_json()
+    distances = array('d', base64.b64decode(field['distances']))
+    parents = array('i', base64.b64decode(field['parents']))
+    assert field['reachable'] == 5
+    assert list(distances[:5]) == [0, 1, 5, 6, 7]
+    assert all(distance == math.inf for distance in distances[5:])
+    assert list(parents[:6]) == [-1, 0, 1, 2, 3, -1]
+
+    # a later /dijkstra request from the same source is answered from the field
+    search = client.post('/dijkstra', json=dict(request, target=[0, 4])).get_json()
+    assert backend.field_cache.stats()['hits'] == 1
+    assert search['path'] == [[0, 0], [0, 1], [0, 2], [0, 3], [0, 4]]
+    assert search['path_cost'] == 7
+    assert client.post('/distance-field', json={'num_rows': 4, 'source': [0, 0]}).status_code == 400
@@ -0,0 +1,73 @@
+import pytest
+
+import app as backend
+import grid_store
+from grid import Grid
+from grid_store import GridStore
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'grid_store', GridStore(max_sessions=2, ttl=60))
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(grid_store.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_idle_sessions_expire(clock):
+    store = GridStore(ttl=60)
+    first = store.create(Grid(3, 3))
+    clock[0] += 40
+    second = store.create(Grid(3, 3))
+    clock[0] += 30
+    assert store.get(first) is None
+    assert store.get(second) is not None
+    clock[0] += 59
+    assert store.get(second) is not None
+    clock[0] += 61
+    assert store.get(second) is None
+    assert len(store) == 0
+
+
+def test_full_store_evicts_the_least_recently_used(clock):
+    store = GridStore(max_sessions=2)
+    first, second = store.create(Grid(3, 3)), store.create(Grid(3, 3))
+    store.get(first)
+    third = store.create(Grid(3, 3))
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+
+
+def test_patch_deltas_apply_to_the_stored_grid(client):
+    response = client.post('/grids', json={'num_rows': 4, 'num_cols': 4, 'walls': [[1, 0]], 'weightCost': 5})
+    assert response.status_code == 201
+    grid_id = response.get_json()['grid_id']
+    search = {'source': [0, 0], 'target': [3, 0]}
+    assert client.post(f'/grids/{grid_id}/dijkstra', json=search).get_json()['path_length'] == 5
+
+    response = client.patch(f'/grids/{grid_id}', json={'walls': {'remove': [[1, 0]], 'add': [[1, 1]]},
+                                                       'weights': {'add': [[2, 0]]}})
+    assert response.get_json() == {'grid_id': grid_id, 'changes': 3}
+    result = client.post(f'/grids/{grid_id}/dijkstra', json=search).get_json()
+    assert result['path'] == [[0, 0], [1, 0], [2, 0], [3, 0]]
+    assert result['path_cost'] == 7
+
+    client.patch(f'/grids/{grid_id}', json={'weightCost': 1})
+    assert client.post(f'/grids/{grid_id}/dijkstra', json=search).get_json()['path_cost'] == 3
+
+    assert client.delete(f'/grids/{grid_id}').status_code == 204
+    assert client.post(f'/grids/{grid_id}/dijkstra', json=search).status_code == 404
+    assert client.delete(f'/grids/{grid_id}').status_code == 404
+
+
+def test_evicted_grids_are_not_found(client, clock):
+    ids = [client.post('/grids', json={'num_rows': 3, 'num_cols': 3}).get_json()['grid_id'] for _ in range(3)]
+    assert client.patch(f'/grids/{ids[0]}', json={'walls': {'add': [[1, 1]]}}).status_code == 404
+    assert client.patch(f'/grids/{ids[1]}', json={'walls': {'add': [[1, 1]]}}).status_code == 200
+    clock[0] += 61
+    assert client.post(f'/grids/{ids[2]}/astar', json={'source': [0, 0], 'target': [2, 2]}).status_code == 404
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from helpers import open_cells, path_cost, random_grid, same_cost
+from search_algorithms import a_star, dijkstra
+
+
+@pytest.mark.parametrize('heuristic', ['octile', 'euclidean', None])
+def test_admissible_heuristics_give_shortest_paths(heuristic):
+    rng = random.Random(18)
+    for _ in range(150):
+        grid = random_grid(rng, weight_costs=(0.25, 0.5, 1, 3))
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        _, path, _, _ = a_star(grid, source, target, grid.moves_diagonally, heuristic=heuristic)
+        expected = dijkstra(grid, source, target, grid.moves_diagonally)[1]
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+
+
+def test_manhattan_gives_shortest_paths_without_diagonal_moves():
+    rng = random.Random(19)
+    for _ in range(150):
+        grid = random_grid(rng, weight_costs=(0.25, 0.5, 1, 3), moves_diagonally=False)
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        _, path, _, _ = a_star(grid, source, target, heuristic='manhattan')
+        expected = dijkstra(grid, source, target)[1]
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
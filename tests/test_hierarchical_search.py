@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from helpers import open_cells, path_cost, random_grid, same_cost
+from hierarchical_search import HPAStar
+from incremental_search import LPAStar
+from search_algorithms import a_star
+
+
+def test_hpa_star_in_one_cluster_is_optimal():
+    # with a single cluster the path is one refinement A* search, which must be exact
+    rng = random.Random(10)
+    for _ in range(150):
+        grid = random_grid(rng, weight_costs=(0.25, 0.5, 1, 3))
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        _, path, _, _ = HPAStar(grid, cluster_size=32).search(source, target)
+        expected = a_star(grid, source, target, grid.moves_diagonally)[1]
+        assert bool(path) == bool(expected)
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+
+
+@pytest.mark.parametrize('cluster_size', [3, 5])
+def test_hpa_star_finds_valid_paths_no_cheaper_than_a_star(cluster_size):
+    rng = random.Random(cluster_size)
+    for _ in range(100):
+        grid = random_grid(rng, max_size=24, weight_costs=(0.5, 1, 3))
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        _, path, _, _ = HPAStar(grid, cluster_size).search(source, target)
+        expected = a_star(grid, source, target, grid.moves_diagonally)[1]
+        assert bool(path) == bool(expected)
+        if path:
+            assert (path[0].x, path[0].y, path[-1].x, path[-1].y) == (source.x, source.y, target.x, target.y)
+            assert path_cost(grid, path) >= path_cost(grid, expected) - 1e-9
+
+
+@pytest.mark.parametrize('planner', [lambda grid: HPAStar(grid, 4), LPAStar])
+def test_planners_return_no_path_for_walled_endpoints(planner):
+    rng = random.Random(12)
+    for _ in range(40):
+        grid = random_grid(rng)
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        grid.set_blocked(grid.cell_coor(rng.choice(ends)), True)
+        source, target = (grid.node(cell) for cell in ends)
+        assert planner(grid).search(source, target) == ([], [], 0, 0)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from helpers import open_cells, path_cost, random_grid, same_cost
+from incremental_search import LPAStar
+from search_algorithms import a_star, dijkstra
+
+
+def edit_grid(rng, grid, protected):
+    """Toggle a few walls and weights, and sometimes the weight cost, away from the endpoints."""
+    for _ in range(rng.randint(1, 4)):
+        cell = rng.randrange(len(grid))
+        if cell in protected:
+            continue
+        coor = grid.cell_coor(cell)
+        if rng.random() < 0.5:
+            grid.set_blocked(coor, not grid.blocked[cell])
+        else:
+            grid.set_weighted(coor, not grid.weighted[cell])
+    if rng.random() < 0.1:
+        grid.set_weight_cost(rng.choice((0.5, 1, 3)))
+
+
+@pytest.mark.parametrize('use_heuristic', [True, False])
+def test_lpa_star_matches_a_fresh_search_across_edits(use_heuristic):
+    rng = random.Random(5)
+    fresh = a_star if use_heuristic else dijkstra
+    for _ in range(60):
+        grid = random_grid(rng, weight_costs=(0.25, 0.5, 1, 3))
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        planner = LPAStar(grid, use_heuristic)
+        for _ in range(5):
+            _, path, _, _ = planner.search(source, target)
+            expected = fresh(grid, source, target, grid.moves_diagonally)[1]
+            assert bool(path) == bool(expected)
+            assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+            if path:
+                assert (path[0].x, path[0].y, path[-1].x, path[-1].y) == (source.x, source.y, target.x, target.y)
+            edit_grid(rng, grid, set(ends))
+
+
+def test_lpa_star_returns_no_path_for_walled_endpoints():
+    rng = random.Random(7)
+    for _ in range(40):
+        grid = random_grid(rng, weight_costs=(0.5,))
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        planner = LPAStar(grid)
+        planner.search(source, target)
+        walled = rng.choice(ends)
+        grid.set_blocked(grid.cell_coor(walled), True)
+        assert planner.search(source, target) == ([], [], 0, 0)
+        # the wall is still applied once the endpoint opens again
+        grid.set_blocked(grid.cell_coor(walled), False)
+        _, path, _, _ = planner.search(source, target)
+        expected = a_star(grid, source, target, grid.moves_diagonally)[1]
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+
+
+def test_incremental_route_rejects_walled_endpoints():
+    from app import app
+    client = app.test_client()
+    grid_id = client.post('/grids', json={'num_rows': 5, 'num_cols': 5, 'weights': [[1, 1]], 'weightCost': 0.5}).get_json()['grid_id']
+    search = {'source': [0, 0], 'target': [4, 4], 'incremental': True}
+    assert client.post(f'/grids/{grid_id}/astar', json=search).status_code == 200
+    client.patch(f'/grids/{grid_id}', json={'walls': {'add': [[0, 0]]}})
+    response = client.post(f'/grids/{grid_id}/astar', json=search)
+    assert response.status_code == 400
+    client.patch(f'/grids/{grid_id}', json={'walls': {'remove': [[0, 0]]}})
+    assert client.post(f'/grids/{grid_id}/astar', json=search).get_json()['path'][0] == [0, 0]
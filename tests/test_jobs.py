@@ -0,0 +1,143 @@
+import logging
+import random
+import threading
+
+import pytest
+
+import app as backend
+import hierarchical_search
+import incremental_search
+from distance_field import DistanceField
+from grid_store import GridStore
+from helpers import open_cells, path_cost, random_grid, same_cost
+from hierarchical_search import HPAStar
+from incremental_search import LPAStar
+from jobs import CancelToken, JobManager, SearchCancelled
+from result_cache import ResultCache
+from search_algorithms import a_star
+
+SEARCH = {'num_rows': 20, 'num_cols': 20, 'source': [0, 0], 'target': [19, 19],
+          'walls': [[10, y] for y in range(19)], 'weights': [[3, 3]], 'weightCost': 4}
+
+
+class CountdownToken(CancelToken):
+    """Token that trips on its calls-th check, to stop a search at a chosen point."""
+
+    def __init__(self, calls):
+        super().__init__()
+        self.calls = calls
+
+    def check(self):
+        self.calls -= 1
+        if self.calls <= 0:
+            self.cancel()
+        super().check()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'search_jobs', JobManager(max_workers=1, max_pending=4))
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    monkeypatch.setattr(backend, 'grid_store', GridStore())
+    yield backend.app.test_client()
+    if backend.search_jobs.executor is not None:
+        backend.search_jobs.executor.shutdown()
+
+
+def test_async_searches_are_polled_until_done(client):
+    expected = client.post('/astar', json=SEARCH)
+    response = client.post('/astar', json=dict(SEARCH, **{'async': True}))
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'] == f'/jobs/{job_id}'
+    assert backend.search_jobs.get(job_id).wait(10)
+    assert client.get(f'/jobs/{job_id}').get_json()['status'] == 'done'
+    result = client.get(f'/jobs/{job_id}/result')
+    assert result.status_code == 200
+    assert result.get_data() == expected.get_data()
+    assert client.get('/jobs/unknown/result').status_code == 404
+
+
+def test_cancelled_jobs_never_start(client):
+    release = threading.Event()
+    blocker = backend.search_jobs.submit(lambda cancel: release.wait(10))
+    job_id = client.post('/dijkstra', json=dict(SEARCH, **{'async': True})).get_json()['job_id']
+    assert client.get(f'/jobs/{job_id}/result').status_code == 202
+    assert client.delete(f'/jobs/{job_id}').status_code == 200
+    release.set()
+    assert blocker.wait(10) and backend.search_jobs.get(job_id).wait(10)
+    response = client.get(f'/jobs/{job_id}/result')
+    assert response.status_code == 409
+    assert response.get_json()['status'] == 'cancelled'
+
+
+@pytest.mark.parametrize('path, options', [
+    ('/astar', {}),
+    ('/dijkstra', {'allowDiagonal': True}),
+    ('/distance-field', {}),
+    ('/batch', {'queries': [{'algorithm': 'astar', 'source': [0, 0], 'target': [19, 19]}]}),
+])
+def test_searches_past_their_deadline_time_out(client, path, options):
+    response = client.post(path, json=dict(SEARCH, timeoutMs=0.001, **options))
+    assert response.status_code == 504
+    assert response.get_json()['error'] == 'Search timed out'
+    assert client.post(path, json=dict(SEARCH, timeoutMs=0, **options)).status_code == 400
+
+
+def test_grid_sessions_recover_after_a_timeout(client):
+    grid_id = client.post('/grids', json=SEARCH).get_json()['grid_id']
+    search = {'source': SEARCH['source'], 'target': SEARCH['target'], 'incremental': True}
+    for algorithm in ('astar', 'hpa'):
+        assert client.post(f'/grids/{grid_id}/{algorithm}', json=dict(search, timeoutMs=0.001)).status_code == 504
+    result = client.post(f'/grids/{grid_id}/astar', json=search).get_json()
+    expected = client.post('/astar', json=SEARCH).get_json()
+    assert result['path_cost'] == expected['path_cost']
+
+
+def test_cancelled_incremental_searches_resume(monkeypatch):
+    # check often enough to stop these small searches part way through
+    monkeypatch.setattr(incremental_search, 'CANCEL_CHECK_INTERVAL', 5)
+    monkeypatch.setattr(hierarchical_search, 'CANCEL_CHECK_INTERVAL', 5)
+    rng = random.Random(20)
+    cancelled = 0
+    for _ in range(30):
+        grid = random_grid(rng, max_size=40, weight_costs=(0.5, 1, 3), wall_density=0.2)
+        ends = open_cells(rng, grid)
+        if ends is None:
+            continue
+        source, target = (grid.node(cell) for cell in ends)
+        for planner in (LPAStar(grid), HPAStar(grid, cluster_size=8)):
+            try:
+                planner.search(source, target, CountdownToken(rng.randint(2, 20)))
+            except SearchCancelled:
+                cancelled += 1
+            cell = rng.randrange(len(grid))
+            if cell not in ends:
+                grid.set_blocked(grid.cell_coor(cell), not grid.blocked[cell])
+            _, path, _, _ = planner.search(source, target)
+            if isinstance(planner, LPAStar):
+                expected = a_star(grid, source, target, grid.moves_diagonally)[1]
+            else:
+                expected = HPAStar(grid, cluster_size=8).search(source, target)[1]
+            assert bool(path) == bool(expected)
+            assert same_cost(path_cost(grid, path), path_cost(grid, expected))
+    assert cancelled > 20
+
+
+def test_grid_building_and_distance_fields_check_the_token():
+    with pytest.raises(SearchCancelled):
+        backend.build_grid(50, 50, [[1, 1]], [[2, 2]], 2, False, cancel=CancelToken(0))
+    grid = backend.build_grid(50, 50, [[1, 1]], [[2, 2]], 2, False)
+    with pytest.raises(SearchCancelled):
+        DistanceField(grid, grid.node(0), cancel=CountdownToken(2))
+
+
+def test_failed_jobs_are_logged(caplog):
+    manager = JobManager()
+    with caplog.at_level(logging.ERROR, logger='jobs'):
+        job = manager.submit(lambda cancel: 1 / 0)
+        assert job.wait(10)
+    manager.executor.shutdown()
+    assert job.status == 'failed'
+    assert f'Job {job.id} failed' in caplog.text
@@ -0,0 +1,10 @@
+from helpers import path_cost, random_queries, same_cost
+from search_algorithms import a_star, jump_point_search
+
+
+def test_jump_point_search_finds_shortest_paths():
+    for grid, source, target in random_queries(23, moves_diagonally=True, weight_density=0):
+        path = jump_point_search(grid, source, target)[1]
+        expected = a_star(grid, source, target, True)[1]
+        assert bool(path) == bool(expected)
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
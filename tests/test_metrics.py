@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+
+import app as backend
+from instrumentation import Metrics
+from result_cache import ResultCache
+
+SEARCH = {'num_rows': 20, 'num_cols': 20, 'source': [0, 0], 'target': [19, 19], 'walls': [[5, 5]], 'weights': [[6, 6]],
+          'weightCost': 2}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'metrics', Metrics())
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+def samples(text):
+    """Parse the Prometheus text format into {sample name with labels: value}."""
+    values = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            values[name] = float(value)
+    return values
+
+
+def test_metrics_count_searches_and_cache_hits(client):
+    assert client.post('/astar', json=SEARCH).status_code == 200
+    assert client.post('/astar', json=SEARCH).status_code == 200
+    response = client.post('/dijkstra', json=dict(SEARCH, instrument=True))
+    expanded = response.get_json()['stats']['expanded']
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    values = samples(response.get_data(as_text=True))
+    histogram = 'pathfinder_search_duration_seconds_count{algorithm="%s",grid_size="2500",cache="%s"}'
+    assert values[histogram % ('astar', 'miss')] == 1
+    assert values[histogram % ('astar', 'hit')] == 1
+    assert values[histogram % ('dijkstra', 'miss')] == 1
+    assert values['pathfinder_search_duration_seconds_bucket{algorithm="astar",grid_size="2500",cache="hit",le="+Inf"}'] == 1
+    assert values['pathfinder_nodes_expanded_total{algorithm="dijkstra"}'] == expanded
+    assert values['pathfinder_phase_seconds_total{algorithm="dijkstra",phase="search"}'] > 0
+
+
+def test_failed_requests_are_logged(client, monkeypatch, caplog):
+    def fail(*args, **kwargs):
+        raise RuntimeError('broken grid')
+    monkeypatch.setattr(backend, 'build_grid', fail)
+    with caplog.at_level(logging.ERROR, logger=backend.app.logger.name):
+        response = client.post('/grids', json={'num_rows': 3, 'num_cols': 3})
+    assert response.status_code == 500
+    assert response.get_json() == {'error': 'Internal server error'}
+    assert 'broken grid' in caplog.text
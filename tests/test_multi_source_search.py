@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+import app as backend
+from helpers import open_cells, path_cost, random_grid, same_cost
+from result_cache import ResultCache
+from search_algorithms import a_star, dijkstra
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+@pytest.mark.parametrize('search', [a_star, dijkstra])
+def test_several_sources_and_targets_give_the_cheapest_pair(search):
+    rng = random.Random(25)
+    for _ in range(60):
+        grid = random_grid(rng)
+        ends = open_cells(rng, grid, 4)
+        if ends is None:
+            continue
+        sources, targets = [grid.node(cell) for cell in ends[:2]], [grid.node(cell) for cell in ends[2:]]
+        path = search(grid, sources, targets, grid.moves_diagonally)[1]
+        pairs = [search(grid, source, target, grid.moves_diagonally)[1] for source in sources for target in targets]
+        reachable = [path_cost(grid, pair) for pair in pairs if pair]
+        assert bool(path) == bool(reachable)
+        if path:
+            assert same_cost(path_cost(grid, path), min(reachable))
+
+
+@pytest.mark.parametrize('algorithm', ['astar', 'dijkstra'])
+def test_routes_report_the_reached_ends(client, algorithm):
+    search = {'num_rows': 6, 'num_cols': 6, 'source': [[0, 0], [5, 0]], 'target': [[0, 5], [5, 4]],
+              'walls': [[0, 3], [1, 3], [2, 3]], 'weights': [], 'weightCost': 1}
+    result = client.post(f'/{algorithm}', json=search).get_json()
+    assert (result['reached_source'], result['reached_target']) == ([5, 0], [5, 4])
+    assert result['path'][0] == [5, 0] and result['path'][-1] == [5, 4]
+
+    search['walls'] += [[4, 4], [5, 3], [4, 3], [3, 3], [3, 4], [3, 5], [4, 5]]
+    result = client.post(f'/{algorithm}', json=search).get_json()
+    assert result['path'] == []
+    assert (result['reached_source'], result['reached_target']) == (None, None)
+    assert client.post(f'/{algorithm}', json=dict(search, bidirectional=True)).status_code == 400
@@ -0,0 +1,33 @@
+import random
+
+from priority_queue import PriorityQueue
+
+
+def test_priority_queue_matches_a_sorted_reference():
+    rng = random.Random(1)
+    queue, reference, order = PriorityQueue(), {}, 0
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.4 or not reference:
+            node = rng.randrange(300)
+            if node not in reference:
+                queue.insert(node, rng.randrange(50))
+                reference[node] = (queue.queue[queue.index[node]][0], order)
+                order += 1
+        elif op < 0.6:
+            node = rng.choice(list(reference))
+            priority = rng.randrange(50)
+            queue.update_priority(node, priority)
+            reference[node] = (priority, reference[node][1])
+        elif op < 0.7:
+            node = rng.choice(list(reference))
+            queue.remove(node)
+            del reference[node]
+        else:
+            expected = min(reference, key=lambda node: reference[node])
+            assert queue.peek() == (reference[expected][0], expected)
+            assert queue.pop() == expected
+            del reference[expected]
+        assert len(queue) == len(reference)
+        assert all(node in queue for node in reference)
+
@@ -0,0 +1,75 @@
+import gzip
+import random
+
+import brotli
+import pytest
+
+import app as backend
+from response_encoding import ARRAY_ENCODINGS, BINARY_MIMETYPE, decode_result, encode_result
+from result_cache import ResultCache
+
+SEARCH = {'num_rows': 30, 'num_cols': 40, 'source': [0, 0], 'target': [29, 39],
+          'walls': [[10, y] for y in range(35)], 'weights': [[5, y] for y in range(10, 20)], 'weightCost': 2}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+def random_walk(rng, num_rows, num_cols, length):
+    x, y = rng.randrange(num_rows), rng.randrange(num_cols)
+    cells = []
+    for _ in range(length):
+        cells.append((x, y))
+        if rng.random() < 0.7:  # repeated steps make runs for rle
+            dx, dy = rng.choice([(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1)])
+            x, y = min(max(x + dx, 0), num_rows - 1), min(max(y + dy, 0), num_cols - 1)
+        else:
+            x, y = rng.randrange(num_rows), rng.randrange(num_cols)
+    return cells
+
+
+@pytest.mark.parametrize('array_encoding', ARRAY_ENCODINGS)
+def test_encoded_results_decode_to_the_same_result(array_encoding):
+    rng = random.Random(14)
+    for length in [0, 1, 2, 17, 500]:
+        num_rows, num_cols = rng.randint(1, 300), rng.randint(1, 300)
+        visited = random_walk(rng, num_rows, num_cols, length)
+        result = {'visited': visited, 'node_costs': [rng.randrange(1000) / 4 for _ in visited],
+                  'path': random_walk(rng, num_rows, num_cols, length // 3), 'path_length': 12.0,
+                  'path_cost': 15.5, 'expanded': length, 'heuristic': 'manhattan'}
+        assert decode_result(encode_result(result, num_cols, array_encoding)) == result
+
+
+def test_untraced_results_encode_empty_visited():
+    result = {'path': [(0, 0), (0, 1)], 'path_length': 1.0, 'path_cost': 1.0, 'expanded': 2}
+    assert decode_result(encode_result(result, 5, 'rle')) == dict(result, visited=[], node_costs=[])
+    with pytest.raises(ValueError):
+        encode_result(result, 5, 'zip')
+    with pytest.raises(ValueError):
+        decode_result(b'JSON' + encode_result(result, 5)[4:])
+
+
+@pytest.mark.parametrize('array_encoding', ARRAY_ENCODINGS)
+def test_binary_responses_carry_the_json_result(client, array_encoding):
+    expected = client.post('/astar', json=SEARCH).get_json()
+    response = client.post('/astar', json=dict(SEARCH, arrayEncoding=array_encoding), headers={'Accept': BINARY_MIMETYPE})
+    assert response.mimetype == BINARY_MIMETYPE
+    result = decode_result(response.get_data())
+    assert result.pop('node_costs') == pytest.approx(expected.pop('node_costs'))
+    assert result == {**expected, 'visited': [tuple(cell) for cell in expected['visited']],
+                      'path': [tuple(cell) for cell in expected['path']]}
+    assert client.post('/astar', json=dict(SEARCH, arrayEncoding='zip')).status_code == 400
+
+
+@pytest.mark.parametrize('accept_encoding, encoding, decompress', [('br', 'br', brotli.decompress),
+                                                                   ('gzip', 'gzip', gzip.decompress),
+                                                                   ('br;q=0.5, gzip', 'gzip', gzip.decompress)])
+def test_compressed_responses_round_trip(client, accept_encoding, encoding, decompress):
+    expected = client.post('/dijkstra', json=SEARCH).get_data()
+    response = client.post('/dijkstra', json=SEARCH, headers={'Accept-Encoding': accept_encoding})
+    assert response.headers['Content-Encoding'] == encoding
+    assert decompress(response.get_data()) == expected
@@ -0,0 +1,49 @@
+import pytest
+
+import app as backend
+from result_cache import ResultCache, grid_fingerprint
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+def test_fingerprint_ignores_cell_order_and_repeats():
+    key = grid_fingerprint('astar', 5, 5, [[1, 1], [2, 2]], [[3, 3]], 2, False, (0, 0), (4, 4))
+    assert key == grid_fingerprint('astar', 5, 5, [[2, 2], [1, 1], [2, 2]], [[3, 3]], 2, False, (0, 0), (4, 4))
+    assert key != grid_fingerprint('astar', 5, 5, [[1, 1], [2, 2]], [[3, 3]], 2.0, False, (0, 0), (4, 4))
+    assert key != grid_fingerprint('astar', 5, 5, [[1, 1]], [[2, 2], [3, 3]], 2, False, (0, 0), (4, 4))
+    assert key != grid_fingerprint('dijkstra', 5, 5, [[1, 1], [2, 2]], [[3, 3]], 2, False, (0, 0), (4, 4))
+    assert key != grid_fingerprint('astar', 5, 5, [[1, 1], [2, 2]], [[3, 3]], 2, False, (0, 0), (4, 4), {'trace': False})
+    assert grid_fingerprint('astar', 5, 5, [[5, 0]], [], 2, False, (0, 0), (4, 4)) is None
+
+
+def test_cache_evicts_the_least_recently_used():
+    cache = ResultCache(max_bytes=10)
+    cache.put(b'a', b'1234')
+    cache.put(b'b', b'1234')
+    assert cache.get(b'a') == b'1234'
+    cache.put(b'c', b'1234')
+    assert cache.get(b'b') is None
+    cache.put(b'd', b'x' * 11)
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 1, 'entries': 2, 'bytes': 8, 'max_bytes': 10}
+
+
+def test_repeated_requests_are_answered_from_the_cache(client):
+    search = {'num_rows': 6, 'num_cols': 6, 'source': [0, 0], 'target': [5, 5],
+              'walls': [[2, 2], [2, 3]], 'weights': [[1, 1]], 'weightCost': 3}
+    first = client.post('/astar', json=search)
+    assert client.get('/cache').get_json()['misses'] == 1
+    reordered = dict(search, walls=[[2, 3], [2, 2]])
+    second = client.post('/astar', json=reordered)
+    assert second.get_data() == first.get_data()
+    stats = client.get('/cache').get_json()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+    client.post('/astar', json=dict(search, target=[5, 4]))
+    assert client.get('/cache').get_json()['entries'] == 2
+    client.post('/astar', json=dict(search, instrument=True))
+    assert client.get('/cache').get_json()['entries'] == 2
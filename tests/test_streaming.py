@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import app as backend
+from result_cache import ResultCache
+
+SEARCH = {'num_rows': 10, 'num_cols': 12, 'source': [0, 0], 'target': [9, 11], 'chunkSize': 7,
+          'walls': [[4, y] for y in range(11)], 'weights': [[2, 2], [2, 3], [7, 5]], 'weightCost': 3}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'result_cache', ResultCache())
+    monkeypatch.setattr(backend, 'field_cache', ResultCache())
+    return backend.app.test_client()
+
+
+def merge(frames):
+    """Concatenate streamed frames into one result."""
+    result = {'visited': [], 'node_costs': []}
+    for event, frame in frames:
+        if event == 'visited':
+            assert set(frame) == {'visited', 'node_costs'}
+            assert 0 < len(frame['visited']) <= SEARCH['chunkSize']
+            result['visited'] += frame['visited']
+            result['node_costs'] += frame['node_costs']
+        else:
+            assert event == 'result'
+            result.update(frame)
+    assert event == 'result'
+    return result
+
+
+def ndjson_frames(body):
+    assert body.endswith('\n')
+    for line in body[:-1].split('\n'):
+        frame = json.loads(line)
+        yield ('visited' if 'visited' in frame else 'result'), frame
+
+
+def sse_frames(body):
+    assert body.endswith('\n\n')
+    for message in body[:-2].split('\n\n'):
+        event, data = message.split('\n')
+        assert event.startswith('event: ') and data.startswith('data: ')
+        yield event[len('event: '):], json.loads(data[len('data: '):])
+
+
+@pytest.mark.parametrize('algorithm', ['astar', 'dijkstra'])
+@pytest.mark.parametrize('mimetype, parse', [('application/x-ndjson', ndjson_frames), ('text/event-stream', sse_frames)])
+@pytest.mark.parametrize('options', [{}, {'bidirectional': True}, {'target': [[9, 11], [3, 3]]}])
+def test_streamed_frames_add_up_to_the_json_response(client, algorithm, mimetype, parse, options):
+    search = dict(SEARCH, **options)
+    expected = client.post(f'/{algorithm}', json=search).get_json()
+    response = client.post(f'/{algorithm}', json=search, headers={'Accept': mimetype})
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert merge(parse(response.get_data(as_text=True))) == expected
+
+
+def test_unreachable_targets_stream_the_result_frame_alone(client):
+    search = dict(SEARCH, walls=SEARCH['walls'] + [[4, 11]])
+    response = client.post('/astar', json=search, headers={'Accept': 'text/event-stream'})
+    frames = list(sse_frames(response.get_data(as_text=True)))
+    assert [event for event, _ in frames] == ['result']
+    assert frames[0][1]['path'] == []
@@ -0,0 +1,13 @@
+from helpers import path_cost, random_queries, same_cost
+from search_algorithms import a_star, a_star_untraced, dijkstra, dijkstra_untraced
+
+
+def test_untraced_searches_match_the_traced_ones():
+    for grid, source, target in random_queries(24):
+        path, path_length, path_cost_ = a_star_untraced(grid, source, target, grid.moves_diagonally)
+        _, expected, expected_length, expected_cost = a_star(grid, source, target, grid.moves_diagonally)
+        assert [(node.x, node.y) for node in path] == [(node.x, node.y) for node in expected]
+        assert (path_length, path_cost_) == (expected_length, expected_cost)
+        path = dijkstra_untraced(grid, source, target, grid.moves_diagonally)[0]
+        expected = dijkstra(grid, source, target, grid.moves_diagonally)[1]
+        assert same_cost(path_cost(grid, path), path_cost(grid, expected))
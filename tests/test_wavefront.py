@@ -0,0 +1,15 @@
+import search_algorithms
+import wavefront
+from helpers import random_queries, result_key
+from search_algorithms import dijkstra
+
+
+def test_wavefront_matches_the_cell_by_cell_search(monkeypatch):
+    for grid, source, target in random_queries(22, moves_diagonally=False, weight_density=0, max_size=30):
+        assert wavefront.uses_wavefront(grid, False)
+        stats, expected_stats = {}, {}
+        result = result_key(dijkstra(grid, source, target, stats=stats))
+        with monkeypatch.context() as patch:
+            patch.setattr(search_algorithms, 'uses_wavefront', lambda grid, moves_diagonally: False)
+            assert result_key(dijkstra(grid, source, target, stats=expected_stats)) == result
+        assert stats == expected_stats
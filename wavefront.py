@@ -0,0 +1,123 @@
+import numpy as np
+
+# Layers with fewer cells than this are expanded one cell at a time, since NumPy's
+# per-call overhead only pays off on wide wavefronts (e.g. in mazes the layers are tiny)
+MIN_VECTOR_LAYER = 64
+
+def uses_wavefront(grid, moves_diagonally):
+    """
+    Check whether every move on a grid costs 1, so Dijkstra's algorithm is a breadth-first
+    search that wavefront() can run.
+
+    Args:
+        grid (Grid): The grid to search.
+        moves_diagonally (bool): Whether diagonal moves cost sqrt(2) instead of the plain cell weight.
+
+    Returns:
+        bool: True if diagonal moves are not weighted differently and no cell is weighted.
+    """
+    return not moves_diagonally and 1 not in grid.weighted
+
+def wavefront(grid, source, target=None, cancel=None):
+    """
+    Run a breadth-first search on a grid where every move costs 1, advancing the whole
+    frontier one layer at a time with NumPy.
+
+    Each layer's neighbors are gathered from the grid's adjacency table in one array
+    operation, in (frontier position, neighbor slot) order, and the first occurrence of
+    each new cell is kept. That is the order in which the first-in, first-out frontier of
+    dijkstra discovers them, so cells are expanded in exactly the same order, with the
+    same parents, as the scalar search. Narrow layers are expanded cell by cell instead.
+
+    The search state is written to the grid's arrays and stamped with a new generation,
+    as by the scalar searches: f holds each discovered cell's distance (its layer) and
+    parent its predecessor.
+
+    Args:
+        grid (Grid): The grid to search through; see uses_wavefront.
+        source (int or list): The source cell id, or a list of distinct source cell ids that
+            all start at distance 0, in that order.
+        target (int or list, optional): The target cell id, or a list of target cell ids.
+            The search stops once one is expanded, after the cells of its layer that come
+            before it. Defaults to None, which expands every reachable cell.
+        cancel (CancelToken, optional): Token checked after every layer. Defaults to None.
+
+    Returns:
+        tuple: A tuple containing:
+            - order (ndarray): Ids of the expanded cells in expansion order; it ends with
+              the target reached, if any.
+            - layer_starts (ndarray): Offset in order of each layer's first cell, plus
+              len(order) at the end, so layer d is order[layer_starts[d]:layer_starts[d + 1]].
+            - discovered (int): Number of cells reached, expanded or not.
+    """
+    stride, neighbors, _ = grid.adjacency(False)
+    reached = grid.begin_search()
+    closed = reached + 1
+    stamp, parent = grid.stamp, grid.parent
+    # NumPy views sharing memory with the grid's arrays
+    table = np.frombuffer(neighbors, dtype=np.dtype('l')).reshape(-1, stride)
+    stamps = np.frombuffer(stamp, dtype=np.uint32)
+    parents = np.frombuffer(parent, dtype=np.dtype('l'))
+    f = np.frombuffer(grid.f, dtype=np.float64)
+
+    layer = np.atleast_1d(np.asarray(source, dtype=np.dtype('l')))
+    stamps[layer] = reached
+    f[layer] = 0
+    targets = None
+    if target is not None:
+        targets = np.atleast_1d(np.asarray(target, dtype=np.dtype('l')))
+        if len(targets) > 1:
+            is_target = np.zeros(len(stamps), dtype=bool)
+            is_target[targets] = True
+    parts = []
+    layer_starts = [0]
+    discovered = len(layer)
+    distance = 0
+
+    while len(layer) > 0:
+        last = False
+        if targets is not None:
+            hit = np.flatnonzero(layer == targets[0] if len(targets) == 1 else is_target[layer])
+            if len(hit) > 0:
+                layer = layer[:hit[0] + 1]
+                last = True
+        stamps[layer] = closed
+        parts.append(layer)
+        layer_starts.append(layer_starts[-1] + len(layer))
+        if cancel is not None:
+            cancel.check()
+        # the cells expanded before the target still queue their neighbors
+        expanding = layer[:-1] if last else layer
+
+        if len(expanding) < MIN_VECTOR_LAYER:
+            found = []
+            for cell in expanding.tolist():
+                for k in range(cell * stride, cell * stride + stride):
+                    neighbor = neighbors[k]
+                    if neighbor >= 0 and stamp[neighbor] < reached:
+                        stamp[neighbor] = reached
+                        parent[neighbor] = cell
+                        found.append(neighbor)
+            next_layer = np.array(found, dtype=np.dtype('l'))
+        else:
+            candidates = table[expanding].ravel()
+            owners = np.repeat(expanding, stride)
+            keep = candidates >= 0
+            candidates, owners = candidates[keep], owners[keep]
+            keep = stamps[candidates] < reached
+            candidates, owners = candidates[keep], owners[keep]
+            _, first = np.unique(candidates, return_index=True)
+            first.sort()
+            next_layer = candidates[first]
+            stamps[next_layer] = reached
+            parents[next_layer] = owners[first]
+
+        distance += 1
+        f[next_layer] = distance
+        discovered += len(next_layer)
+        if last:
+            break
+        layer = next_layer
+
+    order = np.concatenate(parts)
+    return order, np.array(layer_starts), discovered